@@ -0,0 +1,148 @@
+"""Cache of RAG chat answers for repeated questions.
+
+During an event the same few questions ("where is the venue", "how many
+events") are asked over and over. `AnswerCache` keeps finished answers keyed
+by the normalized query text, `k`, the query scope (organization, event,
+sources) and the `RagIndex.key` they were retrieved from. The index key
+changes with the snapshot's content hash, so a snapshot change invalidates
+every answer computed from the previous one; `drop_index` frees those
+entries right away.
+
+Entries expire after `ttl` seconds and the least recently used one is
+evicted beyond `capacity`. With `similarity` set, a miss on the exact text
+can still be served by a cached answer whose query embedding has at least
+that cosine similarity to the new query (sentence-transformers only).
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from .bm25 import terms
+
+
+def normalize_query(query: str) -> str:
+    """Lower-cased query tokens without surrounding punctuation."""
+
+    return " ".join(terms(query or ""))
+
+
+@dataclass
+class _Entry:
+    result: dict
+    expires_at: float
+    # Unit-length query embedding, for near-duplicate matching.
+    embedding: np.ndarray | None = None
+
+
+class AnswerCache:
+    def __init__(self, capacity: int = 1024, ttl: float = 300.0, similarity: float | None = None) -> None:
+        self.capacity = capacity
+        self.ttl = ttl
+        self.similarity = similarity
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple[str, str, int, str], _Entry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _live(self, key: tuple[str, str, int, str], now: float) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(
+        self,
+        index_key: str,
+        query: str,
+        k: int,
+        embedding: np.ndarray | None = None,
+        *,
+        scope: str = "",
+    ) -> dict | None:
+        """Cached answer for this normalized query or, given its `embedding`,
+        for the closest earlier query within `similarity`."""
+
+        now = time.monotonic()
+        entry = self._live((index_key, scope, k, normalize_query(query)), now)
+        if entry is not None:
+            self.hits += 1
+            return entry.result
+        if embedding is None or self.similarity is None:
+            return None
+
+        keys = [
+            key
+            for key, entry in self._entries.items()
+            if key[:3] == (index_key, scope, k) and entry.embedding is not None and entry.expires_at > now
+        ]
+        if not keys:
+            return None
+        sims = np.stack([self._entries[key].embedding for key in keys]) @ _unit(embedding)
+        best = int(np.argmax(sims))
+        if sims[best] < self.similarity:
+            return None
+        self._entries.move_to_end(keys[best])
+        self.near_hits += 1
+        return self._entries[keys[best]].result
+
+    def put(
+        self,
+        index_key: str,
+        query: str,
+        k: int,
+        result: dict,
+        embedding: np.ndarray | None = None,
+        *,
+        scope: str = "",
+    ) -> None:
+        """Store a freshly computed answer; each call counts as a miss."""
+
+        self.misses += 1
+        normalized = normalize_query(query)
+        if not normalized:
+            return
+        key = (index_key, scope, k, normalized)
+        self._entries[key] = _Entry(
+            result=result,
+            expires_at=time.monotonic() + self.ttl,
+            embedding=_unit(embedding) if embedding is not None and self.similarity is not None else None,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def drop_index(self, index_key: str) -> int:
+        """Forget every answer retrieved from `index_key`; returns how many."""
+
+        stale = [key for key in self._entries if key[0] == index_key]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.near_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
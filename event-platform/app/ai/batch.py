@@ -0,0 +1,94 @@
+"""Event-wide networking recommendations, computed in worker processes.
+
+The attendee population is encoded once per worker process (via the pool
+initializer) and each task scores a chunk of subject rows as one block, or,
+with MinHash/LSH enabled for the population, each row against its candidates.
+Everything here is pure and picklable so it can run in a ProcessPoolExecutor.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+
+from .lsh import MinHashLSH
+from .matrix import AttendeeMatrix
+from .networking import _build_match, conversation_starter
+
+_worker_matrix: AttendeeMatrix | None = None
+_worker_lsh: MinHashLSH | None = None
+
+
+def init_worker(attendees: Sequence[dict], lsh: tuple[int, int] | None = None) -> None:
+    """Pool initializer: encode the event population once per process.
+
+    `lsh` is `(bands, rows)` to also build a `MinHashLSH` over it.
+    """
+
+    global _worker_matrix, _worker_lsh
+    _worker_matrix = AttendeeMatrix(attendees)
+    _worker_lsh = MinHashLSH(_worker_matrix, bands=lsh[0], rows=lsh[1]) if lsh else None
+
+
+def chunk_rows(size: int, chunk_size: int) -> Iterator[list[int]]:
+    for start in range(0, size, chunk_size):
+        yield list(range(start, min(start + chunk_size, size)))
+
+
+def recommend_rows(
+    matrix: AttendeeMatrix,
+    rows: Sequence[int],
+    *,
+    limit: int = 3,
+    min_score: float = 0.0,
+    lsh: MinHashLSH | None = None,
+) -> list[dict]:
+    """Top-k matches, reasons and starters for each subject row.
+
+    With `lsh` (built over `matrix`), each row is scored only against the
+    attendees colliding with it, so the lists are approximate.
+    """
+
+    block = matrix.block_scores(rows) if lsh is None else None
+    results: list[dict] = []
+    for offset, row in enumerate(rows):
+        subject = matrix.attendees[row]
+        if lsh is not None:
+            top = lsh.top_k(row, limit=limit, min_score=min_score)
+        else:
+            top = matrix.top_k(row, limit=limit, min_score=min_score, scores=block[offset])
+        recommendations = [
+            recommendation_entry(subject, matrix.attendees[candidate_row], score)
+            for candidate_row, score in top
+        ]
+        results.append({"user_id": subject.get("id"), "recommendations": recommendations})
+    return results
+
+
+def recommendation_entry(subject: dict, candidate: dict, score: float) -> dict:
+    """Stored/served shape of one match (see `NetworkingRecommendation`)."""
+
+    entry = _build_match(subject, candidate, score)
+    return {
+        "name": candidate.get("name", "Unknown"),
+        "reason": entry["reason"],
+        "starter": conversation_starter(subject, candidate, entry["overlap"]),
+        "score": float(score),
+        "match": candidate,
+    }
+
+
+def compute_chunk(rows: Sequence[int], limit: int = 3, min_score: float = 0.0) -> list[dict]:
+    """Worker task: recommendations for `rows` of the process-local population."""
+
+    if _worker_matrix is None:
+        raise RuntimeError("Worker population is not initialized")
+    return recommend_rows(_worker_matrix, rows, limit=limit, min_score=min_score, lsh=_worker_lsh)
+
+
+def make_pool(attendees: Sequence[dict], workers: int, lsh: tuple[int, int] | None = None) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(list(attendees), lsh),
+    )
@@ -0,0 +1,72 @@
+"""BM25 lexical retrieval over an inverted index.
+
+The token-Jaccard fallback re-tokenizes every document on every question.
+`BM25Index` tokenizes a document set once into CSR posting lists (term ->
+document ids and term frequencies), so a query only touches the postings of
+its own terms:
+
+    score(d, q) = sum over t in q of  idf(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * |d| / avgdl))
+
+with the non-negative idf `log(1 + (N - df + 0.5) / (df + 0.5))`.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Sequence
+
+import numpy as np
+
+_STRIP = ".,!?;:()[]{}\"'`)."
+
+
+def terms(text: str) -> list[str]:
+    """Tokens of `text`, normalized like `rag._tokenize` but keeping repeats."""
+
+    tokens = (token.strip(_STRIP).lower() for token in text.split())
+    return [token for token in tokens if token]
+
+
+class BM25Index:
+    def __init__(self, texts: Sequence[str], *, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.size = len(texts)
+        self.vocabulary: dict[str, int] = {}
+
+        doc_ids: list[int] = []
+        term_ids: list[int] = []
+        frequencies: list[int] = []
+        lengths = np.zeros(self.size, dtype=np.float32)
+        for doc, text in enumerate(texts):
+            counts = Counter(terms(text))
+            lengths[doc] = sum(counts.values())
+            for term, count in counts.items():
+                term_ids.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                doc_ids.append(doc)
+                frequencies.append(count)
+
+        term_array = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(term_array, kind="stable")
+        self.postings = np.asarray(doc_ids, dtype=np.int32)[order]
+        tf = np.asarray(frequencies, dtype=np.float32)[order]
+        df = np.bincount(term_array, minlength=len(self.vocabulary))
+        self.term_ptr = np.concatenate(([0], np.cumsum(df))).astype(np.int64)
+        self.idf = np.log1p((self.size - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        # Everything but the idf factor depends only on (term, document), so
+        # each posting stores its final BM25 weight.
+        average = float(lengths.mean()) if self.size and lengths.mean() > 0 else 1.0
+        norm = k1 * (1.0 - b + b * lengths[self.postings] / average)
+        self.weights = tf * (k1 + 1.0) / (tf + norm)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for `query` (float32, length `size`)."""
+
+        ids = sorted({self.vocabulary[term] for term in terms(query) if term in self.vocabulary})
+        if not ids or not self.size:
+            return np.zeros(self.size, dtype=np.float32)
+        spans = [slice(self.term_ptr[i], self.term_ptr[i + 1]) for i in ids]
+        docs = np.concatenate([self.postings[span] for span in spans])
+        weights = np.concatenate([self.weights[span] * self.idf[i] for span, i in zip(spans, ids)])
+        return np.bincount(docs, weights=weights, minlength=self.size).astype(np.float32)
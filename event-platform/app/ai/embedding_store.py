@@ -0,0 +1,235 @@
+"""Disk-backed, memory-mapped store of document embeddings.
+
+Embeddings live in one float32 `.npy` file opened as a memmap, next to a
+JSON sidecar mapping each document's content hash to its row. A document
+whose text was embedded before (by this worker, another uvicorn worker, or a
+previous run) is never re-encoded, and every worker maps the same file, so
+the OS page cache holds a single copy of the vectors.
+
+Appends take an exclusive `flock` on `store.lock`; a full file is copied into
+a larger one under a new name and the sidecar is swapped atomically, so
+readers keep a consistent view and pick up new rows when the sidecar moves.
+
+Callers get read-only views. A corpus whose rows are not one consecutive run
+(new documents are appended at the end, so any snapshot change fragments it)
+is copied once into a new run at the end, so it and later builds of it map
+as a zero-copy slice. Rows left behind are dropped by rewriting the file
+once they outnumber the live ones.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+from collections.abc import Callable, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+_SIDECAR = "index.json"
+_LOCK = "store.lock"
+_INITIAL_CAPACITY = 1024
+# Rows copied at a time when a file is rewritten; bounds the temporary copy.
+_COPY_CHUNK = 65536
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Content-hash -> row of a memory-mapped (capacity, dim) float32 matrix."""
+
+    def __init__(self, directory: str | os.PathLike) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._rows: dict[str, int] = {}
+        self._count = 0
+        self._file: str | None = None
+        # Read-only map handed to callers; writes go through `_writer`.
+        self._matrix: np.ndarray | None = None
+        self._writer: np.ndarray | None = None
+        self._stamp: tuple[int, int] | None = None
+        self.encoded = 0
+        self.reused = 0
+        self.relocated = 0
+        self._reload()
+
+    def __len__(self) -> int:
+        self._reload()
+        return self._count
+
+    # ── Sidecar ───────────────────────────────────────────────────────────
+
+    def _sidecar_stamp(self) -> tuple[int, int] | None:
+        try:
+            stat = (self.directory / _SIDECAR).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reload(self) -> None:
+        """Re-read the sidecar if another process changed it."""
+
+        stamp = self._sidecar_stamp()
+        if stamp is None or stamp == self._stamp:
+            return
+        meta = json.loads((self.directory / _SIDECAR).read_text())
+        self._rows = meta["rows"]
+        self._count = meta["count"]
+        if meta["file"] != self._file:
+            self._file = meta["file"]
+            self._matrix = np.load(self.directory / self._file, mmap_mode="r")
+            self._writer = None
+        self._stamp = stamp
+
+    def _write_sidecar(self) -> None:
+        meta = {"file": self._file, "count": self._count, "rows": self._rows}
+        temporary = self.directory / f"{_SIDECAR}.{os.getpid()}.tmp"
+        temporary.write_text(json.dumps(meta))
+        os.replace(temporary, self.directory / _SIDECAR)
+        self._stamp = self._sidecar_stamp()
+
+    @contextmanager
+    def _locked(self):
+        with open(self.directory / _LOCK, "a+") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                self._reload()
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    # ── Storage ───────────────────────────────────────────────────────────
+
+    def _writable(self) -> np.ndarray:
+        """Read-write map of the current file; only used under `_locked`."""
+
+        if self._writer is None:
+            self._writer = np.load(self.directory / self._file, mmap_mode="r+")
+        return self._writer
+
+    def _replace_file(self, capacity: int, dim: int, keep: np.ndarray, rows: dict[str, int]) -> None:
+        """Move to a new file of `capacity` rows starting with the current
+        rows `keep`, in that order, and publish `rows` as its hash map."""
+
+        generation = 0 if self._file is None else int(self._file.split("-")[1].split(".")[0]) + 1
+        name = f"embeddings-{generation}.npy"
+        replacement = np.lib.format.open_memmap(
+            self.directory / name, mode="w+", dtype=np.float32, shape=(capacity, dim)
+        )
+        for start in range(0, len(keep), _COPY_CHUNK):
+            chunk = keep[start : start + _COPY_CHUNK]
+            replacement[start : start + len(chunk)] = self._matrix[chunk]
+        replacement.flush()
+
+        previous = self._file
+        self._file, self._writer = name, replacement
+        self._matrix = np.load(self.directory / name, mmap_mode="r")
+        self._rows, self._count = rows, len(keep)
+        if previous is not None:
+            # Published below; readers still mapping the old file keep it
+            # alive until they reload.
+            self._write_sidecar()
+            os.unlink(self.directory / previous)
+
+    def _ensure_capacity(self, needed: int, dim: int) -> None:
+        matrix = self._matrix
+        if matrix is not None and matrix.shape[1] != dim:
+            raise ValueError(f"store holds {matrix.shape[1]}-d embeddings, got {dim}-d")
+        if matrix is not None and needed <= len(matrix):
+            return
+
+        capacity = max(needed, _INITIAL_CAPACITY, 2 * (len(matrix) if matrix is not None else 0))
+        self._replace_file(capacity, dim, np.arange(self._count, dtype=np.int64), self._rows)
+
+    def _compact(self) -> None:
+        """Rewrite the file with only the rows some hash still points to."""
+
+        live = sorted(self._rows.items(), key=lambda item: item[1])
+        keep = np.fromiter((row for _, row in live), dtype=np.int64, count=len(live))
+        rows = {key: row for row, (key, _) in enumerate(live)}
+        self._replace_file(max(2 * len(live), _INITIAL_CAPACITY), self._matrix.shape[1], keep, rows)
+
+    def _append(self, hashes: Sequence[str], vectors: np.ndarray) -> None:
+        """Write `vectors` after the last row and point `hashes` at them."""
+
+        self._ensure_capacity(self._count + len(vectors), vectors.shape[1])
+        writer = self._writable()
+        writer[self._count : self._count + len(vectors)] = vectors
+        writer.flush()
+        for offset, key in enumerate(hashes):
+            self._rows[key] = self._count + offset
+        self._count += len(vectors)
+        if self._count > 2 * len(self._rows):
+            self._compact()
+        else:
+            self._write_sidecar()
+
+    def rows(self, hashes: Sequence[str]) -> np.ndarray:
+        """Row per hash, -1 where the hash is not stored."""
+
+        self._reload()
+        return np.fromiter((self._rows.get(key, -1) for key in hashes), dtype=np.int64, count=len(hashes))
+
+    def view(self, rows: np.ndarray) -> np.ndarray:
+        """Read-only rows of the matrix: a zero-copy memmap slice when they
+        are consecutive, otherwise a gathered copy."""
+
+        if _consecutive(rows):
+            return self._matrix[rows[0] : rows[-1] + 1]
+        gathered = np.asarray(self._matrix[rows])
+        gathered.flags.writeable = False
+        return gathered
+
+    def get_or_encode(
+        self,
+        texts: Sequence[str],
+        encode: Callable[[list[str]], np.ndarray],
+    ) -> np.ndarray:
+        """(len(texts), dim) embeddings; only texts never stored are encoded."""
+
+        hashes = [content_hash(text) for text in texts]
+        unique = list(dict.fromkeys(hashes))
+        if _consecutive(self.rows(unique)):
+            self.reused += len(texts)
+            return self.view(self.rows(hashes))
+
+        with self._locked():
+            rows = self.rows(unique)
+            missing = rows < 0
+            vectors = np.zeros((0, 0), dtype=np.float32)
+            if missing.any():
+                text_of = dict(zip(hashes, texts))
+                vectors = np.asarray(
+                    encode([text_of[key] for key, absent in zip(unique, missing) if absent]), dtype=np.float32
+                )
+            self.encoded += len(vectors)
+            self.reused += len(texts) - len(vectors)
+
+            appended = rows.copy()
+            appended[missing] = np.arange(self._count, self._count + len(vectors))
+            if _consecutive(appended):
+                if len(vectors):
+                    self._append([key for key, absent in zip(unique, missing) if absent], vectors)
+            else:
+                # Lay the whole corpus out as one new run; stored rows are
+                # copied, not re-encoded.
+                run = np.empty((len(unique), self._matrix.shape[1]), dtype=np.float32)
+                run[~missing] = self._matrix[rows[~missing]]
+                run[missing] = vectors
+                self.relocated += int((~missing).sum())
+                self._append(unique, run)
+            rows = self.rows(hashes)
+        return self.view(rows)
+
+
+def _consecutive(rows: np.ndarray) -> bool:
+    """Stored (non-negative) rows forming one ascending run."""
+
+    if not len(rows) or rows[0] < 0 or rows[-1] - rows[0] != len(rows) - 1:
+        return False
+    return bool(np.all(np.diff(rows) == 1))
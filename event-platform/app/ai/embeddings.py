@@ -0,0 +1,154 @@
+"""Per-tag sentence embeddings for semantic interest matching.
+
+Exact tag matching never relates "ML" to "machine learning". A
+`TagEmbeddingCache` encodes every distinct normalized tag once, in batches,
+into rows of a float32 matrix of unit vectors, so comparing two tag sets is a
+small matrix product over cached rows.
+
+`sentence_transformers` stays optional: without it (or without a model) the
+cache reports `available == False` and `similarity()` keeps its token-only
+behaviour. The cache may be shared by threads; its methods hold its lock.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+# Cosine similarities at or below this count as unrelated tags; the range
+# above it is rescaled to [0, 1] so identical tags still score 1.0.
+SEMANTIC_FLOOR = 0.5
+
+# Tag sets whose similarities against the whole vocabulary are kept; one
+# recommendation compares the same subject set with every candidate.
+_SUBJECT_CACHE_SIZE = 256
+
+
+class TagEmbeddingCache:
+    """Normalized tag -> row of a float32 matrix of unit-length embeddings."""
+
+    def __init__(self, model=None, *, batch_size: int = 64, floor: float = SEMANTIC_FLOOR) -> None:
+        self.model = model
+        self.batch_size = batch_size
+        self.floor = floor
+        self._rows: dict[str, int] = {}
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._subjects: "OrderedDict[frozenset[str], np.ndarray]" = OrderedDict()
+        # Reentrant: `overlaps` warms and reads the vocabulary under one hold.
+        self._lock = threading.RLock()
+
+    @property
+    def available(self) -> bool:
+        return self.model is not None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def warm(self, tags: Iterable[str]) -> int:
+        """Encode every tag not cached yet in batches; returns how many were added."""
+
+        with self._lock:
+            return self._warm(tags)
+
+    def _warm(self, tags: Iterable[str]) -> int:
+        missing: list[str] = []
+        seen: set[str] = set()
+        for tag in tags:
+            if tag and tag not in self._rows and tag not in seen:
+                seen.add(tag)
+                missing.append(tag)
+        if not missing or not self.available:
+            return 0
+
+        encoded = np.asarray(
+            self.model.encode(missing, batch_size=self.batch_size, convert_to_numpy=True),
+            dtype=np.float32,
+        )
+        norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+        encoded /= np.maximum(norms, 1e-12)
+
+        start = len(self._rows)
+        needed = start + len(missing)
+        if needed > len(self._vectors) or self._vectors.shape[1] != encoded.shape[1]:
+            # Grow geometrically so warming tag by tag stays amortized O(1).
+            grown = np.zeros((max(needed, 2 * len(self._vectors)), encoded.shape[1]), dtype=np.float32)
+            if start:
+                grown[:start] = self._vectors[:start]
+            self._vectors = grown
+        self._vectors[start:needed] = encoded
+        for offset, tag in enumerate(missing):
+            self._rows[tag] = start + offset
+        return len(missing)
+
+    def vectors(self, tags: Iterable[str]) -> np.ndarray:
+        """(len(tags), dim) unit vectors, encoding unseen tags first."""
+
+        tags = list(tags)
+        with self._lock:
+            self._warm(tags)
+            return self._vectors[[self._rows[tag] for tag in tags]]
+
+    def _against_vocabulary(self, tags: set[str]) -> np.ndarray:
+        """Rescaled similarities of `tags` (sorted) to every cached tag."""
+
+        key = frozenset(tags)
+        cached = self._subjects.get(key)
+        if cached is not None and cached.shape[1] == len(self._rows):
+            self._subjects.move_to_end(key)
+            return cached
+
+        left = self.vectors(sorted(tags))
+        sims = left @ self._vectors[: len(self._rows)].T
+        sims = np.clip((sims - self.floor) / (1.0 - self.floor), 0.0, 1.0)
+        self._subjects[key] = sims
+        self._subjects.move_to_end(key)
+        while len(self._subjects) > _SUBJECT_CACHE_SIZE:
+            self._subjects.popitem(last=False)
+        return sims
+
+    def overlaps(self, left: set[str], rights: Sequence[set[str]], *, mode: str = "max") -> np.ndarray:
+        """Semantic counterpart of the Jaccard tag overlap of `left` with each
+        of `rights`, in [0, 1].
+
+        `max` averages, in both directions, each tag's best match in the other
+        set; `mean` averages every pairwise similarity. Every reduction runs per
+        candidate segment, so a value does not depend on the other candidates.
+        """
+
+        if mode not in ("max", "mean"):
+            raise ValueError(f"unknown semantic mode: {mode!r}")
+        with self._lock:
+            return self._overlaps(left, rights, mode)
+
+    def _overlaps(self, left: set[str], rights: Sequence[set[str]], mode: str) -> np.ndarray:
+        result = np.zeros(len(rights), dtype=np.float64)
+        filled = [i for i, right in enumerate(rights) if right]
+        if not left or not filled or not self.available:
+            return result
+
+        ordered = [sorted(rights[i]) for i in filled]
+        self._warm(tag for tags in ordered for tag in tags)
+        columns = np.fromiter((self._rows[tag] for tags in ordered for tag in tags), dtype=np.int64)
+        counts = np.fromiter((len(tags) for tags in ordered), dtype=np.int64, count=len(ordered))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        # (len(left), total candidate tags)
+        pairwise = self._against_vocabulary(left)[:, columns].astype(np.float64)
+        if mode == "max":
+            forward = np.ascontiguousarray(np.maximum.reduceat(pairwise, starts, axis=1).T).sum(axis=1) / len(left)
+            backward = np.add.reduceat(pairwise.max(axis=0), starts) / counts
+            result[filled] = (forward + backward) / 2.0
+        else:
+            totals = np.ascontiguousarray(np.add.reduceat(pairwise, starts, axis=1).T).sum(axis=1)
+            result[filled] = totals / (len(left) * counts)
+        return result
+
+    def overlap(self, left: set[str], right: set[str], *, mode: str = "max") -> float:
+        """`overlaps` for a single pair of tag sets."""
+
+        return float(self.overlaps(left, [right], mode=mode)[0])
@@ -0,0 +1,138 @@
+"""Incremental maintenance of stored top-k networking lists.
+
+When one attendee edits their profile only their own list has to be rebuilt;
+everyone else's list changes only where that attendee enters or leaves it.
+`similarity()` is symmetric, so a single row of scores covers both directions.
+
+Each stored list keeps a `kth` summary (`kth_entry`) of the entry a newcomer
+has to beat, so lists the attendee is not in can be checked without reading
+their entries.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+
+import numpy as np
+
+from .batch import recommend_rows, recommendation_entry
+from .lsh import MinHashLSH
+from .matrix import AttendeeMatrix
+
+
+def _match_id(entry: dict):
+    return (entry.get("match") or {}).get("id")
+
+
+def kth_entry(recommendations: list[dict], limit: int) -> dict | None:
+    """Score and user id of the last entry of a full list; None while the
+    list is shorter than `limit`, since anyone can still enter it."""
+
+    if len(recommendations) < limit:
+        return None
+    last = recommendations[limit - 1]
+    return {"score": last["score"], "user_id": _match_id(last)}
+
+
+def _beats(score: float, row: int, kth: dict | None, rows: dict[str, int]) -> bool:
+    # Same order as `select_top_k`: score descending, then population row.
+    if kth is None:
+        return True
+    if score != kth["score"]:
+        return score > kth["score"]
+    return row < rows.get(kth["user_id"], len(rows))
+
+
+def entering_users(
+    matrix: AttendeeMatrix,
+    row: int,
+    rows: dict[str, int],
+    summaries: Iterable[dict],
+) -> list[str]:
+    """Users whose stored list the attendee at `row` now enters.
+
+    `summaries` are stored documents projected to `user_id` and `kth`, for
+    lists that do not contain the attendee yet; `rows` maps user ids to rows
+    of `matrix`. Lists stored without `kth` are always returned.
+    """
+
+    scores = matrix.scores(row)
+    eligible = matrix.candidate_mask(row)
+    found = []
+    for summary in summaries:
+        other_row = rows.get(summary["user_id"])
+        if other_row is None or not eligible[other_row]:
+            continue
+        if "kth" not in summary or _beats(float(scores[other_row]), row, summary["kth"], rows):
+            found.append(summary["user_id"])
+    return found
+
+
+def patch_recommendations(
+    matrix: AttendeeMatrix,
+    row: int,
+    rows: dict[str, int],
+    stored: dict[str, dict],
+    *,
+    default_limit: int = 3,
+    lsh: MinHashLSH | None = None,
+) -> dict[str, list[dict]]:
+    """New recommendation lists for the users in `stored` after a change to `row`.
+
+    `stored` maps user id to its stored document (`recommendations`, `limit`)
+    and should hold the lists the changed attendee is in or enters (see
+    `entering_users`). Lists where its score holds or improves, or where it
+    newly enters, are patched in place; lists where its score dropped are
+    recomputed because the next-best candidate is not known from the stored
+    top-k, with `lsh` when the population is scored approximately.
+    """
+
+    subject = matrix.attendees[row]
+    subject_id = subject.get("id")
+    own_limit = stored.get(subject_id, {}).get("limit", default_limit)
+    updates = {subject_id: recommend_rows(matrix, [row], limit=own_limit, lsh=lsh)[0]["recommendations"]}
+
+    others = [
+        (user_id, rows[user_id])
+        for user_id in stored
+        if user_id != subject_id and rows.get(user_id) is not None
+    ]
+    columns = np.asarray([other_row for _, other_row in others], dtype=np.int64)
+    scores = matrix.block_scores([row], columns)[0] if others else []
+    eligible = matrix.candidate_mask(row)
+    recompute: dict[int, list[int]] = defaultdict(list)
+
+    def order(entry: dict) -> tuple[float, int]:
+        return -entry["score"], rows.get(_match_id(entry), len(rows))
+
+    for (user_id, other_row), score in zip(others, scores):
+        if not eligible[other_row]:
+            continue
+        document = stored[user_id]
+        other = matrix.attendees[other_row]
+        recommendations = list(document.get("recommendations") or [])
+        limit = document.get("limit", default_limit)
+        score = float(score)
+        position = next(
+            (i for i, entry in enumerate(recommendations) if _match_id(entry) == subject_id),
+            None,
+        )
+
+        if position is not None:
+            if score < recommendations[position]["score"]:
+                recompute[limit].append(other_row)
+                continue
+            recommendations[position] = recommendation_entry(other, subject, score)
+        elif _beats(score, row, kth_entry(recommendations, limit), rows):
+            recommendations.append(recommendation_entry(other, subject, score))
+        else:
+            continue
+
+        updates[user_id] = sorted(recommendations, key=order)[:limit]
+
+    for limit, recompute_rows in recompute.items():
+        for result in recommend_rows(matrix, recompute_rows, limit=limit, lsh=lsh):
+            updates[result["user_id"]] = result["recommendations"]
+
+    return updates
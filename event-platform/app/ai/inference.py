@@ -0,0 +1,166 @@
+"""Inference executor: model and scoring work off the event loop.
+
+Query encoding and retrieval scoring are CPU-bound; run inline in an
+`async def` handler they stall every other request on the worker. The
+`InferenceExecutor` runs them on a small thread pool (torch and numpy release
+the GIL while they compute) and:
+
+- micro-batches concurrent query encodes: requests arriving within
+  `batch_window` seconds of each other share one `encode()` call, up to
+  `max_batch` texts;
+- bounds the work it accepts: beyond `max_pending` queued or running jobs,
+  new work is rejected with `InferenceBusy` so callers can shed load
+  (HTTP 503) instead of queueing without limit;
+- records queue wait, batch size and run time for `/api/ai/health`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+
+# Samples kept per metric for percentiles.
+_METRIC_WINDOW = 1024
+
+
+class InferenceBusy(RuntimeError):
+    """The executor is at `max_pending`; retry later."""
+
+
+class _Metric:
+    def __init__(self) -> None:
+        self.count = 0
+        self.samples: deque[float] = deque(maxlen=_METRIC_WINDOW)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.samples.append(value)
+
+    def summary(self, scale: float = 1.0) -> dict[str, float]:
+        if not self.samples:
+            return {"count": self.count}
+        values = np.fromiter(self.samples, dtype=np.float64) * scale
+        return {
+            "count": self.count,
+            "mean": round(float(values.mean()), 3),
+            "p50": round(float(np.percentile(values, 50)), 3),
+            "p99": round(float(np.percentile(values, 99)), 3),
+            "max": round(float(values.max()), 3),
+        }
+
+
+class InferenceExecutor:
+    def __init__(
+        self,
+        encode_batch: Callable[[list[str]], np.ndarray],
+        *,
+        workers: int = 1,
+        max_pending: int = 64,
+        max_batch: int = 32,
+        batch_window: float = 0.005,
+    ) -> None:
+        self.encode_batch = encode_batch
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.rejected = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self._pending = 0
+        self._queue: asyncio.Queue | None = None
+        self._batcher: asyncio.Task | None = None
+        self.queue_wait = _Metric()
+        self.batch_size = _Metric()
+        self.run_time = _Metric()
+
+    def _admit(self) -> None:
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise InferenceBusy(f"inference queue is full ({self.max_pending} pending)")
+        self._pending += 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """`fn(*args, **kwargs)` on the inference pool."""
+
+        self._admit()
+        queued = time.perf_counter()
+        try:
+
+            def call():
+                started = time.perf_counter()
+                self.queue_wait.add(started - queued)
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.run_time.add(time.perf_counter() - started)
+
+            return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+        finally:
+            self._pending -= 1
+
+    async def encode(self, text: str) -> np.ndarray:
+        """Embedding of `text`, encoded together with concurrent requests."""
+
+        self._admit()
+        try:
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            if self._batcher is None or self._batcher.done():
+                self._batcher = asyncio.create_task(self._batch_loop())
+            future = asyncio.get_running_loop().create_future()
+            await self._queue.put((text, future, time.perf_counter()))
+            return await future
+        finally:
+            self._pending -= 1
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            started = time.perf_counter()
+            for _, _, queued in batch:
+                self.queue_wait.add(started - queued)
+            self.batch_size.add(len(batch))
+            try:
+                vectors = await loop.run_in_executor(self._pool, self.encode_batch, [text for text, _, _ in batch])
+            except Exception as exc:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            finally:
+                self.run_time.add(time.perf_counter() - started)
+            for (_, future, _), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "queue_wait_ms": self.queue_wait.summary(1e3),
+            "batch_size": self.batch_size.summary(),
+            "run_ms": self.run_time.summary(1e3),
+        }
+
+    def shutdown(self) -> None:
+        if self._batcher is not None:
+            self._batcher.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,99 @@
+"""Structured analytics questions recognized before RAG retrieval.
+
+Counting and listing questions ("how many events", "total capacity",
+"attendees of PyCon") have exact answers in MongoDB; answering them from
+retrieved snapshot passages means materializing every event and attendee
+first. `parse_intent` maps such a question to an `Intent`, which
+`AnalyticsService` answers with a targeted query. Anything else returns None
+and goes to retrieval as before.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+INTENTS = ("event_count", "user_count", "registration_count", "capacity", "locations", "event_list", "attendees")
+
+# References that mean the whole platform (or organization), not one event.
+_NOT_AN_EVENT = re.compile(
+    r"^(?:all|every|each|our|my|these|those|the)?\s*(?:events?|platform|organi[sz]ation|total|now|today|here|it|them)$",
+    re.IGNORECASE,
+)
+
+# What may follow a question's subject: "are there", "registered so far",
+# then optionally the event it is about ("for PyCon", "attending RustConf").
+# Anything else ("how many tickets can I buy", "which events offer food")
+# is a free-text question and goes to retrieval.
+_TAIL = (
+    r"(?:\s+(?:are|is|were|do we have|do you have|have|has))?"
+    r"(?:\s+(?:there|registered|attending|coming|signed up|so far|in total|total|now|today|this year|"
+    r"happening|held|located|taking place|left|available|remaining|upcoming|scheduled))*"
+    r"(?:\s+(?:for|of|at|to|in|attending)\s+(?:the\s+)?(?:event\s+)?[\"']?(?P<event>[^\"'?]+?)[\"']?)?\s*[?.!]*$"
+)
+_ATTENDEE_NOUNS = r"(?:attendees|registrants|participants)"
+
+
+def _subject(pattern: str) -> re.Pattern:
+    return re.compile(rf"\b(?:{pattern}){_TAIL}", re.IGNORECASE)
+
+
+# First match wins; more specific intents come first.
+_PATTERNS = [
+    (
+        "attendees",
+        _subject(
+            rf"(?:who|list|show|name)(?: me)?(?: all)?(?: the)? {_ATTENDEE_NOUNS}"
+            r"|who(?: is| are|'s)(?= (?:attending|coming|registered)\b)"
+        ),
+    ),
+    (
+        "capacity",
+        _subject(
+            r"(?:what(?:'s| is) the (?:total )?|total )capacity"
+            r"|(?:how many )?(?:seats|spots)(?: are)? (?:left|available|remaining)"
+        ),
+    ),
+    ("user_count", _subject(r"how many users|(?:number|count) of users")),
+    (
+        "registration_count",
+        _subject(
+            rf"how many (?:{_ATTENDEE_NOUNS}|registrations)|(?:number|count) of (?:{_ATTENDEE_NOUNS}|registrations)"
+            r"|how many people(?= (?:are |have )?(?:registered|attending|coming|signed up))"
+        ),
+    ),
+    ("event_count", _subject(r"how many events|(?:number|count) of events")),
+    (
+        "locations",
+        _subject(r"where (?:are|is) (?:the |all |our )?events|event locations?|locations? of (?:the |all )?events"),
+    ),
+    ("event_list", _subject(r"(?:what|which) events|(?:list|show)(?: me)?(?: all| the)* events")),
+]
+
+
+@dataclass(frozen=True)
+class Intent:
+    kind: str
+    # Event named in the question, if any (e.g. "PyCon 2025").
+    event: str | None = None
+
+
+def parse_intent(query: str) -> Intent | None:
+    """The analytics intent of `query`, or None for a free-text question."""
+
+    text = " ".join((query or "").split())
+    if not text:
+        return None
+    for kind, pattern in _PATTERNS:
+        match = pattern.search(text)
+        if match is not None:
+            return Intent(kind=kind, event=_event_reference(match))
+    return None
+
+
+def _event_reference(match: re.Match) -> str | None:
+    event = (match.group("event") or "").strip()
+    # "for all events", "in the organization": not a single event.
+    if not event or _NOT_AN_EVENT.match(event):
+        return None
+    return event
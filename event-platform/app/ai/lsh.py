@@ -0,0 +1,132 @@
+"""MinHash/LSH candidate generation for very large events.
+
+The interest, skill and goal components of `similarity()` are Jaccard
+indexes, which MinHash estimates: two tag sets share a given MinHash value
+with probability equal to their Jaccard similarity. Signatures of
+`bands * rows` values are split into `bands` bands; attendees whose band
+values are identical land in the same bucket. Only colliding attendees are
+then scored exactly by `AttendeeMatrix`.
+
+More bands raise recall, more rows per band raise precision: a pair with
+Jaccard `j` collides in at least one band with probability
+`1 - (1 - j ** rows) ** bands`.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .matrix import AttendeeMatrix, _TagField
+from .similarity import TAG_FIELDS, _to_normalized_set
+
+_PRIME = np.uint64((1 << 31) - 1)
+_EMPTY = np.uint32(0xFFFFFFFF)
+# Rows per chunk when reducing tag hashes to signatures; bounds peak memory.
+_SIGNATURE_CHUNK = 20000
+
+
+class MinHashLSH:
+    """Per-field MinHash signatures and LSH band buckets over an AttendeeMatrix."""
+
+    def __init__(
+        self,
+        matrix: AttendeeMatrix,
+        *,
+        bands: int = 16,
+        rows: int = 3,
+        seed: int = 0,
+    ) -> None:
+        if bands < 1 or rows < 1:
+            raise ValueError("bands and rows must be positive")
+
+        self.matrix = matrix
+        self.bands = bands
+        self.rows = rows
+        rng = np.random.default_rng(seed)
+        permutations = bands * rows
+        self._a = rng.integers(1, int(_PRIME), size=permutations, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=permutations, dtype=np.uint64)
+        self._mix = rng.integers(1, 1 << 63, size=rows, dtype=np.uint64) | np.uint64(1)
+
+        # field -> (band order, band keys sorted), each shaped (bands, size)
+        self._tables: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for key in TAG_FIELDS:
+            keys = self._band_keys(self._signatures(matrix.fields[key]))
+            order = np.argsort(keys, axis=1, kind="stable").astype(np.int32)
+            self._tables[key] = (order, np.take_along_axis(keys, order, axis=1))
+
+    # ── Signatures ────────────────────────────────────────────────────────
+
+    def _tag_hashes(self, tag_ids: np.ndarray) -> np.ndarray:
+        values = tag_ids.astype(np.uint64)[:, None]
+        return ((self._a[None, :] * values + self._b[None, :]) % _PRIME).astype(np.uint32)
+
+    def _signatures(self, field: _TagField) -> np.ndarray:
+        size = len(field.sizes)
+        signatures = np.full((size, len(self._a)), _EMPTY, dtype=np.uint32)
+        tag_hashes = self._tag_hashes(np.arange(len(field.vocab), dtype=np.int64))
+
+        for start in range(0, size, _SIGNATURE_CHUNK):
+            stop = min(start + _SIGNATURE_CHUNK, size)
+            filled = np.flatnonzero(field.sizes[start:stop]) + start
+            if filled.size == 0:
+                continue
+            begin, end = field.row_ptr[start], field.row_ptr[stop]
+            values = tag_hashes[field.row_tags[begin:end]]
+            signatures[filled] = np.minimum.reduceat(values, field.row_ptr[filled] - begin, axis=0)
+        return signatures
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """One 64-bit key per (band, attendee); shape (bands, size)."""
+
+        banded = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        keys = (banded * self._mix[None, None, :]).sum(axis=2, dtype=np.uint64)
+        return np.ascontiguousarray(keys.T)
+
+    # ── Queries ───────────────────────────────────────────────────────────
+
+    def candidates(self, subject: int | dict) -> np.ndarray:
+        """Attendee rows that share at least one band bucket with `subject`."""
+
+        found: list[np.ndarray] = []
+        for key in TAG_FIELDS:
+            field = self.matrix.fields[key]
+            if isinstance(subject, dict):
+                tag_ids = field.encode(_to_normalized_set(subject.get(key)))
+            else:
+                tag_ids = field.row(subject)
+            if tag_ids.size == 0:
+                continue
+
+            signature = self._tag_hashes(tag_ids).min(axis=0)[None, :]
+            subject_keys = self._band_keys(signature)[:, 0]
+            order, sorted_keys = self._tables[key]
+            for band in range(self.bands):
+                lo = np.searchsorted(sorted_keys[band], subject_keys[band], side="left")
+                hi = np.searchsorted(sorted_keys[band], subject_keys[band], side="right")
+                if hi > lo:
+                    found.append(order[band, lo:hi])
+
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(found)).astype(np.int64)
+
+    def top_k(
+        self,
+        subject: int | dict,
+        *,
+        limit: int = 3,
+        min_score: float = 0.0,
+    ) -> list[tuple[int, float]]:
+        """Approximate top-k: exact scores, but only over colliding attendees.
+
+        Subjects with too few collisions (e.g. no tags at all) fall back to the
+        exact full scan, so a short list is never returned just because of LSH.
+        """
+
+        rows = self.candidates(subject)
+        # The subject collides with itself; only other attendees count.
+        rows = rows[self.matrix.candidate_mask(subject)[rows]]
+        if rows.size < limit:
+            return self.matrix.top_k(subject, limit=limit, min_score=min_score)
+        return self.matrix.top_k_among(subject, rows, limit=limit, min_score=min_score)
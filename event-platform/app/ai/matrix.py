@@ -0,0 +1,426 @@
+"""Vectorized similarity engine over an encoded attendee population.
+
+Every attendee is encoded once: interests, skills and goals become sparse
+tag postings (tag -> attendee rows, and attendee -> tag ids), while industry,
+role, role group, location and region become integer code arrays. Scores for
+one subject (or a block of subjects) against everyone are then computed in a
+handful of NumPy passes instead of one `similarity()` call per pair.
+
+`similarity.similarity` stays the reference implementation; scores produced
+here are bit-for-bit identical to it, including the final 3-decimal rounding.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from .similarity import (
+    CITY_TO_REGION,
+    COMPLEMENTARY_GROUPS,
+    ROLE_GROUPS,
+    TAG_FIELDS,
+    WEIGHTS,
+    _role_group,
+    _to_normalized_set,
+)
+
+_GROUP_NAMES = list(ROLE_GROUPS)
+
+
+def _group_pair_table() -> np.ndarray:
+    """Role score for two *different* roles, indexed by their group codes."""
+
+    size = len(_GROUP_NAMES)
+    table = np.empty((size, size), dtype=np.float64)
+    for i, left in enumerate(_GROUP_NAMES):
+        for j, right in enumerate(_GROUP_NAMES):
+            if i == j:
+                table[i, j] = 0.65
+            elif frozenset({left, right}) in COMPLEMENTARY_GROUPS:
+                table[i, j] = 1.0
+            else:
+                table[i, j] = 0.5
+    return table
+
+
+_GROUP_TABLE = _group_pair_table()
+
+
+class _Interner:
+    """Maps hashable values to dense integer codes; missing values map to -1."""
+
+    def __init__(self) -> None:
+        self.codes: dict = {}
+
+    def code(self, value) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.codes)
+            self.codes[value] = code
+        return code
+
+    def lookup(self, value) -> int:
+        if value is None:
+            return -1
+        return self.codes.get(value, -1)
+
+
+class _TagField:
+    """Sparse encoding of one set-valued profile field.
+
+    `row_ptr`/`row_tags` list the tag ids of each attendee (CSR), and
+    `tag_ptr`/`tag_rows` list the attendee rows of each tag (CSC).
+    """
+
+    def __init__(self, tag_sets: list[set[str]]) -> None:
+        self.vocab: dict[str, int] = {}
+        row_tags: list[int] = []
+        sizes = np.zeros(len(tag_sets), dtype=np.int64)
+        for row, tags in enumerate(tag_sets):
+            sizes[row] = len(tags)
+            for tag in tags:
+                tag_id = self.vocab.get(tag)
+                if tag_id is None:
+                    tag_id = len(self.vocab)
+                    self.vocab[tag] = tag_id
+                row_tags.append(tag_id)
+
+        self.sizes = sizes
+        self.row_ptr = np.zeros(len(tag_sets) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.row_ptr[1:])
+        self.row_tags = np.asarray(row_tags, dtype=np.int64)
+
+        rows = np.repeat(np.arange(len(tag_sets), dtype=np.int64), sizes)
+        order = np.argsort(self.row_tags, kind="stable")
+        self.tag_rows = rows[order]
+        counts = np.bincount(self.row_tags, minlength=len(self.vocab))
+        self.tag_ptr = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.tag_ptr[1:])
+
+    def encode(self, tags: set[str]) -> np.ndarray:
+        """Tag ids of an external set; tags outside the vocabulary are dropped."""
+
+        return np.fromiter(
+            (self.vocab[tag] for tag in tags if tag in self.vocab), dtype=np.int64
+        )
+
+    def row(self, index: int) -> np.ndarray:
+        return self.row_tags[self.row_ptr[index] : self.row_ptr[index + 1]]
+
+    def postings(self, tag_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Attendee rows for `tag_ids`, plus the position of the owning tag."""
+
+        return _gather(self.tag_ptr, self.tag_rows, tag_ids)
+
+    def subset_intersections(self, tag_lists: Sequence[np.ndarray], columns: np.ndarray) -> np.ndarray:
+        """Like `intersections`, but only against the attendee rows in `columns`."""
+
+        row_tags, owner = _gather(self.row_ptr, self.row_tags, columns)
+        counts = np.empty((len(tag_lists), len(columns)), dtype=np.int64)
+        for offset, tags in enumerate(tag_lists):
+            hits = np.isin(row_tags, tags)
+            counts[offset] = np.bincount(owner[hits], minlength=len(columns))
+        return counts
+
+    def intersections(self, tag_lists: Sequence[np.ndarray], size: int) -> np.ndarray:
+        """Intersection counts of every tag list against every attendee row."""
+
+        if not tag_lists:
+            return np.zeros((0, size), dtype=np.int64)
+        lengths = np.array([len(tags) for tags in tag_lists], dtype=np.int64)
+        all_tags = np.concatenate(tag_lists) if lengths.sum() else np.zeros(0, dtype=np.int64)
+        subject_of_tag = np.repeat(np.arange(len(tag_lists), dtype=np.int64), lengths)
+        rows, owner = self.postings(all_tags)
+        flat = subject_of_tag[owner] * size + rows
+        counts = np.bincount(flat, minlength=len(tag_lists) * size)
+        return counts.reshape(len(tag_lists), size)
+
+
+def _gather(ptr: np.ndarray, values: np.ndarray, index: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenate the CSR segments `values[ptr[i]:ptr[i + 1]]` for i in `index`.
+
+    Also returns, for every gathered value, the position in `index` it came from.
+    """
+
+    starts = ptr[index]
+    lengths = ptr[index + 1] - starts
+    owner = np.repeat(np.arange(len(index), dtype=np.int64), lengths)
+    offsets = np.arange(int(lengths.sum()), dtype=np.int64)
+    offsets -= np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return values[np.repeat(starts, lengths) + offsets], owner
+
+
+def _jaccard(counts: np.ndarray, left_sizes: np.ndarray, right_sizes: np.ndarray) -> np.ndarray:
+    union = left_sizes[:, None] + right_sizes[None, :] - counts
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = counts / union
+    empty = (left_sizes[:, None] == 0) | (right_sizes[None, :] == 0)
+    return np.where(empty, 0.0, scores)
+
+
+def round_scores(blended: np.ndarray) -> np.ndarray:
+    """Vectorized `round(x, 3)` that agrees exactly with Python's `round`.
+
+    `np.round` scales by 1000 before rounding, which can land on the other side
+    of a half-way point; values close to one are re-rounded in Python. Scores
+    take few distinct values, so each distinct value is rounded only once.
+    """
+
+    rounded = np.round(blended, 3)
+    scaled = blended * 1000.0
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        values, inverse = np.unique(blended[near_tie], return_inverse=True)
+        exact = np.array([round(float(value), 3) for value in values], dtype=np.float64)
+        rounded[near_tie] = exact[inverse]
+    return rounded
+
+
+class AttendeeMatrix:
+    """Encoded attendee population for vectorized `similarity()` scoring."""
+
+    def __init__(self, attendees: Sequence[dict]) -> None:
+        self.attendees = list(attendees)
+        size = len(self.attendees)
+        self.size = size
+
+        self._ids = _Interner()
+        self._industries = _Interner()
+        self._roles = _Interner()
+        self._locations = _Interner()
+        self._regions = _Interner()
+
+        self.fields = {
+            key: _TagField([_to_normalized_set(a.get(key)) for a in self.attendees])
+            for key in TAG_FIELDS
+        }
+
+        self.id_codes = np.empty(size, dtype=np.int64)
+        self.industry_codes = np.empty(size, dtype=np.int64)
+        self.role_codes = np.empty(size, dtype=np.int64)
+        self.group_codes = np.empty(size, dtype=np.int64)
+        self.location_codes = np.empty(size, dtype=np.int64)
+        self.region_codes = np.empty(size, dtype=np.int64)
+
+        for row, attendee in enumerate(self.attendees):
+            # `None` is a legitimate id here: recommend_connections treats two
+            # id-less profiles as the same person, so it gets a real code.
+            self.id_codes[row] = self._ids.codes.setdefault(attendee.get("id"), len(self._ids.codes))
+            codes = self._context_codes(attendee, intern=True)
+            (
+                self.industry_codes[row],
+                self.role_codes[row],
+                self.group_codes[row],
+                self.location_codes[row],
+                self.region_codes[row],
+            ) = codes
+
+    # ── Encoding ──────────────────────────────────────────────────────────
+
+    def _context_codes(self, profile: dict, *, intern: bool) -> tuple[int, int, int, int, int]:
+        get = (lambda table, value: table.code(value)) if intern else (lambda table, value: table.lookup(value))
+
+        industry = profile.get("industry")
+        role = profile.get("role")
+        location = profile.get("location")
+
+        industry_code = get(self._industries, industry) if industry else -1
+        # Unknown roles still need a distinct code so "both present" holds.
+        role_code = get(self._roles, role) if role else -1
+        if role and role_code == -1:
+            role_code = -2
+        group = _role_group(role)
+        group_code = _GROUP_NAMES.index(group) if group else -1
+
+        location_code = -1
+        region_code = -1
+        if location:
+            normalized = location.strip().lower()
+            location_code = get(self._locations, normalized)
+            if location_code == -1:
+                location_code = -2
+            region = CITY_TO_REGION.get(normalized)
+            region_code = get(self._regions, region) if region else -1
+        return industry_code, role_code, group_code, location_code, region_code
+
+    def index_of(self, subject: dict) -> int | None:
+        """Row of `subject` if it is one of the encoded attendee objects."""
+
+        for row, attendee in enumerate(self.attendees):
+            if attendee is subject:
+                return row
+        return None
+
+    # ── Scoring ───────────────────────────────────────────────────────────
+
+    def _subject_arrays(self, subjects: Sequence[int | dict]) -> dict:
+        tags: dict[str, list[np.ndarray]] = {key: [] for key in TAG_FIELDS}
+        sizes: dict[str, list[int]] = {key: [] for key in TAG_FIELDS}
+        context = []
+        for subject in subjects:
+            if isinstance(subject, dict):
+                for key in TAG_FIELDS:
+                    normalized = _to_normalized_set(subject.get(key))
+                    tags[key].append(self.fields[key].encode(normalized))
+                    sizes[key].append(len(normalized))
+                context.append(self._context_codes(subject, intern=False))
+            else:
+                for key in TAG_FIELDS:
+                    tags[key].append(self.fields[key].row(subject))
+                    sizes[key].append(int(self.fields[key].sizes[subject]))
+                context.append(
+                    (
+                        self.industry_codes[subject],
+                        self.role_codes[subject],
+                        self.group_codes[subject],
+                        self.location_codes[subject],
+                        self.region_codes[subject],
+                    )
+                )
+        return {
+            "tags": tags,
+            "sizes": {key: np.asarray(sizes[key], dtype=np.int64) for key in TAG_FIELDS},
+            "context": np.asarray(context, dtype=np.int64).reshape(len(subjects), 5),
+        }
+
+    def raw_block_scores(
+        self,
+        subjects: Sequence[int | dict],
+        columns: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Unrounded blended scores, shape (len(subjects), size).
+
+        Subjects are attendee rows or external profile dicts. With `columns`,
+        only those attendee rows are scored and the result has one column per
+        entry. Components are accumulated in `WEIGHTS` order so float results
+        match `similarity()`.
+        """
+
+        encoded = self._subject_arrays(subjects)
+        context = encoded["context"]
+        components: dict[str, np.ndarray] = {}
+        pick = (lambda values: values) if columns is None else (lambda values: values[columns])
+        width = self.size if columns is None else len(columns)
+
+        for key in TAG_FIELDS:
+            field = self.fields[key]
+            if columns is None:
+                counts = field.intersections(encoded["tags"][key], self.size)
+            else:
+                counts = field.subset_intersections(encoded["tags"][key], columns)
+            components[key] = _jaccard(counts, encoded["sizes"][key], pick(field.sizes))
+
+        industry = context[:, 0:1]
+        components["industry"] = ((industry >= 0) & (industry == pick(self.industry_codes)[None, :])).astype(np.float64)
+
+        role, group = context[:, 1:2], context[:, 2:3]
+        other_role, other_group = pick(self.role_codes)[None, :], pick(self.group_codes)[None, :]
+        both_roles = (role != -1) & (other_role != -1)
+        # A role missing from the population vocabulary (-2) is never equal.
+        same_role = (role >= 0) & (role == other_role)
+        grouped = (group >= 0) & (other_group >= 0)
+        pair = _GROUP_TABLE[np.maximum(group, 0), np.maximum(other_group, 0)]
+        components["role"] = np.where(
+            both_roles,
+            np.where(same_role, 0.7, np.where(grouped, pair, 0.4)),
+            0.0,
+        )
+
+        location, region = context[:, 3:4], context[:, 4:5]
+        other_location, other_region = pick(self.location_codes)[None, :], pick(self.region_codes)[None, :]
+        both_locations = (location != -1) & (other_location != -1)
+        same_location = (location >= 0) & (location == other_location)
+        same_region = (region >= 0) & (region == other_region)
+        components["location"] = np.where(
+            both_locations,
+            np.where(same_location, 1.0, np.where(same_region, 0.6, 0.0)),
+            0.0,
+        )
+
+        blended = np.zeros((len(subjects), width), dtype=np.float64)
+        for name in WEIGHTS:
+            blended = blended + WEIGHTS[name] * components[name]
+        return blended
+
+    def block_scores(
+        self,
+        subjects: Sequence[int | dict],
+        columns: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Scores rounded like `similarity()`, shape (len(subjects), size)."""
+
+        return round_scores(self.raw_block_scores(subjects, columns))
+
+    def scores(self, subject: int | dict) -> np.ndarray:
+        """`similarity(subject, attendee)` for every encoded attendee."""
+
+        return self.block_scores([subject])[0]
+
+    def candidate_mask(self, subject: int | dict) -> np.ndarray:
+        """Rows that recommend_connections would consider for `subject`."""
+
+        if isinstance(subject, dict):
+            row = self.index_of(subject)
+            subject_id = self._ids.codes.get(subject.get("id"), -1)
+        else:
+            row = subject
+            subject_id = self.id_codes[subject]
+        mask = self.id_codes != subject_id
+        if row is not None:
+            mask[row] = False
+        return mask
+
+    def top_k(
+        self,
+        subject: int | dict,
+        *,
+        limit: int = 3,
+        min_score: float = 0.0,
+        scores: np.ndarray | None = None,
+    ) -> list[tuple[int, float]]:
+        """Best `(row, score)` pairs, ordered exactly like recommend_connections."""
+
+        if scores is None:
+            scores = self.scores(subject)
+        eligible = self.candidate_mask(subject) & (scores >= min_score)
+        return select_top_k(scores, eligible, limit)
+
+
+    def top_k_among(
+        self,
+        subject: int | dict,
+        rows: np.ndarray,
+        *,
+        limit: int = 3,
+        min_score: float = 0.0,
+    ) -> list[tuple[int, float]]:
+        """`top_k` restricted to candidate `rows` (e.g. from an ANN index)."""
+
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        scores = self.block_scores([subject], rows)[0]
+        eligible = self.candidate_mask(subject)[rows] & (scores >= min_score)
+        return [(int(rows[i]), score) for i, score in select_top_k(scores, eligible, limit)]
+
+
+def select_top_k(scores: np.ndarray, eligible: np.ndarray, limit: int) -> list[tuple[int, float]]:
+    """Top `limit` eligible rows by score; ties keep the original row order.
+
+    Uses argpartition to find the cut-off score, so only the winners are sorted.
+    """
+
+    rows = np.flatnonzero(eligible)
+    if limit <= 0 or rows.size == 0:
+        return []
+    values = scores[rows]
+    if rows.size > limit:
+        cutoff = values[np.argpartition(-values, limit - 1)[limit - 1]]
+        above = np.flatnonzero(values > cutoff)
+        ties = np.flatnonzero(values == cutoff)[: limit - above.size]
+        keep = np.sort(np.concatenate([above, ties]))
+        rows, values = rows[keep], values[keep]
+    order = np.argsort(-values, kind="stable")
+    return [(int(rows[i]), float(values[i])) for i in order]
@@ -4,7 +4,10 @@ from __future__ import annotations
 
 from collections.abc import Sequence
 
-from .similarity import similarity
+from .embeddings import TagEmbeddingCache
+from .lsh import MinHashLSH
+from .matrix import AttendeeMatrix
+from .similarity import TAG_FIELDS, _blend, _overlap_score, _to_normalized_set, similarity
 
 
 def recommend_connections(
@@ -13,8 +16,16 @@ def recommend_connections(
     *,
     limit: int = 3,
     min_score: float = 0.0,
+    semantic: TagEmbeddingCache | None = None,
+    semantic_mode: str = "max",
 ) -> list[dict]:
-    """Suggest the strongest attendee matches along with human-readable reasons."""
+    """Suggest the strongest attendee matches along with human-readable reasons.
+
+    With an available `semantic` cache, tags are also matched by meaning.
+    """
+
+    if semantic is not None and semantic.available:
+        return _recommend_semantic(subject, attendees, semantic, semantic_mode, limit=limit, min_score=min_score)
 
     matches: list[dict] = []
     for candidate in attendees:
@@ -25,21 +36,86 @@ def recommend_connections(
         if score < min_score:
             continue
 
-        overlap = _collect_overlap(subject, candidate)
-        reason = _reason_from_overlap(subject, candidate, overlap, score)
-        matches.append(
-            {
-                "match": candidate,
-                "score": score,
-                "reason": reason,
-                "overlap": overlap,
-            }
-        )
+        matches.append(_build_match(subject, candidate, score))
 
     matches.sort(key=lambda entry: entry["score"], reverse=True)
     return matches[:limit]
 
 
+def _recommend_semantic(
+    subject: dict,
+    attendees: Sequence[dict],
+    semantic: TagEmbeddingCache,
+    semantic_mode: str,
+    *,
+    limit: int,
+    min_score: float,
+) -> list[dict]:
+    """`similarity(..., semantic=...)` for every candidate, with the embedding
+    overlaps of each tag field computed in one vectorized pass."""
+
+    candidates = [
+        candidate
+        for candidate in attendees
+        if candidate is not subject and candidate.get("id") != subject.get("id")
+    ]
+    subject_tags = {key: _to_normalized_set(subject.get(key)) for key in TAG_FIELDS}
+    candidate_tags = {key: [_to_normalized_set(c.get(key)) for c in candidates] for key in TAG_FIELDS}
+    semantic_scores = {
+        key: semantic.overlaps(subject_tags[key], candidate_tags[key], mode=semantic_mode) for key in TAG_FIELDS
+    }
+
+    matches: list[dict] = []
+    for position, candidate in enumerate(candidates):
+        tags = {
+            key: max(
+                _overlap_score(subject_tags[key], candidate_tags[key][position]),
+                float(semantic_scores[key][position]),
+            )
+            for key in TAG_FIELDS
+        }
+        score = _blend(subject, candidate, tags)
+        if score >= min_score:
+            matches.append(_build_match(subject, candidate, score))
+
+    matches.sort(key=lambda entry: entry["score"], reverse=True)
+    return matches[:limit]
+
+
+def recommend_from_matrix(
+    matrix: AttendeeMatrix,
+    subject: int | dict,
+    *,
+    limit: int = 3,
+    min_score: float = 0.0,
+    lsh: MinHashLSH | None = None,
+) -> list[dict]:
+    """Vectorized `recommend_connections` over a pre-encoded population.
+
+    `subject` is either a row of `matrix` or an external profile dict. Returns
+    the same entries, in the same order, as the reference implementation.
+    With `lsh` (built over `matrix`), only attendees colliding with the subject
+    in some MinHash band are scored, trading exactness for speed.
+    """
+
+    subject_profile = subject if isinstance(subject, dict) else matrix.attendees[subject]
+    if lsh is not None:
+        top = lsh.top_k(subject, limit=limit, min_score=min_score)
+    else:
+        top = matrix.top_k(subject, limit=limit, min_score=min_score)
+    return [_build_match(subject_profile, matrix.attendees[row], score) for row, score in top]
+
+
+def _build_match(subject: dict, candidate: dict, score: float) -> dict:
+    overlap = _collect_overlap(subject, candidate)
+    return {
+        "match": candidate,
+        "score": score,
+        "reason": _reason_from_overlap(subject, candidate, overlap, score),
+        "overlap": overlap,
+    }
+
+
 def _collect_overlap(subject: dict, candidate: dict) -> dict[str, list[str]]:
     overlap: dict[str, list[str]] = {}
     for key in ("interests", "skills", "goals"):
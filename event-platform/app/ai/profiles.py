@@ -0,0 +1,161 @@
+"""Compact, interned attendee profiles for the networking layer.
+
+Profiles normally arrive as plain dicts, so every `similarity()` call
+re-normalizes each tag with `strip().lower()`, scans `ROLE_GROUPS` and looks
+up `CITY_TO_REGION`. A `ProfileStore` does that work once per attendee: tags
+are interned to integer ids kept in sorted arrays, and role group, region,
+industry and normalized location become small integer codes.
+
+`AttendeeProfile` also exposes a read-only `get()`/`[]` view of the original
+fields, so code written against dicts (reasons, starters, `AttendeeMatrix`)
+keeps working unchanged.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable
+
+from .similarity import (
+    CITY_TO_REGION,
+    COMPLEMENTARY_GROUPS,
+    TAG_FIELDS,
+    WEIGHTS,
+    _role_group,
+    _to_normalized_set,
+)
+
+_DISPLAY_FIELDS = ("id", "name", "company", "industry", "role", "location", "avatar")
+
+
+class ProfileStore:
+    """Interning tables shared by every profile of one population."""
+
+    def __init__(self) -> None:
+        self._strings: dict[str, str] = {}
+        self._tags: dict[str, int] = {}
+        self._codes: dict[str, dict] = {"industry": {}, "role": {}, "location": {}, "region": {}}
+
+    def _intern(self, value):
+        if isinstance(value, str):
+            return self._strings.setdefault(value, value)
+        return value
+
+    def _code(self, table: str, value) -> int:
+        codes = self._codes[table]
+        return codes.setdefault(value, len(codes))
+
+    def _tag_ids(self, values) -> array:
+        ids = {self._tags.setdefault(tag, len(self._tags)) for tag in _to_normalized_set(values)}
+        return array("i", sorted(ids))
+
+    def add(self, profile: dict) -> "AttendeeProfile":
+        compact = AttendeeProfile.__new__(AttendeeProfile)
+        compact._store = self
+        for key in _DISPLAY_FIELDS:
+            setattr(compact, key, self._intern(profile.get(key)))
+        for key in TAG_FIELDS:
+            raw = profile.get(key) or ()
+            setattr(compact, key, tuple(self._intern(value) for value in raw))
+            setattr(compact, f"_{key}_ids", self._tag_ids(raw))
+
+        industry = profile.get("industry")
+        role = profile.get("role")
+        location = profile.get("location")
+        compact._industry_code = self._code("industry", industry) if industry else -1
+        compact._role_code = self._code("role", role) if role else -1
+        compact._group = _role_group(role)
+        compact._location_code = -1
+        compact._region_code = -1
+        if location:
+            normalized = location.strip().lower()
+            region = CITY_TO_REGION.get(normalized)
+            compact._location_code = self._code("location", normalized)
+            compact._region_code = self._code("region", region) if region else -1
+        return compact
+
+    def add_many(self, profiles: Iterable[dict]) -> list["AttendeeProfile"]:
+        return [self.add(profile) for profile in profiles]
+
+
+def _overlap(left: array, right: array) -> float:
+    if not left or not right:
+        return 0.0
+    intersection = len(set(left).intersection(right))
+    return intersection / (len(left) + len(right) - intersection)
+
+
+class AttendeeProfile:
+    """Slot-based attendee profile; build instances with `ProfileStore.add`."""
+
+    __slots__ = (
+        "_store",
+        *_DISPLAY_FIELDS,
+        *TAG_FIELDS,
+        "_interests_ids",
+        "_skills_ids",
+        "_goals_ids",
+        "_industry_code",
+        "_role_code",
+        "_group",
+        "_location_code",
+        "_region_code",
+    )
+
+    def get(self, key: str, default=None):
+        if key in self.__slots__ and not key.startswith("_"):
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__ or key.startswith("_"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_dict(self) -> dict:
+        data = {key: getattr(self, key) for key in _DISPLAY_FIELDS}
+        data.update({key: list(getattr(self, key)) for key in TAG_FIELDS})
+        return data
+
+    def similarity_to(self, other: "AttendeeProfile") -> float | None:
+        """`similarity(self, other)` from interned codes, or None if the two
+        profiles come from different stores and their codes are not comparable."""
+
+        if other._store is not self._store:
+            return None
+
+        if self._role_code == -1 or other._role_code == -1:
+            role = 0.0
+        elif self._role_code == other._role_code:
+            role = 0.7
+        elif not self._group or not other._group:
+            role = 0.4
+        elif self._group == other._group:
+            role = 0.65
+        elif frozenset({self._group, other._group}) in COMPLEMENTARY_GROUPS:
+            role = 1.0
+        else:
+            role = 0.5
+
+        if self._location_code == -1 or other._location_code == -1:
+            location = 0.0
+        elif self._location_code == other._location_code:
+            location = 1.0
+        elif self._region_code != -1 and self._region_code == other._region_code:
+            location = 0.6
+        else:
+            location = 0.0
+
+        components = {
+            "interests": _overlap(self._interests_ids, other._interests_ids),
+            "skills": _overlap(self._skills_ids, other._skills_ids),
+            "goals": _overlap(self._goals_ids, other._goals_ids),
+            "industry": 1.0 if self._industry_code != -1 and self._industry_code == other._industry_code else 0.0,
+            "role": role,
+            "location": location,
+        }
+
+        blended = sum(WEIGHTS[name] * components[name] for name in WEIGHTS)
+        return round(blended, 3)
+
@@ -0,0 +1,51 @@
+"""Int8 scalar quantization of RAG document embeddings.
+
+Each float32 row `x` is stored as int8 codes `round(x / s)` with its own scale
+`s = max|x| / 127`, a quarter of the memory. A query stays float32, and its
+dot product with every row is one int8 x float32 `einsum` (the codes are
+widened block by block inside the loop, never as a full float copy) times
+the row scales. Rank order is close to the float path; `RagIndex` can
+re-score the best candidates against the float rows to recover the rest.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+QUANTIZATION_MODES = ("none", "int8")
+
+
+@dataclass
+class QuantizedEmbeddings:
+    # (n, dim) int8 codes and (n,) float32 scales: row i ~= codes[i] * scales[i].
+    codes: np.ndarray
+    scales: np.ndarray
+
+    @classmethod
+    def from_float(cls, matrix: np.ndarray, *, block: int = 8192) -> QuantizedEmbeddings:
+        matrix = np.asarray(matrix)
+        codes = np.empty(matrix.shape, dtype=np.int8)
+        scales = np.empty(len(matrix), dtype=np.float32)
+        # Blocks keep the float temporaries small for a memory-mapped matrix.
+        for start in range(0, len(matrix), block):
+            rows = np.asarray(matrix[start : start + block], dtype=np.float32)
+            peak = np.abs(rows).max(axis=1)
+            scale = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+            codes[start : start + block] = np.rint(rows / scale[:, None])
+            scales[start : start + block] = scale
+        return cls(codes=codes, scales=scales)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    def dot(self, query: np.ndarray) -> np.ndarray:
+        """Approximate `float_rows @ query` (float32, length n)."""
+
+        query = np.asarray(query, dtype=np.float32)
+        return np.einsum("ij,j->i", self.codes, query, dtype=np.float32) * self.scales
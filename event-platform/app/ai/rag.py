@@ -4,14 +4,29 @@ This is integrated from the approach in event_ai/ai/chatbot.py, but adapted to:
 - Accept frontend-shaped JSON (types.ts compatible)
 - Avoid hard dependency on SentenceTransformers at runtime
 
-If `sentence_transformers` is installed, we use it. Otherwise we fall back to a simple
-token-overlap similarity.
+If `sentence_transformers` is installed, we use it once `load_model()` (or the background
+`warm_up()`) has loaded the model. Until then, or without it, we fall back to BM25 over an
+inverted index (or, with `lexical="token-jaccard"`, a simple token-overlap similarity).
 """
 
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Any, Iterable
+from typing import TYPE_CHECKING, Any, Iterable
+
+import numpy as np
+
+from .bm25 import BM25Index
+from .embeddings import DEFAULT_MODEL
+from .matrix import select_top_k
+
+if TYPE_CHECKING:
+    from .embedding_store import EmbeddingStore
+    from .quantization import QuantizedEmbeddings
 
 
 def _tokenize(text: str) -> set[str]:
@@ -24,6 +39,25 @@ def _jaccard(a: set[str], b: set[str]) -> float:
     return len(a & b) / len(a | b)
 
 
+def inverse_row_norms(embeddings: np.ndarray) -> np.ndarray:
+    """1 / |row| per embedding (0 for zero rows), so cosine scores need no
+    normalized copy of a possibly memory-mapped matrix."""
+
+    norms = np.linalg.norm(embeddings, axis=1)
+    return np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+
+
+# Partitions documents are indexed under: FAQ entries are shared by every
+# tenant; anything not tied to an event is only searched in a corpus the
+# client supplied itself.
+FAQ_PARTITION = "faq"
+PLATFORM_PARTITION = "platform"
+
+
+def event_partition(event_id: str) -> str:
+    return f"event:{event_id}"
+
+
 @dataclass
 class RagDocument:
     text: str
@@ -31,27 +65,153 @@ class RagDocument:
     source: str
     metadata: dict[str, Any]
     embedding: Any | None = None
+    partitions: tuple[str, ...] = (PLATFORM_PARTITION,)
+
+
+def format_answer(query: str, ranked: list[tuple[RagDocument, float]]) -> dict:
+    """Chat response for `ranked` (best first) retrieved for `query`."""
+
+    if not (query or "").strip():
+        return {
+            "answer": "Ask me something about the event.",
+            "source": None,
+            "score": 0.0,
+            "metadata": {},
+            "passages": [],
+        }
+    if not ranked:
+        return {
+            "answer": "Sorry, I don't have information about that.",
+            "source": None,
+            "score": 0.0,
+            "metadata": {},
+            "passages": [],
+        }
+
+    passages = [
+        {
+            "text": doc.text,
+            "answer": doc.answer,
+            "source": doc.source,
+            "score": round(float(score), 4),
+            "metadata": doc.metadata,
+        }
+        for doc, score in ranked
+    ]
+    best = passages[0]
+    return {
+        "answer": best["answer"],
+        "source": best["source"],
+        "score": best["score"],
+        "metadata": best["metadata"],
+        "passages": passages,
+    }
+
+
+def _partitions(*event_ids: str | None) -> tuple[str, ...]:
+    partitions = tuple(dict.fromkeys(event_partition(event_id) for event_id in event_ids if event_id))
+    return partitions or (PLATFORM_PARTITION,)
+
+
+LEXICAL_BACKENDS = ("bm25", "token-jaccard")
 
 
 class RagEngine:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        batch_size: int = 64,
+        store: "EmbeddingStore | None" = None,
+        lexical: str = "bm25",
+        model_name: str = DEFAULT_MODEL,
+    ) -> None:
+        if lexical not in LEXICAL_BACKENDS:
+            raise ValueError(f"unknown lexical backend: {lexical!r}")
+        self.batch_size = batch_size
+        self.store = store
+        self.lexical = lexical
+        self.model_name = model_name
         self._model = None
         self._use_st = False
-        try:
-            from sentence_transformers import SentenceTransformer  # type: ignore
+        # idle -> loading -> ready | unavailable (not installed) | failed
+        self.warmup_state = "idle"
+        self.warmup_seconds: float | None = None
+        self.warmup_error: str | None = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def backend(self) -> str:
+        return "sentence-transformers" if self._use_st else self.lexical
+
+    def load_model(self) -> bool:
+        """Load the sentence-transformers model once; True when it is usable.
 
-            self._model = SentenceTransformer("all-MiniLM-L6-v2")
-            self._use_st = True
-        except Exception:
-            self._model = None
-            self._use_st = False
+        Blocking: call it from a worker thread (see `warm_up`). Queries keep
+        using the lexical backend while it runs.
+        """
+
+        with self._load_lock:
+            if self.warmup_state != "idle":
+                return self._use_st
+            self.warmup_state = "loading"
+            started = time.perf_counter()
+            try:
+                from sentence_transformers import SentenceTransformer  # type: ignore
+
+                self._model = SentenceTransformer(self.model_name)
+                self._use_st = True
+                self.warmup_state = "ready"
+            except ImportError:
+                self.warmup_state = "unavailable"
+            except Exception as exc:
+                self.warmup_error = str(exc)
+                self.warmup_state = "failed"
+            finally:
+                self.warmup_seconds = time.perf_counter() - started
+            return self._use_st
+
+    async def warm_up(self) -> bool:
+        """`load_model` off the event loop."""
+
+        return await asyncio.to_thread(self.load_model)
+
+    def lexical_index(self, docs: Sequence[RagDocument], backend: str | None = None) -> BM25Index | None:
+        """Inverted index for `docs` when the BM25 backend answers queries."""
+
+        if (backend or self.backend) != "bm25":
+            return None
+        return BM25Index([doc.text for doc in docs])
 
     def _encode(self, text: str):
         if not self._use_st:
             return None
-        return self._model.encode(text, convert_to_tensor=True)
+        return np.asarray(self._model.encode(text, convert_to_numpy=True), dtype=np.float32)
+
+    def encode_batch(self, texts: list[str]) -> np.ndarray:
+        """(len(texts), dim) float32 embeddings, encoded `batch_size` at a time."""
+
+        encoded = self._model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True)
+        return np.asarray(encoded, dtype=np.float32).reshape(len(texts), -1)
+
+    def embed_documents(self, docs: list[RagDocument]) -> np.ndarray | None:
+        """Embed `docs` in batches and return their (len(docs), dim) matrix.
+
+        With a `store`, texts embedded before (by any worker) are read from it
+        instead of being encoded again. Each `doc.embedding` is a row view.
+        """
+
+        if not self._use_st or not docs:
+            return None
+        texts = [doc.text for doc in docs]
+        if self.store is not None:
+            embeddings = self.store.get_or_encode(texts, self.encode_batch)
+        else:
+            embeddings = self.encode_batch(texts)
+        for doc, embedding in zip(docs, embeddings):
+            doc.embedding = embedding
+        return embeddings
 
-    def build_documents(self, snapshot: dict) -> list[RagDocument]:
+    def build_documents(self, snapshot: dict, *, embed: bool = True) -> list[RagDocument]:
         docs: list[RagDocument] = []
 
         for faq in snapshot.get("faq", []) or []:
@@ -67,6 +227,7 @@ class RagEngine:
                         "category": faq.get("category"),
                         "audience": faq.get("audience"),
                     },
+                    partitions=(FAQ_PARTITION,),
                 )
             )
 
@@ -86,7 +247,9 @@ class RagEngine:
                         "name": name,
                         "location": loc,
                         "start": start,
+                        "organizationId": event.get("organizationId"),
                     },
+                    partitions=_partitions(event.get("id")),
                 )
             )
 
@@ -113,6 +276,7 @@ class RagEngine:
                         "role": role,
                         "interests": attendee.get("interests") or [],
                     },
+                    partitions=_partitions(*(attendee.get("eventIds") or [])),
                 )
             )
 
@@ -141,49 +305,126 @@ class RagEngine:
                         "room": room,
                         "topics": session.get("tags") or session.get("topics") or [],
                     },
+                    partitions=_partitions(session.get("eventId") or session.get("event_id")),
                 )
             )
 
         # embed if available
-        if self._use_st:
-            for doc in docs:
-                doc.embedding = self._encode(doc.text)
+        if embed:
+            self.embed_documents(docs)
 
         return docs
 
-    def answer(self, query: str, documents: Iterable[RagDocument]) -> dict:
+    def scores(
+        self,
+        query: str,
+        documents: Sequence[RagDocument],
+        *,
+        embeddings: np.ndarray | None = None,
+        inverse_norms: np.ndarray | None = None,
+        lexical_index: BM25Index | None = None,
+        backend: str | None = None,
+        query_embedding: np.ndarray | None = None,
+        quantized: "QuantizedEmbeddings | None" = None,
+    ) -> np.ndarray:
+        """Score of every document for `query` (see `retrieve`). With
+        `quantized` (and the float rows' `inverse_norms`), cosine scores are
+        computed from the int8 codes instead of `embeddings`."""
+
+        backend = backend or self.backend
+        if backend == "sentence-transformers":
+            if embeddings is None and quantized is None:
+                self.embed_documents([doc for doc in documents if doc.embedding is None])
+                embeddings = np.vstack([doc.embedding for doc in documents])
+            if inverse_norms is None:
+                inverse_norms = inverse_row_norms(embeddings)
+            q_emb = query_embedding if query_embedding is not None else self._encode(query)
+            q_norm = float(np.linalg.norm(q_emb))
+            products = quantized.dot(q_emb) if quantized is not None else embeddings @ q_emb
+            scores = products * inverse_norms
+            if q_norm:
+                scores /= q_norm
+            return scores
+        if backend == "bm25":
+            if lexical_index is None:
+                lexical_index = self.lexical_index(documents, backend)
+            return lexical_index.scores(query)
+        q_tokens = _tokenize(query)
+        return np.fromiter(
+            (_jaccard(q_tokens, _tokenize(doc.text)) for doc in documents),
+            dtype=np.float64,
+            count=len(documents),
+        )
+
+    def retrieve(
+        self,
+        query: str,
+        documents: Sequence[RagDocument],
+        *,
+        k: int = 3,
+        embeddings: np.ndarray | None = None,
+        inverse_norms: np.ndarray | None = None,
+        lexical_index: BM25Index | None = None,
+        backend: str | None = None,
+        query_embedding: np.ndarray | None = None,
+        eligible: np.ndarray | None = None,
+    ) -> list[tuple[RagDocument, float]]:
+        """Best `k` documents for `query` with their scores, best first.
+
+        With sentence-transformers, scores are cosine similarities from one
+        matrix-vector product over `embeddings` (stacked from the documents if
+        not given). Otherwise BM25 over `lexical_index` (built from the
+        documents if not given) or token Jaccard. Ties keep document order.
+        `backend` pins the retriever an index was built for; it defaults to
+        the engine's current one. `query_embedding` skips encoding the query
+        (e.g. when it was encoded in a batch with other queries). `eligible`
+        is a boolean mask of the documents that may be returned.
+        """
+
+        if not documents:
+            return []
+
+        scores = self.scores(
+            query,
+            documents,
+            embeddings=embeddings,
+            inverse_norms=inverse_norms,
+            lexical_index=lexical_index,
+            backend=backend,
+            query_embedding=query_embedding,
+        )
+        if eligible is None:
+            eligible = np.ones(len(documents), dtype=bool)
+        top = select_top_k(scores, eligible, k)
+        return [(documents[row], score) for row, score in top]
+
+    def answer(
+        self,
+        query: str,
+        documents: Iterable[RagDocument],
+        *,
+        k: int = 3,
+        embeddings: np.ndarray | None = None,
+        inverse_norms: np.ndarray | None = None,
+        lexical_index: BM25Index | None = None,
+        backend: str | None = None,
+        query_embedding: np.ndarray | None = None,
+        eligible: np.ndarray | None = None,
+    ) -> dict:
         query = query or ""
         if not query.strip():
-            return {"answer": "Ask me something about the event.", "source": None, "score": 0.0, "metadata": {}}
-
-        best_doc: RagDocument | None = None
-        best_score = -1.0
-
-        if self._use_st:
-            from sentence_transformers import util  # type: ignore
-
-            q_emb = self._encode(query)
-            for doc in documents:
-                if doc.embedding is None:
-                    doc.embedding = self._encode(doc.text)
-                score = float(util.cos_sim(q_emb, doc.embedding).item())
-                if score > best_score:
-                    best_score = score
-                    best_doc = doc
-        else:
-            q_tokens = _tokenize(query)
-            for doc in documents:
-                score = _jaccard(q_tokens, _tokenize(doc.text))
-                if score > best_score:
-                    best_score = score
-                    best_doc = doc
+            return format_answer(query, [])
 
-        if best_doc is None:
-            return {"answer": "Sorry, I don't have information about that.", "source": None, "score": 0.0, "metadata": {}}
-
-        return {
-            "answer": best_doc.answer,
-            "source": best_doc.source,
-            "score": round(float(best_score), 4),
-            "metadata": best_doc.metadata,
-        }
+        documents = documents if isinstance(documents, Sequence) else list(documents)
+        ranked = self.retrieve(
+            query,
+            documents,
+            k=k,
+            embeddings=embeddings,
+            inverse_norms=inverse_norms,
+            lexical_index=lexical_index,
+            backend=backend,
+            query_embedding=query_embedding,
+            eligible=eligible,
+        )
+        return format_answer(query, ranked)
@@ -0,0 +1,308 @@
+"""Built RAG corpora kept between chat requests.
+
+Building documents from a snapshot, and with sentence-transformers embedding
+every one of them, used to happen on every chat message. A `RagIndexCache`
+keys each built `RagIndex` by a content hash of its snapshot, so a chat
+request only encodes the query unless the snapshot actually changed. The
+least recently used index is evicted when more than `capacity` snapshots
+are held (e.g. several organizations chatting with their own snapshots).
+
+Built indexes are partitioned: one partition per event (its event, session
+and attendee documents), a global FAQ partition, and a platform partition
+for documents tied to no event. A query scoped to an organization or event
+only scores the FAQ and that tenant's event partitions, so its cost follows
+the tenant's corpus and it never returns another tenant's documents. Only
+a corpus the client supplied itself is searched whole (`whole_corpus`).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .bm25 import BM25Index
+from .matrix import select_top_k
+from .quantization import QUANTIZATION_MODES, QuantizedEmbeddings
+from .rag import FAQ_PARTITION, RagDocument, RagEngine, event_partition, format_answer, inverse_row_norms
+
+
+def snapshot_hash(snapshot: dict) -> str:
+    """Stable content hash of a snapshot, independent of key order."""
+
+    encoded = json.dumps(snapshot, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _take(matrix, rows: np.ndarray | None):
+    """`matrix[rows]`, as a zero-copy slice when the rows are consecutive
+    (`matrix` itself when `rows` or `matrix` is None)."""
+
+    if matrix is None or rows is None:
+        return matrix
+    if isinstance(matrix, QuantizedEmbeddings):
+        return QuantizedEmbeddings(codes=_take(matrix.codes, rows), scales=_take(matrix.scales, rows))
+    if len(rows) and rows[-1] - rows[0] == len(rows) - 1:
+        return matrix[rows[0] : rows[-1] + 1]
+    return matrix[rows]
+
+
+@dataclass
+class RagPartition:
+    # Rows of `RagIndex.documents`, ascending.
+    rows: np.ndarray
+    lexical_index: BM25Index | None = None
+
+
+@dataclass
+class RagIndex:
+    key: str
+    documents: list[RagDocument]
+    # Retriever the index was built for; it keeps answering with it even if
+    # the model finishes loading meanwhile.
+    backend: str = "bm25"
+    # (len(documents), dim) float32 rows, or None on the token-overlap backend
+    # (and when quantized without re-ranking).
+    embeddings: np.ndarray | None = None
+    inverse_norms: np.ndarray | None = None
+    # Int8 codes scored instead of `embeddings`; the best `rerank`
+    # candidates are re-scored against `embeddings` when it is kept.
+    quantized: QuantizedEmbeddings | None = None
+    rerank: int = 0
+    # Whole-corpus lexical index, read only when there are no partitions.
+    lexical_index: BM25Index | None = None
+    # Partition name -> its rows and lexical index; empty for an
+    # unpartitioned corpus.
+    partitions: dict[str, RagPartition] = field(default_factory=dict)
+    # Organization id -> names of its event partitions.
+    organizations: dict[str, list[str]] = field(default_factory=dict)
+    built_at: float = field(default_factory=time.time)
+    build_seconds: float = 0.0
+
+    def __post_init__(self) -> None:
+        self._sources = np.array([doc.source for doc in self.documents], dtype=str)
+
+    def scope(self, organization_ids: Sequence[str] = (), event_ids: Sequence[str] = ()) -> list[str]:
+        """Partitions searched for a query scoped to organizations and events:
+        the FAQ plus their event partitions."""
+
+        names = [FAQ_PARTITION]
+        for organization_id in organization_ids:
+            names.extend(self.organizations.get(organization_id, ()))
+        names.extend(event_partition(event_id) for event_id in event_ids)
+        return [name for name in dict.fromkeys(names) if name in self.partitions]
+
+    def answer(
+        self,
+        engine: RagEngine,
+        query: str,
+        *,
+        k: int = 3,
+        query_embedding: np.ndarray | None = None,
+        organization_ids: Sequence[str] = (),
+        event_ids: Sequence[str] = (),
+        sources: Sequence[str] | None = None,
+        whole_corpus: bool = False,
+    ) -> dict:
+        """Top `k` passages from the partitions in `scope` (every partition
+        with `whole_corpus`), optionally only from documents whose `source`
+        is in `sources`."""
+
+        if not (query or "").strip() or not self.documents:
+            return format_answer(query, [])
+        if self.backend == "sentence-transformers" and query_embedding is None:
+            query_embedding = engine._encode(query)
+
+        if not self.partitions:
+            # An unpartitioned corpus is scored in one pass.
+            groups = [(None, self.lexical_index)]
+        else:
+            names = list(self.partitions) if whole_corpus else self.scope(organization_ids, event_ids)
+            groups = [(self.partitions[name].rows, self.partitions[name].lexical_index) for name in names]
+        if not groups:
+            return format_answer(query, [])
+
+        rows, scores = [], []
+        for group, lexical_index in groups:
+            rows.append(np.arange(len(self.documents)) if group is None else group)
+            scores.append(
+                engine.scores(
+                    query,
+                    self.documents if group is None else _PartitionDocuments(self.documents, group),
+                    embeddings=None if self.quantized is not None else _take(self.embeddings, group),
+                    inverse_norms=_take(self.inverse_norms, group),
+                    lexical_index=lexical_index,
+                    backend=self.backend,
+                    query_embedding=query_embedding,
+                    quantized=_take(self.quantized, group),
+                )
+            )
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+        if len(groups) > 1:
+            # A document in several searched partitions (an attendee of two
+            # events) counts once, with its best score, in document order.
+            order = np.lexsort((-scores, rows))
+            rows, scores = rows[order], scores[order]
+            first = np.concatenate(([True], rows[1:] != rows[:-1]))
+            rows, scores = rows[first], scores[first]
+        eligible = np.isin(self._sources[rows], list(sources)) if sources else np.ones(len(rows), dtype=bool)
+
+        if self.quantized is not None and self.rerank and self.embeddings is not None:
+            top = self._rerank(rows, scores, eligible, k, query_embedding)
+        else:
+            top = [(int(rows[i]), score) for i, score in select_top_k(scores, eligible, k)]
+        return format_answer(query, [(self.documents[row], score) for row, score in top])
+
+    def _rerank(
+        self,
+        rows: np.ndarray,
+        scores: np.ndarray,
+        eligible: np.ndarray,
+        k: int,
+        query_embedding: np.ndarray,
+    ) -> list[tuple[int, float]]:
+        """Exact float cosine scores for the best `rerank` quantized candidates."""
+
+        candidates = np.array([i for i, _ in select_top_k(scores, eligible, max(k, self.rerank))], dtype=np.int64)
+        if not len(candidates):
+            return []
+        picked = np.sort(rows[candidates])
+        q_norm = float(np.linalg.norm(query_embedding))
+        exact = (np.asarray(self.embeddings[picked]) @ query_embedding) * self.inverse_norms[picked]
+        if q_norm:
+            exact /= q_norm
+        return [(int(picked[i]), score) for i, score in select_top_k(exact, np.ones(len(picked), dtype=bool), k)]
+
+
+class _PartitionDocuments(Sequence):
+    """Lazy `documents[rows]` view; BM25 and embedding scoring never touch
+    the documents, only token Jaccard reads their text."""
+
+    def __init__(self, documents: list[RagDocument], rows: np.ndarray) -> None:
+        self._documents = documents
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._documents[row] for row in self._rows[i]]
+        return self._documents[self._rows[i]]
+
+
+class RagIndexCache:
+    """LRU of built indexes keyed by retriever backend and `snapshot_hash`."""
+
+    def __init__(self, engine: RagEngine, capacity: int = 4, *, quantization: str = "none", rerank: int = 0) -> None:
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"unknown quantization mode: {quantization!r}")
+        self.engine = engine
+        self.capacity = capacity
+        self.quantization = quantization
+        self.rerank = rerank
+        self.builds = 0
+        self.hits = 0
+        self._indexes: "OrderedDict[str, RagIndex]" = OrderedDict()
+        # Builds run in worker threads; one at a time keeps concurrent
+        # requests for a new snapshot from embedding the corpus twice.
+        self._lock = threading.Lock()
+        # Guards the LRU itself; held only for a lookup or insert, so hits
+        # never wait on a running build.
+        self._entries_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def _lookup(self, key: str) -> RagIndex | None:
+        with self._entries_lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                self.hits += 1
+            return index
+
+    def _insert(self, key: str, index: RagIndex) -> None:
+        with self._entries_lock:
+            self._indexes[key] = index
+            while len(self._indexes) > self.capacity:
+                self._indexes.popitem(last=False)
+
+    def get(self, snapshot: dict, content_hash: str | None = None) -> RagIndex:
+        """The index for `snapshot`, building it only if its content is new.
+
+        `content_hash` skips re-hashing a snapshot whose `snapshot_hash` the
+        caller already knows.
+        """
+
+        # Indexes built before the model was ready are rebuilt with embeddings.
+        key = f"{self.engine.backend}:{content_hash or snapshot_hash(snapshot)}"
+        index = self._lookup(key)
+        if index is not None:
+            return index
+
+        with self._lock:
+            index = self._lookup(key)
+            if index is not None:
+                return index
+            index = self._build(key, snapshot)
+            self._insert(key, index)
+            return index
+
+    def _build(self, key: str, snapshot: dict) -> RagIndex:
+        started = time.perf_counter()
+        backend = key.split(":", 1)[0]
+        # Grouped by first partition (stable), so most partitions are one
+        # consecutive run of rows and score on zero-copy slices.
+        documents = self.engine.build_documents(snapshot, embed=False)
+        order = {}
+        for doc in documents:
+            order.setdefault(doc.partitions[0], len(order))
+        documents.sort(key=lambda doc: order[doc.partitions[0]])
+
+        embeddings = self.engine.embed_documents(documents) if backend == "sentence-transformers" else None
+        members: dict[str, list[int]] = {}
+        organizations: dict[str, list[str]] = {}
+        for row, doc in enumerate(documents):
+            for name in doc.partitions:
+                members.setdefault(name, []).append(row)
+            organization_id = doc.metadata.get("organizationId") if doc.source == "event" else None
+            if organization_id and doc.metadata.get("id"):
+                organizations.setdefault(organization_id, []).append(event_partition(doc.metadata["id"]))
+
+        inverse_norms = inverse_row_norms(embeddings) if embeddings is not None else None
+        quantized = None
+        if embeddings is not None and self.quantization == "int8":
+            quantized = QuantizedEmbeddings.from_float(embeddings)
+            if not self.rerank:
+                # Nothing reads the float rows any more; let them be freed.
+                embeddings = None
+                for doc in documents:
+                    doc.embedding = None
+
+        partitions = {}
+        for name, rows in members.items():
+            rows = np.asarray(rows, dtype=np.int64)
+            partitions[name] = RagPartition(
+                rows=rows,
+                lexical_index=self.engine.lexical_index([documents[row] for row in rows], backend),
+            )
+        self.builds += 1
+        return RagIndex(
+            key=key,
+            documents=documents,
+            backend=backend,
+            embeddings=embeddings,
+            inverse_norms=inverse_norms,
+            quantized=quantized,
+            rerank=self.rerank,
+            partitions=partitions,
+            organizations=organizations,
+            build_seconds=time.perf_counter() - started,
+        )
@@ -0,0 +1,207 @@
+"""Speed-networking round scheduler over the full similarity matrix.
+
+Each round seats every attendee at a table of at most `table_size` people
+(2 for classic pairings) so that the summed pairwise scores are high, and no
+two people ever share a table twice. A round is built greedily, seeding
+tables with the attendees whose best remaining match is strongest and
+filling each seat with the member that adds the most score, then improved by
+vectorized local search that swaps members between tables.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .matrix import AttendeeMatrix
+
+# Rows scored per block while materializing the similarity matrix.
+_BLOCK_ROWS = 256
+# Neighbours per attendee considered as swap partners during local search.
+_SWAP_NEIGHBOURS = 8
+
+
+@dataclass
+class RoundSchedule:
+    """Attendee rows per table per round, with each table's summed pair scores."""
+
+    rounds: list[list[list[int]]] = field(default_factory=list)
+    table_scores: list[list[float]] = field(default_factory=list)
+
+    @property
+    def round_scores(self) -> list[float]:
+        return [float(sum(scores)) for scores in self.table_scores]
+
+    @property
+    def total_score(self) -> float:
+        return float(sum(self.round_scores))
+
+
+def similarity_matrix(matrix: AttendeeMatrix, *, dtype=np.float32) -> np.ndarray:
+    """Dense (size, size) matrix of raw blended scores, diagonal set to 0."""
+
+    scores = np.empty((matrix.size, matrix.size), dtype=dtype)
+    for start in range(0, matrix.size, _BLOCK_ROWS):
+        rows = list(range(start, min(start + _BLOCK_ROWS, matrix.size)))
+        scores[start : start + len(rows)] = matrix.raw_block_scores(rows)
+    np.fill_diagonal(scores, 0.0)
+    return scores
+
+
+def _table_sizes(size: int, table_size: int) -> list[int]:
+    tables = -(-size // table_size)
+    base, extra = divmod(size, tables)
+    return [base + 1] * extra + [base] * (tables - extra)
+
+
+def _greedy_round(scores: np.ndarray, met: np.ndarray, table_size: int) -> list[list[int]]:
+    size = len(scores)
+    available = np.ones(size, dtype=bool)
+    best = np.where(met, np.float32(-np.inf), scores).max(axis=1)
+    sizes = _table_sizes(size, table_size)
+
+    tables: list[list[int]] = []
+    for seed in np.argsort(-best, kind="stable"):
+        if not available[seed]:
+            continue
+        table = [int(seed)]
+        available[seed] = False
+        gain = scores[seed].astype(np.float64)
+        blocked = met[seed].copy()
+        # Tables cut short by repeat pairs push extra tables past the plan.
+        target = sizes[len(tables)] if len(tables) < len(sizes) else table_size
+        while len(table) < target:
+            masked = np.where(available & ~blocked, gain, -np.inf)
+            member = int(np.argmax(masked))
+            if masked[member] == -np.inf:
+                break
+            table.append(member)
+            available[member] = False
+            gain += scores[member]
+            blocked |= met[member]
+        tables.append(table)
+    return tables
+
+
+def _improve(
+    scores: np.ndarray,
+    met: np.ndarray,
+    tables: list[list[int]],
+    neighbours: np.ndarray,
+    passes: int,
+) -> list[list[int]]:
+    """Swap members between tables while it raises the round total.
+
+    Candidate moves bring attendee x to the table of one of its best unmet
+    matches y by swapping x with one of y's tablemates z.
+    """
+
+    size = len(scores)
+    width = max(len(table) for table in tables)
+    for _ in range(passes):
+        members = np.full((len(tables), width), -1, dtype=np.int64)
+        table_of = np.empty(size, dtype=np.int64)
+        for index, table in enumerate(tables):
+            members[index, : len(table)] = table
+            table_of[table] = index
+
+        x = np.repeat(np.arange(size), neighbours.shape[1])
+        y = neighbours.reshape(-1)
+        a, b = table_of[x], table_of[y]
+        keep = a != b
+        x, y, a, b = x[keep], y[keep], a[keep], b[keep]
+
+        # Expand every (x, y) into one swap per tablemate z of y.
+        mates = members[b]
+        usable = (mates >= 0) & (mates != y[:, None])
+        pick, seat = np.nonzero(usable)
+        x, a, b = x[pick], a[pick], b[pick]
+        z = mates[pick, seat]
+        if x.size == 0:
+            break
+
+        seats_a, seats_b = members[a], members[b]
+        valid_a, valid_b = seats_a >= 0, seats_b >= 0
+        safe_a, safe_b = np.maximum(seats_a, 0), np.maximum(seats_b, 0)
+
+        def row_sum(people: np.ndarray, seats: np.ndarray, valid: np.ndarray) -> np.ndarray:
+            return np.where(valid, scores[people[:, None], seats], 0.0).sum(axis=1)
+
+        pair_xz = scores[x, z]
+        gain = (
+            row_sum(z, safe_a, valid_a) - pair_xz
+            + row_sum(x, safe_b, valid_b) - pair_xz
+            - row_sum(x, safe_a, valid_a)
+            - row_sum(z, safe_b, valid_b)
+        )
+        # z joins a without x, x joins b without z: neither may meet anyone twice.
+        clash = np.where(valid_a & (seats_a != x[:, None]), met[z[:, None], safe_a], False).any(axis=1)
+        clash |= np.where(valid_b & (seats_b != z[:, None]), met[x[:, None], safe_b], False).any(axis=1)
+        candidates = np.flatnonzero((gain > 1e-9) & ~clash)
+        if candidates.size == 0:
+            break
+
+        touched = np.zeros(len(tables), dtype=bool)
+        for i in candidates[np.argsort(-gain[candidates], kind="stable")]:
+            ta, tb = a[i], b[i]
+            if touched[ta] or touched[tb]:
+                continue
+            touched[ta] = touched[tb] = True
+            tables[ta][tables[ta].index(int(x[i]))] = int(z[i])
+            tables[tb][tables[tb].index(int(z[i]))] = int(x[i])
+    return tables
+
+
+def _table_scores(scores: np.ndarray, tables: Sequence[Sequence[int]]) -> list[float]:
+    return [float(scores[np.ix_(table, table)].sum(dtype=np.float64)) / 2.0 for table in tables]
+
+
+def schedule_rounds(
+    matrix: AttendeeMatrix,
+    rounds: int,
+    *,
+    table_size: int = 2,
+    local_search_passes: int = 4,
+    scores: np.ndarray | None = None,
+) -> RoundSchedule:
+    """Seat every attendee of `matrix` at tables of `table_size` for `rounds` rounds.
+
+    Tables are as even as possible (sizes differ by at most one). A seat stays
+    empty rather than repeating a pair, so late rounds in small events may
+    have smaller tables.
+    """
+
+    if table_size < 2:
+        raise ValueError("table_size must be at least 2")
+    if scores is None:
+        scores = similarity_matrix(matrix)
+
+    size = matrix.size
+    schedule = RoundSchedule()
+    if size < 2:
+        return schedule
+
+    met = np.zeros((size, size), dtype=bool)
+    np.fill_diagonal(met, True)
+    # Each round meets at most table_size - 1 new people, so the best
+    # _SWAP_NEIGHBOURS unmet matches always stay inside this one-off top list.
+    k = min(_SWAP_NEIGHBOURS + rounds * (table_size - 1), size - 1)
+    own = np.arange(size)[:, None]
+    top = np.argpartition(scores, size - k, axis=1)[:, size - k :]
+    top = np.take_along_axis(top, np.argsort(-scores[own, top], axis=1, kind="stable"), axis=1)
+
+    for _ in range(rounds):
+        # Keep the best _SWAP_NEIGHBOURS unmet matches; the rest point back at
+        # their own row, which is never a move.
+        unmet = ~met[own, top]
+        keep = unmet & (np.cumsum(unmet, axis=1) <= _SWAP_NEIGHBOURS)
+        neighbours = np.where(keep, top, own)
+        tables = _greedy_round(scores, met, table_size)
+        tables = _improve(scores, met, tables, neighbours, local_search_passes)
+        for table in tables:
+            met[np.ix_(table, table)] = True
+        schedule.rounds.append(tables)
+        schedule.table_scores.append(_table_scores(scores, tables))
+    return schedule
@@ -3,6 +3,12 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .embeddings import TagEmbeddingCache
+
+TAG_FIELDS = ("interests", "skills", "goals")
 
 WEIGHTS = {
     "interests": 0.3,
@@ -53,13 +59,13 @@ def _overlap_score(left: Sequence[str] | None, right: Sequence[str] | None) -> f
     return intersection / union
 
 
+_ROLE_TO_GROUP = {member: group for group, members in ROLE_GROUPS.items() for member in members}
+
+
 def _role_group(role: str | None) -> str | None:
     if not role:
         return None
-    for group, members in ROLE_GROUPS.items():
-        if role in members:
-            return group
-    return None
+    return _ROLE_TO_GROUP.get(role)
 
 
 def _role_score(role_left: str | None, role_right: str | None) -> float:
@@ -92,13 +98,40 @@ def _location_score(location_left: str | None, location_right: str | None) -> fl
     return 0.0
 
 
-def similarity(a: dict, b: dict) -> float:
-    """Blended similarity score across interests, skills, goals, and context."""
+def similarity(a, b, *, semantic: "TagEmbeddingCache | None" = None, semantic_mode: str = "max") -> float:
+    """Blended similarity score across interests, skills, goals, and context.
+
+    Accepts profile dicts or compact `profiles.AttendeeProfile` objects; two
+    compact profiles from the same store are compared via their interned codes.
+
+    With an available `semantic` cache, each tag component is the larger of
+    the exact overlap and the embedding overlap (`semantic_mode` "max" or
+    "mean"), so related but differently spelled tags also count.
+    """
+
+    if semantic is not None and not semantic.available:
+        semantic = None
+
+    if semantic is None and not isinstance(a, dict) and not isinstance(b, dict):
+        score = a.similarity_to(b)
+        if score is not None:
+            return score
+
+    if semantic is None:
+        tags = {key: _overlap_score(a.get(key), b.get(key)) for key in TAG_FIELDS}
+    else:
+        tags = {}
+        for key in TAG_FIELDS:
+            left, right = _to_normalized_set(a.get(key)), _to_normalized_set(b.get(key))
+            tags[key] = max(_overlap_score(left, right), semantic.overlap(left, right, mode=semantic_mode))
+    return _blend(a, b, tags)
+
+
+def _blend(a, b, tags: dict[str, float]) -> float:
+    """Final score from precomputed tag components plus the context fields."""
 
     components = {
-        "interests": _overlap_score(a.get("interests"), b.get("interests")),
-        "skills": _overlap_score(a.get("skills"), b.get("skills")),
-        "goals": _overlap_score(a.get("goals"), b.get("goals")),
+        **tags,
         "industry": 1.0 if a.get("industry") and a.get("industry") == b.get("industry") else 0.0,
         "role": _role_score(a.get("role"), b.get("role")),
         "location": _location_score(a.get("location"), b.get("location")),
@@ -35,6 +35,56 @@ class Settings(BaseSettings):
     app_url: str
     api_url: str
 
+    # Tickets
+    # Prices, rules and sales windows of ticket types are cached per worker;
+    # edits made through another worker show up after at most this long.
+    ticket_type_cache_ttl_seconds: float = 30.0
+    # Unpaid registrations hold their tickets this long. Every worker sweeps
+    # expired holds each hold_sweep_interval_seconds, hold_sweep_batch_size
+    # registrations per round trip.
+    registration_hold_minutes: float = 15.0
+    hold_sweep_interval_seconds: float = 30.0
+    hold_sweep_batch_size: int = 500
+    # QR images are rendered on request by this many processes (0 renders
+    # on a thread); the most recent qr_render_cache_size stay in memory.
+    qr_render_workers: int = 2
+    qr_render_cache_size: int = 1024
+
+    # Networking
+    # Events with at least networking_lsh_min_attendees registrants score only
+    # MinHash/LSH candidates (approximate) in live lists and batch jobs.
+    networking_lsh_enabled: bool = False
+    networking_lsh_min_attendees: int = 100000
+    networking_lsh_bands: int = 16
+    networking_lsh_rows: int = 3
+
+    # AI
+    rag_index_cache_size: int = 4
+    rag_encode_batch_size: int = 64
+    # Retriever without sentence-transformers: "bm25" or "token-jaccard".
+    rag_lexical_backend: str = "bm25"
+    # Directory of the shared memory-mapped embedding store; unset disables it.
+    rag_embedding_store_dir: str | None = None
+    # Chat without a client snapshot may see writes this many seconds late.
+    rag_snapshot_max_staleness_seconds: float = 30.0
+    rag_snapshot_full_refresh_seconds: float = 3600.0
+    # Encoding and scoring run on this many threads; beyond
+    # rag_inference_max_pending queued chats new ones get a 503.
+    rag_inference_workers: int = 1
+    rag_inference_max_pending: int = 64
+    rag_inference_max_batch: int = 32
+    rag_inference_batch_window_ms: float = 5.0
+    # "int8" scores RAG embeddings as int8 codes (a quarter of the memory).
+    # A re-rank of that many top candidates against the float rows keeps
+    # them: memory-mapped with rag_embedding_store_dir, otherwise in RAM.
+    rag_embedding_quantization: str = "none"
+    rag_quantized_rerank: int = 0
+    rag_answer_cache_size: int = 1024
+    rag_answer_cache_ttl_seconds: float = 300.0
+    # Cosine similarity at which a rephrased query reuses a cached answer
+    # (sentence-transformers only); unset matches normalized text only.
+    rag_answer_cache_similarity: float | None = None
+
     class Config:
         env_file = ".env"
 
@@ -28,6 +28,7 @@ async def _create_indexes() -> None:
     try:
         await database.organizations.create_index("slug", unique=True)
         await database.users.create_index("email", unique=True)
+        await database.users.create_index("updated_at")
         await database.user_organizations.create_index(
             [("user_id", 1), ("organization_id", 1)], unique=True
         )
@@ -39,6 +40,8 @@ async def _create_indexes() -> None:
         await database.events.create_index("start_date")
         await database.events.create_index("created_at")
         await database.events.create_index("organizer_id")
+        await database.events.create_index("updated_at")
+        await database.events.create_index("name_lower")
 
         await database.ticket_types.create_index("event_id")
         await database.ticket_types.create_index("is_active")
@@ -48,10 +51,25 @@ async def _create_indexes() -> None:
             [("event_id", 1), ("email", 1)], unique=True
         )
         await database.registrations.create_index("event_id")
+        await database.registrations.create_index([("event_id", 1), ("status", 1)])
         await database.registrations.create_index("user_id")
+        await database.registrations.create_index([("organization_id", 1), ("status", 1)])
+        await database.registrations.create_index("group_id", sparse=True)
         await database.registrations.create_index("status")
         await database.registrations.create_index("qr_code", unique=True)
         await database.registrations.create_index("created_at")
+        await database.registrations.create_index("updated_at")
+        await database.registrations.create_index([("status", 1), ("hold_expires_at", 1)])
+        await database.registrations.create_index("hold_sweep_id", sparse=True)
+
+        await database.recommendations.create_index(
+            [("event_id", 1), ("user_id", 1)], unique=True
+        )
+        await database.recommendations.create_index([("event_id", 1), ("generation", 1)])
+        # Finished networking batch jobs are kept for a week.
+        await database.networking_jobs.create_index("finished_at", expireAfterSeconds=7 * 24 * 3600)
+        # Lists an attendee appears in, for incremental refreshes.
+        await database.recommendations.create_index([("event_id", 1), ("recommendations.match.id", 1)])
 
         await database.waitlist_entries.create_index(
             [("event_id", 1), ("ticket_type_id", 1), ("position", 1)]
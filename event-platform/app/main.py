@@ -4,6 +4,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.database import close_mongo_connection, connect_to_mongo
 from app.routers import ai, auth_router, connections, events, organizations, payment, registration, tickets, waitlist
+from app.services.hold_sweeper import hold_sweeper
+from app.services.qrcode_service import qrcode_service
 
 app = FastAPI(
     title="Event Platform API",
@@ -25,11 +27,37 @@ async def startup_db_client():
     await connect_to_mongo()
 
 
+@app.on_event("startup")
+async def startup_ai_warmup():
+    # Not awaited: the API serves (lexical RAG) while the model loads.
+    ai.start_model_warmup()
+
+
+@app.on_event("startup")
+async def startup_hold_sweeper():
+    hold_sweeper.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_hold_sweeper():
+    hold_sweeper.stop()
+
+
+@app.on_event("shutdown")
+async def shutdown_qr_rendering():
+    qrcode_service.shutdown()
+
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     await close_mongo_connection()
 
 
+@app.on_event("shutdown")
+async def shutdown_ai_inference():
+    ai.stop_inference()
+
+
 app.include_router(auth_router.router)
 app.include_router(events.router)
 app.include_router(organizations.router)
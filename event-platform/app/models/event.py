@@ -2,7 +2,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from pydantic import Field
+from pydantic import Field, computed_field
 
 from .base import MongoModel
 
@@ -31,6 +31,12 @@ class Event(MongoModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    @computed_field
+    @property
+    def name_lower(self) -> str:
+        """Stored and indexed for case-insensitive lookups by name."""
+        return self.name.lower()
+
     class Config(MongoModel.Config):
         json_schema_extra = {
             "example": {
@@ -13,6 +13,8 @@ class RegistrationStatus(str, Enum):
     CANCELLED = "cancelled"
     WAITLIST = "waitlist"
     REJECTED = "rejected"
+    # Unpaid when its hold ran out; the tickets went back on sale.
+    EXPIRED = "expired"
 
 
 class PaymentStatus(str, Enum):
@@ -32,6 +34,8 @@ class PaymentMethod(str, Enum):
 
 class Registration(MongoModel):
     event_id: str
+    # The event's, so organization-wide counts need no lookup of its events.
+    organization_id: Optional[str] = None
     user_id: Optional[str] = None
     ticket_type_id: str
     status: RegistrationStatus = RegistrationStatus.PENDING
@@ -57,14 +61,16 @@ class Registration(MongoModel):
     discount_details: Optional[Dict[str, Any]] = None
 
     payment_status: PaymentStatus = PaymentStatus.PENDING
+    # Pending registrations keep their tickets reserved until then.
+    hold_expires_at: Optional[datetime] = None
     payment_method: Optional[PaymentMethod] = None
     payment_intent_id: Optional[str] = None
     paypal_order_id: Optional[str] = None
     payment_date: Optional[datetime] = None
     transaction_id: Optional[str] = None
 
+    # The image is rendered on request from this string (GET /api/registrations/qr-code/{qr_code}).
     qr_code: str
-    qr_code_image: Optional[str] = None
     checked_in: bool = False
     check_in_time: Optional[datetime] = None
 
@@ -1,27 +1,108 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+import asyncio
+from pathlib import Path
 
-from app.database import get_database
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 
-from app.ai.networking import conversation_starter, recommend_connections
+from app.auth import get_request_user_id
+from app.config import settings
+
+from app.ai.answer_cache import AnswerCache
+from app.ai.embedding_store import EmbeddingStore
+from app.ai.embeddings import DEFAULT_MODEL, TagEmbeddingCache
+from app.ai.inference import InferenceBusy, InferenceExecutor
+from app.ai.intents import parse_intent
+from app.ai.matrix import AttendeeMatrix
+from app.ai.networking import conversation_starter, recommend_connections, recommend_from_matrix
 from app.ai.rag import RagEngine
+from app.ai.rag_index import RagIndexCache
 from app.schemas.ai import (
     AiHealthResponse,
+    NetworkingBatchRequest,
+    NetworkingJobStatus,
     NetworkingRecommendation,
     NetworkingRequest,
+    NetworkingRoundsRequest,
+    NetworkingRoundsResponse,
     RagChatRequest,
     RagChatResponse,
+    StoredNetworkingRecommendations,
 )
+from app.services.access_service import ChatScope, access_service
+from app.services.analytics_service import analytics_service
+from app.services.rag_snapshot_service import rag_snapshot_service
+from app.services.recommendation_service import recommendation_service
 
 router = APIRouter(prefix="/api/ai", tags=["ai"])
 
-_engine = RagEngine()
+_engine = RagEngine(
+    batch_size=settings.rag_encode_batch_size,
+    lexical=settings.rag_lexical_backend,
+    store=(
+        EmbeddingStore(Path(settings.rag_embedding_store_dir) / DEFAULT_MODEL)
+        if settings.rag_embedding_store_dir
+        else None
+    ),
+)
+_rag_indexes = RagIndexCache(
+    _engine,
+    capacity=settings.rag_index_cache_size,
+    quantization=settings.rag_embedding_quantization,
+    rerank=settings.rag_quantized_rerank,
+)
+_answers = AnswerCache(
+    capacity=settings.rag_answer_cache_size,
+    ttl=settings.rag_answer_cache_ttl_seconds,
+    similarity=settings.rag_answer_cache_similarity,
+)
+# Index the server snapshot was last answered from; its answers are dropped
+# once the snapshot moves on.
+_served_index_key: str | None = None
+_inference = InferenceExecutor(
+    _engine.encode_batch,
+    workers=settings.rag_inference_workers,
+    max_pending=settings.rag_inference_max_pending,
+    max_batch=settings.rag_inference_max_batch,
+    batch_window=settings.rag_inference_batch_window_ms / 1000.0,
+)
+# Gets the RAG model once it is warm; until then tag matching stays token-only.
+_tag_embeddings = TagEmbeddingCache()
+_warmup_task: asyncio.Task | None = None
+
+
+async def _warm_up() -> None:
+    if await _engine.warm_up():
+        _tag_embeddings.model = _engine._model
+
+
+def start_model_warmup() -> None:
+    """Load the sentence-transformers model in the background after startup."""
+
+    global _warmup_task
+    if _warmup_task is None:
+        _warmup_task = asyncio.create_task(_warm_up())
+
+
+def stop_inference() -> None:
+    _inference.shutdown()
 
 
 @router.get("/health", response_model=AiHealthResponse)
 async def ai_health():
-    return AiHealthResponse(ok=True, rag_backend="sentence-transformers" if _engine._use_st else "token-jaccard")
+    return AiHealthResponse(
+        ok=True,
+        rag_backend=_engine.backend,
+        warmup_state=_engine.warmup_state,
+        warmup_seconds=_engine.warmup_seconds,
+        warmup_error=_engine.warmup_error,
+        inference=_inference.metrics(),
+        answer_cache=_answers.metrics(),
+    )
+
+
+def _recommend_exact(subject: dict, candidates: list[dict], limit: int) -> list[dict]:
+    return recommend_from_matrix(AttendeeMatrix(candidates), subject, limit=limit, min_score=0.0)
 
 
 @router.post("/networking/recommendations", response_model=list[NetworkingRecommendation])
@@ -29,7 +110,16 @@ async def networking_recommendations(payload: NetworkingRequest):
     subject = payload.user or {}
     candidates = payload.attendees or []
 
-    matches = recommend_connections(subject, candidates, limit=payload.limit, min_score=0.0)
+    # Scoring (and encoding tags not seen yet) stays off the event loop.
+    try:
+        if payload.semantic and _tag_embeddings.available:
+            matches = await _inference.run(
+                recommend_connections, subject, candidates, limit=payload.limit, semantic=_tag_embeddings
+            )
+        else:
+            matches = await _inference.run(_recommend_exact, subject, candidates, payload.limit)
+    except InferenceBusy as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
     results: list[NetworkingRecommendation] = []
 
     for entry in matches:
@@ -48,184 +138,164 @@ async def networking_recommendations(payload: NetworkingRequest):
     return results
 
 
+@router.get(
+    "/networking/events/{event_id}/recommendations",
+    response_model=list[NetworkingRecommendation],
+)
+async def event_networking_recommendations(
+    event_id: str,
+    limit: int = Query(default=3, ge=1, le=20),
+    user_id: str = Depends(get_request_user_id),
+):
+    """Recommendations for the caller, sourced server-side from the event's registrants."""
+
+    recommendations = await recommendation_service.live_recommendations(event_id, user_id, limit)
+    if recommendations is None:
+        raise HTTPException(status_code=404, detail="You are not registered for this event")
+    return recommendations
+
+
+@router.post("/networking/events/{event_id}/batch", response_model=NetworkingJobStatus, status_code=202)
+async def start_networking_batch(
+    event_id: str,
+    background_tasks: BackgroundTasks,
+    payload: NetworkingBatchRequest | None = None,
+    user_id: str = Depends(get_request_user_id),
+):
+    """Queue a job computing recommendations for every registrant of an
+    event; only the event's organizers may start one."""
+
+    if await access_service.managed_event(user_id, event_id) is None:
+        raise HTTPException(status_code=403, detail="Only the event's organizers can start batch jobs")
+    options = payload or NetworkingBatchRequest()
+    job = await recommendation_service.create_job(event_id)
+    background_tasks.add_task(
+        recommendation_service.run_batch,
+        job,
+        limit=options.limit,
+        workers=options.workers,
+        chunk_size=options.chunk_size,
+    )
+    return job
+
+
+@router.get("/networking/jobs/{job_id}", response_model=NetworkingJobStatus)
+async def networking_job_status(job_id: str, user_id: str = Depends(get_request_user_id)):
+    job = await recommendation_service.get_job(job_id)
+    # Someone else's job is reported as missing, like one that never existed.
+    if not job or await access_service.managed_event(user_id, job["event_id"]) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get(
+    "/networking/events/{event_id}/recommendations/{user_id}",
+    response_model=StoredNetworkingRecommendations,
+)
+async def stored_networking_recommendations(
+    event_id: str,
+    user_id: str,
+    caller_id: str = Depends(get_request_user_id),
+):
+    """The caller's own stored list; other attendees' lists are not readable."""
+
+    if user_id != caller_id:
+        raise HTTPException(status_code=403, detail="You can only read your own recommendations")
+    stored = await recommendation_service.get_recommendations(event_id, user_id)
+    if not stored:
+        raise HTTPException(status_code=404, detail="No recommendations computed for this attendee")
+    return stored
+
+
+@router.post("/networking/events/{event_id}/rounds", response_model=NetworkingRoundsResponse)
+async def plan_networking_rounds(
+    event_id: str,
+    payload: NetworkingRoundsRequest | None = None,
+    user_id: str = Depends(get_request_user_id),
+):
+    """Speed-networking tables for each round; no two attendees meet twice.
+    Only the event's organizers may plan them."""
+
+    if await access_service.managed_event(user_id, event_id) is None:
+        raise HTTPException(status_code=403, detail="Only the event's organizers can plan networking rounds")
+    options = payload or NetworkingRoundsRequest()
+    return await recommendation_service.plan_rounds(event_id, options.rounds, options.table_size)
+
+
 @router.get("/rag/snapshot", response_model=dict)
 async def rag_snapshot():
-    """Build a comprehensive snapshot from MongoDB for RAG context.
-
-    Pulls events, users (attendees), registrations, and injects rich FAQ data
-    so the chatbot can answer questions about the platform, events, attendees,
+    """Comprehensive snapshot for RAG context: events, attendees (users and
+    registrations) and rich FAQ data about the platform, events, attendees,
     networking, and logistics.
+
+    Served from the materialized snapshot, at most
+    `rag_snapshot_max_staleness_seconds` old.
     """
 
-    db = await get_database()
-
-    # ── Events ────────────────────────────────────────────────────────────
-    events_raw = await db.events.find({}).sort("start_date", 1).to_list(200)
-    events = []
-    for e in events_raw:
-        events.append(
-            {
-                "id": str(e.get("_id")),
-                "name": e.get("name"),
-                "description": e.get("description"),
-                "startDate": (e.get("start_date").isoformat() if e.get("start_date") else None),
-                "endDate": (e.get("end_date").isoformat() if e.get("end_date") else None),
-                "location": e.get("location"),
-                "organizerId": e.get("organizer_id"),
-                "capacity": e.get("capacity"),
-                "registeredCount": e.get("registered_count", 0),
-                "status": (str(e.get("status")) if e.get("status") is not None else "draft"),
-                "revenue": e.get("revenue", 0),
-            }
-        )
+    return await rag_snapshot_service.get_snapshot()
 
-    # ── Attendees from users collection ───────────────────────────────────
-    users_raw = await db.users.find({}).to_list(500)
-    seen_attendees: set[str] = set()
-    attendees = []
-    for u in users_raw:
-        uid = str(u.get("_id"))
-        if uid in seen_attendees:
-            continue
-        seen_attendees.add(uid)
-        attendees.append(
-            {
-                "id": uid,
-                "name": u.get("name", "Unknown"),
-                "email": u.get("email"),
-                "company": u.get("company"),
-                "industry": u.get("industry"),
-                "role": u.get("role", "ATTENDEE"),
-                "interests": u.get("interests", []),
-            }
-        )
 
-    # ── Also pull from registrations (legacy) ─────────────────────────────
-    registrations_raw = await db.registrations.find({}).sort("created_at", -1).to_list(500)
-    for r in registrations_raw:
-        form_responses = r.get("form_responses")
-        interests: list[str] = []
-        if isinstance(form_responses, dict):
-            raw_interests = form_responses.get("interests")
-            if isinstance(raw_interests, list):
-                interests = [str(x) for x in raw_interests if x]
-            elif isinstance(raw_interests, str):
-                interests = [s.strip() for s in raw_interests.split(",") if s.strip()]
-
-        attendee_id = str(r.get("user_id") or r.get("_id"))
-        if attendee_id in seen_attendees:
-            continue
-        seen_attendees.add(attendee_id)
-        name = " ".join([r.get("first_name") or "", r.get("last_name") or ""]).strip() or "Attendee"
-        attendees.append(
-            {
-                "id": attendee_id,
-                "name": name,
-                "email": r.get("email"),
-                "company": r.get("company"),
-                "industry": None,
-                "role": r.get("job_title"),
-                "interests": interests,
-            }
-        )
+@router.post("/rag/chat", response_model=RagChatResponse)
+async def rag_chat(payload: RagChatRequest, user_id: str = Depends(get_request_user_id)):
+    global _served_index_key
 
-    # ── Rich FAQ ──────────────────────────────────────────────────────────
-    total_events = len(events)
-    total_attendees = len(attendees)
-    total_capacity = sum(e.get("capacity", 0) for e in events)
-    total_registrations = sum(e.get("registeredCount", 0) for e in events)
-    event_names = ", ".join(e.get("name", "Untitled") for e in events[:10]) or "No events yet"
-    event_locations = ", ".join(set(e.get("location", "") for e in events if e.get("location"))) or "No locations set"
-
-    faq = [
-        {
-            "question": "Where can I find event schedules and venue information?",
-            "answer": "Use the Dashboard for event summaries and the Venue Editor for layout details. For live sessions, check the Event Hub.",
-            "category": "logistics",
-            "audience": "attendee",
-        },
-        {
-            "question": "How many events are there? What events do we have?",
-            "answer": f"There are currently {total_events} events on the platform: {event_names}.",
-            "category": "overview",
-            "audience": "all",
-        },
-        {
-            "question": "How many attendees or users are registered?",
-            "answer": f"There are {total_attendees} registered users on the platform, with {total_registrations} total event registrations across {total_events} events.",
-            "category": "overview",
-            "audience": "organizer",
-        },
-        {
-            "question": "What is the total capacity across all events?",
-            "answer": f"The combined capacity across all events is {total_capacity} seats.",
-            "category": "overview",
-            "audience": "organizer",
-        },
-        {
-            "question": "Where are the events located? What are the event locations?",
-            "answer": f"Events are located at: {event_locations}.",
-            "category": "logistics",
-            "audience": "attendee",
-        },
-        {
-            "question": "How does AI networking work?",
-            "answer": "The AI Networking feature uses weighted-similarity matching based on your interests, industry, and company to recommend the best people to connect with at events. Update your profile interests to get better matches.",
-            "category": "feature",
-            "audience": "attendee",
-        },
-        {
-            "question": "How do I update my profile or interests?",
-            "answer": "Go to the 'My Profile' section from the sidebar or click your avatar in the top-right. You can update your name, company, industry, phone, and interests there. Interests directly affect AI networking recommendations.",
-            "category": "feature",
-            "audience": "attendee",
-        },
-        {
-            "question": "What features does EventNexus offer?",
-            "answer": "EventNexus offers: Dashboard analytics, Event creation & management, AI Networking (smart attendee matching), RAG-powered AI Assistant, Venue Editor (interactive floor plans), Badge generation, Session management with live polls, Q&A, and real-time engagement tracking.",
-            "category": "feature",
-            "audience": "all",
-        },
-        {
-            "question": "How do I create a new event?",
-            "answer": "As an organizer, go to the Dashboard and click 'Create New Event'. Fill in the name, date, location, capacity, and description. The event will be saved to MongoDB and visible on the platform immediately.",
-            "category": "feature",
-            "audience": "organizer",
-        },
-        {
-            "question": "What technology stack does this platform use?",
-            "answer": "The backend uses FastAPI (Python) with MongoDB Atlas for the database. Authentication uses JWT tokens with bcrypt password hashing. The frontend is React 19 with TypeScript, Vite, and TailwindCSS. AI features use sentence-transformers for semantic search and token-Jaccard as a fallback.",
-            "category": "technical",
-            "audience": "all",
-        },
-        {
-            "question": "How do I register for an event?",
-            "answer": "Navigate to the Events section, find the event you want to attend, and click Register. You'll receive a QR code ticket for check-in.",
-            "category": "logistics",
-            "audience": "attendee",
-        },
-        {
-            "question": "Who are the attendees? List the registered users.",
-            "answer": f"There are {total_attendees} registered users. " + (
-                "Some attendees include: " + ", ".join(
-                    f"{a.get('name', 'Unknown')} ({a.get('company') or 'no company'})"
-                    for a in attendees[:8]
-                ) + "." if attendees else "No attendees registered yet."
-            ),
-            "category": "networking",
-            "audience": "all",
-        },
-    ]
-
-    return {"events": events, "sessions": [], "attendees": attendees, "faq": faq}
+    # The server snapshot is searched only within what the caller can see; a
+    # client-supplied snapshot holds nothing the client does not already have.
+    whole_corpus = payload.snapshot is not None and payload.organization_id is None and payload.event_id is None
+    if payload.snapshot is None:
+        scope = await access_service.chat_scope(user_id, payload.organization_id, payload.event_id)
+        if scope is None:
+            raise HTTPException(status_code=403, detail="No access to this organization or event")
+    elif payload.event_id is not None:
+        scope = ChatScope(event_ids=(payload.event_id,))
+    else:
+        scope = ChatScope(organization_ids=(payload.organization_id,) if payload.organization_id else ())
 
+    # Counting and listing questions about live data are answered by
+    # aggregation queries; a client-supplied snapshot is always retrieved from.
+    intent = parse_intent(payload.query) if payload.snapshot is None and not payload.sources else None
+    if intent is not None:
+        result = await analytics_service.answer(intent, scope)
+        if result is not None:
+            return RagChatResponse(**result)
 
-@router.post("/rag/chat", response_model=RagChatResponse)
-async def rag_chat(payload: RagChatRequest):
-    snapshot = payload.snapshot
+    snapshot, key = payload.snapshot, None
     if snapshot is None:
-        snapshot = await rag_snapshot()
+        snapshot = await rag_snapshot_service.get_snapshot()
+        key = rag_snapshot_service.snapshot_key
+
+    # Only a snapshot with new content is rebuilt (and re-embedded).
+    index = await asyncio.to_thread(_rag_indexes.get, snapshot, key)
+    if key is not None and index.key != _served_index_key:
+        if _served_index_key is not None:
+            _answers.drop_index(_served_index_key)
+        _served_index_key = index.key
 
-    documents = _engine.build_documents(snapshot)
-    result = _engine.answer(payload.query, documents)
+    cache_scope = f"{'*' if whole_corpus else scope.key}|{','.join(sorted(payload.sources or []))}"
+    result = _answers.get(index.key, payload.query, payload.top_k, scope=cache_scope)
+    if result is not None:
+        return RagChatResponse(**result)
+
+    # Encoding and scoring stay off the event loop; concurrent queries share
+    # one encode() call.
+    try:
+        query_embedding = None
+        if index.backend == "sentence-transformers" and (payload.query or "").strip():
+            query_embedding = await _inference.encode(payload.query)
+            result = _answers.get(index.key, payload.query, payload.top_k, query_embedding, scope=cache_scope)
+        if result is None:
+            result = await _inference.run(
+                index.answer,
+                _engine,
+                payload.query,
+                k=payload.top_k,
+                query_embedding=query_embedding,
+                organization_ids=scope.organization_ids,
+                event_ids=scope.event_ids,
+                sources=payload.sources,
+                whole_corpus=whole_corpus,
+            )
+            _answers.put(index.key, payload.query, payload.top_k, result, query_embedding, scope=cache_scope)
+    except InferenceBusy as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
     return RagChatResponse(**result)
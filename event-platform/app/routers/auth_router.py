@@ -16,6 +16,8 @@ from app.auth import (
     verify_password,
 )
 from app.database import get_database
+from app.services.rag_snapshot_service import rag_snapshot_service
+from app.services.recommendation_service import recommendation_service
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -58,6 +60,10 @@ class ProfileUpdate(BaseModel):
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
+# Profile fields that feed networking scores, reasons or match cards.
+NETWORKING_FIELDS = {"name", "company", "industry", "interests", "skills", "goals", "avatar"}
+
+
 def _serialize_user(user: dict) -> dict:
     return {
         "id": str(user["_id"]),
@@ -109,6 +115,7 @@ async def signup(body: SignupRequest):
 
     result = await db.users.insert_one(user_doc)
     user_doc["_id"] = result.inserted_id
+    await rag_snapshot_service.bump("users")
 
     token = create_access_token({"sub": str(result.inserted_id)})
 
@@ -171,6 +178,10 @@ async def update_profile(
             updates[field] = val
 
     await db.users.update_one({"_id": ObjectId(user_id)}, {"$set": updates})
+    await rag_snapshot_service.bump("users")
+
+    if NETWORKING_FIELDS & updates.keys():
+        await recommendation_service.profile_changed(user_id)
 
     user = await db.users.find_one({"_id": ObjectId(user_id)})
     return _serialize_user(user)
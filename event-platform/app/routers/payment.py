@@ -8,17 +8,35 @@ from app.services.registration_service import registration_service
 router = APIRouter(prefix="/api/payment", tags=["payment"])
 
 
+def _checkout_metadata(registration_id: str | None, group_id: str | None) -> dict:
+    """What a payment pays for: one registration or a whole group checkout."""
+
+    if (registration_id is None) == (group_id is None):
+        raise HTTPException(status_code=400, detail="Provide either registration_id or group_id")
+    return {"group_id": group_id} if group_id else {"registration_id": registration_id}
+
+
+async def _confirm_checkout(metadata: dict, payment_data: dict) -> bool:
+    if metadata.get("group_id"):
+        return await registration_service.confirm_group_payment(metadata["group_id"], payment_data) > 0
+    if metadata.get("registration_id"):
+        return await registration_service.confirm_payment(metadata["registration_id"], payment_data)
+    return False
+
+
 @router.post("/stripe/create-intent")
 async def create_stripe_payment_intent(
     amount: float,
-    registration_id: str,
+    registration_id: str | None = None,
     currency: str = "usd",
+    group_id: str | None = None,
 ):
+    metadata = _checkout_metadata(registration_id, group_id)
     try:
         result = await payment_service.create_stripe_payment_intent(
             amount,
             currency,
-            metadata={"registration_id": registration_id},
+            metadata=metadata,
         )
         if not result["success"]:
             raise HTTPException(status_code=400, detail=result["error"])
@@ -43,16 +61,14 @@ async def stripe_webhook(request: Request):
 
     if event["type"] == "payment_intent.succeeded":
         payment_intent = event["data"]["object"]
-        registration_id = payment_intent["metadata"].get("registration_id")
-        if registration_id:
-            await registration_service.confirm_payment(
-                registration_id,
-                {
-                    "payment_method": "stripe",
-                    "payment_intent_id": payment_intent["id"],
-                    "transaction_id": payment_intent["id"],
-                },
-            )
+        await _confirm_checkout(
+            payment_intent["metadata"],
+            {
+                "payment_method": "stripe",
+                "payment_intent_id": payment_intent["id"],
+                "transaction_id": payment_intent["id"],
+            },
+        )
 
     return {"success": True}
 
@@ -62,12 +78,14 @@ async def create_paypal_payment(
     amount: float,
     description: str = "Event Registration",
     registration_id: str | None = None,
+    group_id: str | None = None,
 ):
+    checkout = "&".join(f"{key}={value}" for key, value in _checkout_metadata(registration_id, group_id).items())
     try:
         result = await payment_service.create_paypal_payment(
             amount,
             description=description,
-            return_url=f"{settings.app_url}/payment/paypal/success?registration_id={registration_id}",
+            return_url=f"{settings.app_url}/payment/paypal/success?{checkout}",
             cancel_url=f"{settings.app_url}/payment/paypal/cancel",
         )
         if not result["success"]:
@@ -78,14 +96,20 @@ async def create_paypal_payment(
 
 
 @router.post("/paypal/execute-payment")
-async def execute_paypal_payment(payment_id: str, payer_id: str, registration_id: str):
+async def execute_paypal_payment(
+    payment_id: str,
+    payer_id: str,
+    registration_id: str | None = None,
+    group_id: str | None = None,
+):
+    metadata = _checkout_metadata(registration_id, group_id)
     try:
         result = await payment_service.execute_paypal_payment(payment_id, payer_id)
         if not result["success"]:
             raise HTTPException(status_code=400, detail=result["error"])
 
-        await registration_service.confirm_payment(
-            registration_id,
+        await _confirm_checkout(
+            metadata,
             {
                 "payment_method": "paypal",
                 "paypal_order_id": payment_id,
@@ -1,18 +1,23 @@
+import hashlib
 import io
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
 
 from app.database import get_database
 from app.schemas.registration import (
+    GroupRegistrationCreate,
     PricingCalculation,
     RegistrationCreate,
 )
 from app.services.pricing_service import pricing_service
+from app.services.hold_sweeper import hold_sweeper
+from app.services.qrcode_service import QR_FORMATS, qrcode_service
 from app.services.registration_service import registration_service
+from app.services.ticket_type_cache import ticket_type_cache
 from app.utils.export import export_service
 
 router = APIRouter(prefix="/api/registrations", tags=["registrations"])
@@ -62,7 +67,7 @@ async def create_registration(
             "success": True,
             "registration_id": result["registration_id"],
             "qr_code": result["qr_code"],
-            "qr_code_image": result["qr_code_image"],
+            "qr_code_url": result["qr_code_url"],
             "pricing": result["pricing"],
             "payment_required": result["payment_required"],
         }
@@ -70,6 +75,51 @@ async def create_registration(
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
+@router.post("/group", response_model=dict)
+async def create_group_registration(
+    registration: GroupRegistrationCreate,
+    user_id: Optional[str] = None,
+):
+    try:
+        result = await registration_service.create_group_registration(
+            registration.model_dump(),
+            user_id,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:  # pragma: no cover
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+    if not result["success"]:
+        if result.get("waitlist"):
+            return {
+                "success": False,
+                "message": "Not enough tickets for the group. The attendees have been added to the waitlist.",
+                "waitlist": True,
+                "results": result["results"],
+            }
+        raise HTTPException(
+            status_code=400,
+            detail={"reason": result.get("reason", "No attendees were registered"), "results": result["results"]},
+        )
+    return result
+
+
+@router.post("/group/{group_id}/confirm-payment")
+async def confirm_group_payment(group_id: str, payment_data: dict):
+    """Confirm a paid group checkout: every held registration of the group."""
+
+    confirmed = await registration_service.confirm_group_payment(group_id, payment_data)
+    if not confirmed:
+        raise HTTPException(status_code=400, detail="No held registrations to confirm for this group")
+    return {"success": True, "confirmed": confirmed, "message": "Payment confirmed successfully"}
+
+
+@router.get("/holds/sweeper", response_model=dict)
+async def get_hold_sweeper_metrics():
+    return hold_sweeper.metrics()
+
+
 @router.get("/{registration_id}", response_model=dict)
 async def get_registration(registration_id: str):
     db = await get_database()
@@ -81,13 +131,11 @@ async def get_registration(registration_id: str):
         raise HTTPException(status_code=404, detail="Registration not found")
 
     event = await db.events.find_one({"_id": ObjectId(registration["event_id"])})
-    ticket_type = await db.ticket_types.find_one(
-        {"_id": ObjectId(registration["ticket_type_id"])}
-    )
+    ticket_type = await ticket_type_cache.get(registration["ticket_type_id"])
 
     registration["_id"] = str(registration["_id"])
     registration["event_name"] = event.get("name") if event else None
-    registration["ticket_type_name"] = ticket_type.get("name") if ticket_type else None
+    registration["ticket_type_name"] = ticket_type.name if ticket_type else None
 
     return registration
 
@@ -132,8 +180,9 @@ async def get_event_registrations(
             {"company": {"$regex": search, "$options": "i"}},
         ]
 
+    # Registrations stored before migrations.strip_qr_images still carry an image.
     registrations = (
-        await db.registrations.find(query).skip(skip).limit(limit).to_list(limit)
+        await db.registrations.find(query, {"qr_code_image": 0}).skip(skip).limit(limit).to_list(limit)
     )
     for reg in registrations:
         reg["_id"] = str(reg["_id"])
@@ -179,15 +228,36 @@ async def check_in_by_qr(qr_code: str):
     }
 
 
+@router.get("/qr-code/{qr_code}")
+async def get_qr_code_image(
+    qr_code: str,
+    request: Request,
+    image_format: Literal["png", "svg"] = Query("png", alias="format"),
+):
+    if len(qr_code) > 64 or not qrcode_service.verify_qr_code(qr_code):
+        raise HTTPException(status_code=400, detail="Invalid QR code")
+
+    # The image is a pure function of the code and format: cache it forever.
+    etag = '"' + hashlib.sha1(f"{image_format}:{qr_code}".encode()).hexdigest()[:20] + '"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if etag in [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    image = await qrcode_service.render(qr_code, image_format)
+    return Response(content=image, media_type=QR_FORMATS[image_format], headers=headers)
+
+
 @router.get("/event/{event_id}/export/csv")
 async def export_registrations_csv(event_id: str):
     db = await get_database()
-    registrations = await db.registrations.find({"event_id": event_id}).to_list(10000)
+    registrations = await db.registrations.find(
+        {"event_id": event_id}, {"qr_code_image": 0}
+    ).to_list(10000)
 
     for reg in registrations:
         reg["_id"] = str(reg["_id"])
-        ticket_type = await db.ticket_types.find_one({"_id": ObjectId(reg["ticket_type_id"])})
-        reg["ticket_type_name"] = ticket_type.get("name") if ticket_type else ""
+        ticket_type = await ticket_type_cache.get(reg["ticket_type_id"])
+        reg["ticket_type_name"] = ticket_type.name if ticket_type else ""
 
     csv_data = await export_service.export_registrations_csv(registrations)
 
@@ -203,12 +273,14 @@ async def export_registrations_csv(event_id: str):
 @router.get("/event/{event_id}/export/excel")
 async def export_registrations_excel(event_id: str):
     db = await get_database()
-    registrations = await db.registrations.find({"event_id": event_id}).to_list(10000)
+    registrations = await db.registrations.find(
+        {"event_id": event_id}, {"qr_code_image": 0}
+    ).to_list(10000)
 
     for reg in registrations:
         reg["_id"] = str(reg["_id"])
-        ticket_type = await db.ticket_types.find_one({"_id": ObjectId(reg["ticket_type_id"])})
-        reg["ticket_type_name"] = ticket_type.get("name") if ticket_type else ""
+        ticket_type = await ticket_type_cache.get(reg["ticket_type_id"])
+        reg["ticket_type_name"] = ticket_type.name if ticket_type else ""
 
     excel_data = await export_service.export_registrations_excel(registrations)
 
@@ -7,6 +7,7 @@ from fastapi import APIRouter, HTTPException
 from app.database import get_database
 from app.models.ticket import TicketType
 from app.schemas.ticket import TicketTypeCreate
+from app.services.ticket_type_cache import ticket_type_cache
 
 router = APIRouter(prefix="/api/tickets", tags=["tickets"])
 
@@ -32,6 +33,7 @@ async def get_event_tickets(event_id: str, active_only: bool = True):
     now = datetime.utcnow()
 
     for ticket in tickets:
+        ticket_type_cache.prime(ticket)
         ticket["_id"] = str(ticket["_id"])
         current_price = ticket["base_price"]
 
@@ -71,6 +73,7 @@ async def update_ticket_type(ticket_id: str, update_data: dict):
         {"_id": ObjectId(ticket_id)},
         {"$set": update_data},
     )
+    ticket_type_cache.invalidate(ticket_id)
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Ticket type not found")
     return {"success": True, "message": "Ticket type updated"}
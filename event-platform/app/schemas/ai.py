@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Any, Optional
+from datetime import datetime
+from typing import Any, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -9,6 +10,7 @@ class NetworkingRequest(BaseModel):
     user: dict
     attendees: list[dict]
     limit: int = Field(default=3, ge=1, le=20)
+    semantic: bool = False
 
 
 class NetworkingRecommendation(BaseModel):
@@ -19,9 +21,78 @@ class NetworkingRecommendation(BaseModel):
     match: dict
 
 
+class NetworkingBatchRequest(BaseModel):
+    limit: int = Field(default=3, ge=1, le=20)
+    workers: int = Field(default=2, ge=1, le=32)
+    chunk_size: int = Field(default=256, ge=1, le=5000)
+
+
+class NetworkingJobStatus(BaseModel):
+    job_id: str
+    event_id: str
+    status: str
+    total: int = 0
+    completed: int = 0
+    generation: Optional[int] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class StoredNetworkingRecommendations(BaseModel):
+    event_id: str
+    user_id: str
+    generation: int
+    recommendations: list[NetworkingRecommendation]
+    computed_at: datetime
+
+
+class NetworkingRoundsRequest(BaseModel):
+    rounds: int = Field(default=5, ge=1, le=50)
+    table_size: int = Field(default=2, ge=2, le=12)
+
+
+class NetworkingSeat(BaseModel):
+    id: str
+    name: str
+
+
+class NetworkingTable(BaseModel):
+    attendees: list[NetworkingSeat]
+    score: float
+
+
+class NetworkingRound(BaseModel):
+    round: int
+    score: float
+    tables: list[NetworkingTable]
+
+
+class NetworkingRoundsResponse(BaseModel):
+    event_id: str
+    attendees: int
+    total_score: float
+    rounds: list[NetworkingRound]
+
+
 class RagChatRequest(BaseModel):
     query: str
     snapshot: Optional[dict] = None
+    top_k: int = Field(default=3, ge=1, le=20)
+    # Search only the FAQ plus this organization's / event's documents;
+    # without them, everything the caller can see.
+    organization_id: Optional[str] = None
+    event_id: Optional[str] = None
+    # Only passages from these sources, e.g. ["session"].
+    sources: Optional[list[Literal["faq", "event", "attendee", "session"]]] = None
+
+
+class RagPassage(BaseModel):
+    text: str
+    answer: str
+    source: str
+    score: float
+    metadata: dict[str, Any] = Field(default_factory=dict)
 
 
 class RagChatResponse(BaseModel):
@@ -29,8 +100,14 @@ class RagChatResponse(BaseModel):
     source: Optional[str] = None
     score: float = 0.0
     metadata: dict[str, Any] = Field(default_factory=dict)
+    passages: list[RagPassage] = Field(default_factory=list)
 
 
 class AiHealthResponse(BaseModel):
     ok: bool
     rag_backend: str
+    warmup_state: str
+    warmup_seconds: Optional[float] = None
+    warmup_error: Optional[str] = None
+    inference: dict[str, Any] = Field(default_factory=dict)
+    answer_cache: dict[str, Any] = Field(default_factory=dict)
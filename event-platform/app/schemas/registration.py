@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
@@ -17,6 +17,12 @@ class RegistrationCreate(BaseModel):
     group_size: int = 1
     discount_code: Optional[str] = None
 
+    @field_validator("email")
+    @classmethod
+    def normalize_email(cls, value: str) -> str:
+        # Stored lowercased so the (event_id, email) index treats A@x.com and a@x.com as one attendee.
+        return value.lower()
+
     @field_validator("group_size")
     @classmethod
     def validate_group_size(cls, value: int) -> int:
@@ -27,6 +33,40 @@ class RegistrationCreate(BaseModel):
         return value
 
 
+class GroupAttendee(BaseModel):
+    first_name: str
+    last_name: str
+    email: EmailStr
+    phone: Optional[str] = None
+    company: Optional[str] = None
+    job_title: Optional[str] = None
+    form_responses: Optional[Dict[str, Any]] = None
+
+    @field_validator("email")
+    @classmethod
+    def normalize_email(cls, value: str) -> str:
+        return value.lower()
+
+
+class GroupRegistrationCreate(BaseModel):
+    event_id: str
+    ticket_type_id: str
+    attendees: List[GroupAttendee]
+    discount_code: Optional[str] = None
+
+    @field_validator("attendees")
+    @classmethod
+    def validate_attendees(cls, value: List[GroupAttendee]) -> List[GroupAttendee]:
+        if not value:
+            raise ValueError("At least one attendee is required")
+        if len(value) > 50:
+            raise ValueError("Group size cannot exceed 50")
+        emails = [attendee.email for attendee in value]
+        if len(set(emails)) != len(emails):
+            raise ValueError("Attendee emails must be unique")
+        return value
+
+
 class RegistrationResponse(BaseModel):
     id: str
     event_id: str
@@ -38,7 +78,7 @@ class RegistrationResponse(BaseModel):
     final_price: float
     discount_amount: float
     qr_code: str
-    qr_code_image: Optional[str] = None
+    qr_code_url: Optional[str] = None
     payment_status: str
     created_at: datetime
 
@@ -1,13 +1,25 @@
+from .access_service import access_service
+from .analytics_service import analytics_service
 from .email_service import email_service
+from .hold_sweeper import hold_sweeper
 from .payment_service import payment_service
 from .pricing_service import pricing_service
 from .qrcode_service import qrcode_service
+from .rag_snapshot_service import rag_snapshot_service
+from .recommendation_service import recommendation_service
 from .registration_service import registration_service
+from .ticket_type_cache import ticket_type_cache
 
 __all__ = [
+    "access_service",
+    "analytics_service",
     "email_service",
+    "hold_sweeper",
     "payment_service",
     "pricing_service",
     "qrcode_service",
+    "rag_snapshot_service",
+    "recommendation_service",
     "registration_service",
+    "ticket_type_cache",
 ]
@@ -0,0 +1,115 @@
+"""Who may see and manage which events.
+
+An organization member sees its events; an attendee sees the events they
+are registered for; an event is managed by its `organizer_id` and by members
+whose role grants `edit_event` in its organization. Chat requests are scoped
+with `chat_scope`, so a client never picks another tenant's data by leaving
+the scope empty.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+from app.database import get_database
+from app.models.user_organization import UserRole
+from app.rbac import PERMISSIONS, has_permission
+
+ACTIVE_REGISTRATION_STATUSES = ["pending", "confirmed"]
+
+
+@dataclass(frozen=True)
+class ChatScope:
+    organization_ids: Tuple[str, ...] = ()
+    event_ids: Tuple[str, ...] = ()
+
+    @property
+    def key(self) -> str:
+        return f"{','.join(sorted(self.organization_ids))}|{','.join(sorted(self.event_ids))}"
+
+
+class AccessService:
+    async def organization_ids(self, user_id: str) -> List[str]:
+        db = await get_database()
+        return [
+            doc["organization_id"]
+            async for doc in db.user_organizations.find({"user_id": user_id}, {"organization_id": 1})
+        ]
+
+    async def attended_event_ids(self, user_id: str) -> List[str]:
+        """Events the user organizes or holds an active registration for."""
+
+        db = await get_database()
+        organized = [str(doc["_id"]) async for doc in db.events.find({"organizer_id": user_id}, {"_id": 1})]
+        registered = await db.registrations.distinct(
+            "event_id", {"user_id": user_id, "status": {"$in": ACTIVE_REGISTRATION_STATUSES}}
+        )
+        return list(dict.fromkeys([*organized, *registered]))
+
+    async def can_manage_event(self, user_id: str, event: Dict[str, Any]) -> bool:
+        if event.get("organizer_id") == user_id:
+            return True
+        organization_id = event.get("organization_id")
+        if not organization_id:
+            return False
+        db = await get_database()
+        membership = await db.user_organizations.find_one(
+            {"user_id": user_id, "organization_id": organization_id}, {"role": 1}
+        )
+        try:
+            role = UserRole(membership.get("role")) if membership else None
+        except ValueError:
+            return False
+        return role is not None and has_permission(role, PERMISSIONS["EDIT_EVENT"])
+
+    async def managed_event(self, user_id: str, event_id: str) -> Optional[Dict[str, Any]]:
+        """The event if it exists and `user_id` may manage it, else None."""
+
+        if not ObjectId.is_valid(event_id):
+            return None
+        db = await get_database()
+        event = await db.events.find_one(
+            {"_id": ObjectId(event_id)}, {"name": 1, "organization_id": 1, "organizer_id": 1}
+        )
+        if event is None or not await self.can_manage_event(user_id, event):
+            return None
+        return event
+
+    async def chat_scope(
+        self,
+        user_id: str,
+        organization_id: Optional[str] = None,
+        event_id: Optional[str] = None,
+    ) -> Optional[ChatScope]:
+        """Organizations and events a chat request from `user_id` searches, or
+        None when it names an organization or event the user cannot see.
+
+        Without `organization_id` and `event_id` the scope is everything the
+        user can see. An `event_id` outside the given organization, or one
+        that does not exist, matches nothing.
+        """
+
+        organizations = await self.organization_ids(user_id)
+        if event_id is not None:
+            if not ObjectId.is_valid(event_id):
+                return ChatScope()
+            db = await get_database()
+            event = await db.events.find_one({"_id": ObjectId(event_id)}, {"organization_id": 1})
+            if event is None or (organization_id is not None and event.get("organization_id") != organization_id):
+                return ChatScope()
+            attended = await self.attended_event_ids(user_id)
+            if event.get("organization_id") not in organizations and event_id not in attended:
+                return None
+            return ChatScope(event_ids=(event_id,))
+        if organization_id is not None:
+            if organization_id not in organizations:
+                return None
+            return ChatScope(organization_ids=(organization_id,))
+        return ChatScope(
+            organization_ids=tuple(organizations),
+            event_ids=tuple(await self.attended_event_ids(user_id)),
+        )
+
+
+access_service = AccessService()
@@ -0,0 +1,310 @@
+"""Answers to analytics chat intents from targeted MongoDB queries.
+
+Each intent runs one or two indexed queries (`count_documents`, a `$group`
+aggregation or a capped `find`), limited to the chat's `ChatScope`, instead
+of reading whole collections into a snapshot.
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+
+from app.ai.intents import Intent
+from app.database import get_database
+from app.services.access_service import ChatScope
+from app.services.pricing_service import seats_left
+
+ACTIVE_REGISTRATION_STATUSES = ["pending", "confirmed"]
+
+# Ticket type fields `seats_left` reads.
+SEAT_PROJECTION = {
+    "capacity": 1,
+    "sold_count": 1,
+    "reserved": 1,
+    "is_active": 1,
+    "valid_from": 1,
+    "valid_until": 1,
+}
+
+# Names listed in an answer; totals are always exact.
+LIST_LIMIT = 10
+ATTENDEE_LIST_LIMIT = 20
+
+
+def _response(intent: Intent, answer: str, **metadata: Any) -> Dict[str, Any]:
+    return {
+        "answer": answer,
+        "source": "analytics",
+        "score": 1.0,
+        "metadata": {"intent": intent.kind, **metadata},
+        "passages": [],
+    }
+
+
+def _plural(count: int, noun: str) -> str:
+    return f"{count} {noun}{'' if count == 1 else 's'}"
+
+
+def _there_are(count: int, noun: str) -> str:
+    return f"There {'is' if count == 1 else 'are'} {_plural(count, noun)}"
+
+
+def _event_filter(scope: ChatScope) -> Dict[str, Any]:
+    """Events in `scope`; matches nothing for an empty scope."""
+
+    clauses: List[Dict[str, Any]] = []
+    if scope.organization_ids:
+        clauses.append({"organization_id": {"$in": list(scope.organization_ids)}})
+    event_ids = [ObjectId(event_id) for event_id in scope.event_ids if ObjectId.is_valid(event_id)]
+    if event_ids:
+        clauses.append({"_id": {"$in": event_ids}})
+    if not clauses:
+        return {"_id": {"$in": []}}
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def _registration_filter(scope: ChatScope) -> Dict[str, Any]:
+    """Active registrations for the events in `scope`, by the organization
+    stored on each registration rather than a list of its events."""
+
+    clauses: List[Dict[str, Any]] = []
+    if scope.organization_ids:
+        clauses.append({"organization_id": {"$in": list(scope.organization_ids)}})
+    if scope.event_ids:
+        clauses.append({"event_id": {"$in": list(scope.event_ids)}})
+    if not clauses:
+        return {"_id": {"$in": []}}
+    active = {"status": {"$in": ACTIVE_REGISTRATION_STATUSES}}
+    return {**active, **clauses[0]} if len(clauses) == 1 else {**active, "$or": clauses}
+
+
+def _seats(ticket_types: Iterable[Dict[str, Any]]) -> Dict[str, Optional[int]]:
+    """Capacity, sold or held tickets and tickets still on sale, from the
+    ticket type counters checkout reserves against. Capacity and remaining
+    seats are None when a ticket type has no limit."""
+
+    now = datetime.utcnow()
+    capacity = taken = remaining = 0
+    unlimited = False
+    for ticket_type in ticket_types:
+        capacity += ticket_type.get("capacity") or 0
+        taken += (ticket_type.get("sold_count") or 0) + (ticket_type.get("reserved") or 0)
+        left = seats_left(ticket_type, now)
+        if left is None:
+            unlimited = True
+        else:
+            remaining += left
+    if unlimited:
+        return {"capacity": None, "taken": taken, "remaining": None}
+    return {"capacity": capacity, "taken": taken, "remaining": remaining}
+
+
+def _where(scope: ChatScope) -> str:
+    if len(scope.organization_ids) == 1 and not scope.event_ids:
+        return "in this organization"
+    return "across your events"
+
+
+class AnalyticsService:
+    async def answer(
+        self,
+        intent: Intent,
+        scope: ChatScope,
+    ) -> Optional[Dict[str, Any]]:
+        """Chat response for `intent` over the events in `scope`, or None when
+        it cannot be answered exactly (e.g. the named event does not exist)
+        and retrieval should handle the question instead."""
+
+        db = await get_database()
+        in_scope = _event_filter(scope)
+
+        event = None
+        if intent.event is not None:
+            event = await self._find_event(db, intent.event, in_scope)
+            if event is None:
+                return None
+        elif (
+            len(scope.event_ids) == 1
+            and not scope.organization_ids
+            and intent.kind in ("capacity", "registration_count", "attendees")
+        ):
+            # A chat about a single event asks about that event.
+            event = await db.events.find_one(in_scope, {"name": 1, "location": 1})
+            if event is None:
+                return None
+
+        if event is not None:
+            if intent.kind == "capacity":
+                return await self._event_capacity(db, intent, event)
+            if intent.kind == "registration_count":
+                return await self._event_registrations(db, intent, event)
+            if intent.kind == "attendees":
+                return await self._event_attendees(db, intent, event)
+            # Other questions naming an event ("which events are in Berlin")
+            # are left to retrieval.
+            return None
+
+        if intent.kind == "event_count":
+            return await self._events(db, intent, scope, in_scope)
+        if intent.kind == "user_count" and scope.organization_ids:
+            return await self._user_count(db, intent, scope, in_scope)
+        if intent.kind == "registration_count":
+            return await self._registration_count(db, intent, scope, in_scope)
+        if intent.kind == "capacity":
+            return await self._capacity(db, intent, in_scope)
+        if intent.kind == "locations":
+            return await self._locations(db, intent, in_scope)
+        if intent.kind == "event_list":
+            return await self._events(db, intent, scope, in_scope)
+        # Attendees of no particular event are left to retrieval.
+        return None
+
+    async def _find_event(self, db, name: str, in_scope: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # `name_lower` is indexed; an exact match and a case-sensitive anchored
+        # regex on it are both index range scans.
+        projection = {"name": 1, "location": 1}
+        lowered = name.lower()
+        exact = await db.events.find_one({"name_lower": lowered, **in_scope}, projection)
+        if exact is not None:
+            return exact
+        # Otherwise the earliest event whose name starts with it ("PyCon" -> "PyCon 2025").
+        prefix = {"name_lower": {"$regex": f"^{re.escape(lowered)}"}, **in_scope}
+        return await db.events.find_one(prefix, projection, sort=[("start_date", 1)])
+
+    async def _events(self, db, intent: Intent, scope: ChatScope, in_scope: Dict[str, Any]) -> Dict[str, Any]:
+        total = await db.events.count_documents(in_scope)
+        names = [
+            doc.get("name") or "Untitled"
+            async for doc in db.events.find(in_scope, {"name": 1}).sort("start_date", 1).limit(LIST_LIMIT)
+        ]
+        listed = ", ".join(names) or "No events yet"
+        more = f" (and {total - len(names)} more)" if total > len(names) else ""
+        return _response(
+            intent,
+            f"{_there_are(total, 'event')} {_where(scope)}: {listed}{more}.",
+            events=total,
+            names=names,
+        )
+
+    async def _user_count(self, db, intent: Intent, scope: ChatScope, in_scope: Dict[str, Any]) -> Dict[str, Any]:
+        members = {"organization_id": {"$in": list(scope.organization_ids)}}
+        users = await db.user_organizations.count_documents(members)
+        registrations = await db.registrations.count_documents(_registration_filter(scope))
+        return _response(
+            intent,
+            f"{_there_are(users, 'registered user')} {_where(scope)}, "
+            f"with {_plural(registrations, 'active event registration')}.",
+            users=users,
+            registrations=registrations,
+        )
+
+    async def _registration_count(
+        self, db, intent: Intent, scope: ChatScope, in_scope: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        registrations = await db.registrations.count_documents(_registration_filter(scope))
+        events = await db.events.count_documents(in_scope)
+        return _response(
+            intent,
+            f"{_there_are(registrations, 'active registration')} across {_plural(events, 'event')}.",
+            registrations=registrations,
+            events=events,
+        )
+
+    async def _capacity(self, db, intent: Intent, in_scope: Dict[str, Any]) -> Dict[str, Any]:
+        # The ticket types of the events in scope, joined on the server.
+        rows = await db.events.aggregate(
+            [
+                {"$match": in_scope},
+                {"$project": {"event_id": {"$toString": "$_id"}}},
+                {
+                    "$lookup": {
+                        "from": "ticket_types",
+                        "localField": "event_id",
+                        "foreignField": "event_id",
+                        "as": "ticket_types",
+                    }
+                },
+                {"$project": {f"ticket_types.{field}": 1 for field in SEAT_PROJECTION}},
+            ]
+        ).to_list(None)
+        seats = _seats(ticket_type for row in rows for ticket_type in row["ticket_types"])
+        events = len(rows)
+        if seats["remaining"] is None:
+            answer = (
+                f"Seats are unlimited for at least one of {_plural(events, 'event')}, "
+                f"with {seats['taken']} taken so far."
+            )
+        else:
+            answer = (
+                f"The combined capacity across {_plural(events, 'event')} is {_plural(seats['capacity'], 'seat')}, "
+                f"with {seats['taken']} taken and {seats['remaining']} still available."
+            )
+        return _response(intent, answer, events=events, **seats)
+
+    async def _locations(self, db, intent: Intent, in_scope: Dict[str, Any]) -> Dict[str, Any]:
+        rows = await db.events.aggregate(
+            [
+                {"$match": {**in_scope, "location": {"$nin": [None, ""]}}},
+                {"$group": {"_id": "$location", "events": {"$sum": 1}}},
+                {"$sort": {"events": -1, "_id": 1}},
+                {"$limit": LIST_LIMIT},
+            ]
+        ).to_list(LIST_LIMIT)
+        locations = [row["_id"] for row in rows]
+        return _response(
+            intent,
+            f"Events are located at: {', '.join(locations) or 'No locations set'}.",
+            locations=locations,
+        )
+
+    async def _event_capacity(self, db, intent: Intent, event: Dict[str, Any]) -> Dict[str, Any]:
+        seats = _seats(await db.ticket_types.find({"event_id": str(event["_id"])}, SEAT_PROJECTION).to_list(None))
+        if seats["remaining"] is None:
+            answer = f"{event.get('name')} has no seat limit: {seats['taken']} taken so far."
+        else:
+            answer = (
+                f"{event.get('name')} has a capacity of {_plural(seats['capacity'], 'seat')}: "
+                f"{seats['taken']} taken, {seats['remaining']} still available."
+            )
+        return _response(intent, answer, event_id=str(event["_id"]), **seats)
+
+    async def _event_registrations(self, db, intent: Intent, event: Dict[str, Any]) -> Dict[str, Any]:
+        registrations = await db.registrations.count_documents(
+            {"event_id": str(event["_id"]), "status": {"$in": ACTIVE_REGISTRATION_STATUSES}}
+        )
+        return _response(
+            intent,
+            f"{event.get('name')} has {_plural(registrations, 'active registration')}.",
+            event_id=str(event["_id"]),
+            registrations=registrations,
+        )
+
+    async def _event_attendees(self, db, intent: Intent, event: Dict[str, Any]) -> Dict[str, Any]:
+        query = {"event_id": str(event["_id"]), "status": {"$in": ACTIVE_REGISTRATION_STATUSES}}
+        total = await db.registrations.count_documents(query)
+        rows: List[Dict[str, Any]] = (
+            await db.registrations.find(query, {"first_name": 1, "last_name": 1, "company": 1})
+            .sort("created_at", 1)
+            .limit(ATTENDEE_LIST_LIMIT)
+            .to_list(ATTENDEE_LIST_LIMIT)
+        )
+        names = [
+            " ".join(filter(None, [r.get("first_name"), r.get("last_name")])) or "Attendee"
+            for r in rows
+        ]
+        if not names:
+            return _response(intent, f"Nobody has registered for {event.get('name')} yet.", event_id=str(event["_id"]))
+        listed = ", ".join(f"{name} ({r.get('company') or 'no company'})" for name, r in zip(names, rows))
+        more = f" and {total - len(names)} more" if total > len(names) else ""
+        return _response(
+            intent,
+            f"{_plural(total, 'attendee')} registered for {event.get('name')}: {listed}{more}.",
+            event_id=str(event["_id"]),
+            attendees=total,
+            names=names,
+        )
+
+
+analytics_service = AnalyticsService()
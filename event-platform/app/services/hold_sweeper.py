@@ -0,0 +1,190 @@
+"""Expiry of unpaid registration holds.
+
+A pending registration holds its tickets in the ticket type's `reserved`
+counter until `hold_expires_at`. Every worker runs `HoldSweeper`, which
+periodically marks expired holds EXPIRED and gives their tickets back:
+
+1. read a batch of expired PENDING holds through the
+   `(status, hold_expires_at)` index;
+2. claim them with one `update_many` that only matches holds still PENDING
+   and tags them with this sweep's id, so a hold claimed by another worker
+   (or paid meanwhile) is never released twice;
+3. mark the claimed holds `hold_released_at` with a release id, sum the
+   quantities of the holds that release actually marked per ticket type in
+   one aggregation and give them back with a single `bulk_write` of `$inc`s;
+4. offer the freed tickets to each ticket type's waitlist.
+
+Claimed holds without `hold_released_at` (their sweep died between steps 2
+and 3) are released at the start of a later sweep. A hold is marked released
+at most once, so however old the sweep and however many workers recover it,
+its tickets are never returned twice. A sweep dying between the marking and
+the `$inc` leaves those tickets reserved instead, which undersells but never
+oversells.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.database import get_database
+from app.models.registration import RegistrationStatus
+from app.services.recommendation_service import recommendation_service
+from app.services.registration_service import registration_service
+
+# A claim younger than this may belong to a sweep still in progress.
+RECOVERY_GRACE = timedelta(minutes=1)
+
+
+class HoldSweeper:
+    def __init__(self, interval: float, batch_size: int) -> None:
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.sweeps = 0
+        self.expired_holds = 0
+        self.released_tickets = 0
+        self.busy_seconds = 0.0
+        self.last_sweep_ms = 0.0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+                self.last_error = None
+            except Exception as exc:  # keep sweeping after transient database errors
+                self.last_error = str(exc)
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self, now: Optional[datetime] = None) -> int:
+        """Release every hold expired at `now`; returns how many this worker
+        expired."""
+
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        await self._recover(now)
+        expired = 0
+        while True:
+            candidates, claimed = await self._sweep_batch(now)
+            expired += claimed
+            if candidates < self.batch_size:
+                break
+        self.sweeps += 1
+        self.last_sweep_ms = (time.perf_counter() - started) * 1e3
+        self.busy_seconds += self.last_sweep_ms / 1e3
+        return expired
+
+    async def _recover(self, now: datetime) -> None:
+        # Holds claimed by a sweep that died before recording their release.
+        db = await get_database()
+        sweep_ids = await db.registrations.distinct(
+            "hold_sweep_id",
+            {
+                "status": RegistrationStatus.EXPIRED,
+                "hold_sweep_id": {"$ne": None},
+                "hold_released_at": None,
+                "updated_at": {"$lte": now - RECOVERY_GRACE},
+            },
+        )
+        for sweep_id in sweep_ids:
+            await self.release(sweep_id, now)
+
+    async def _sweep_batch(self, now: datetime) -> Tuple[int, int]:
+        db = await get_database()
+        expired_holds = {"status": RegistrationStatus.PENDING, "hold_expires_at": {"$lte": now}}
+        candidates = await db.registrations.find(expired_holds, {"_id": 1}).limit(self.batch_size).to_list(
+            self.batch_size
+        )
+        if not candidates:
+            return 0, 0
+
+        sweep_id = ObjectId()
+        await db.registrations.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in candidates]}, **expired_holds},
+            {"$set": {"status": RegistrationStatus.EXPIRED, "hold_sweep_id": sweep_id, "updated_at": now}},
+        )
+        return len(candidates), await self.release(sweep_id, now)
+
+    async def release(self, sweep_id: ObjectId, now: Optional[datetime] = None) -> int:
+        """Give back the tickets of the holds claimed by `sweep_id` that are
+        not released yet; returns how many holds it released.
+
+        Safe to repeat and to run concurrently: each hold is marked
+        `hold_released_at` by exactly one call, which tags it with its
+        `hold_release_id` and returns only the tickets of the holds it tagged.
+        """
+
+        db = await get_database()
+        now = now or datetime.utcnow()
+        unreleased = {"hold_sweep_id": sweep_id, "hold_released_at": None}
+        release_id = ObjectId()
+        marked = await db.registrations.update_many(
+            unreleased, {"$set": {"hold_released_at": now, "hold_release_id": release_id}}
+        )
+        if marked.modified_count == 0:
+            return 0
+        released: List[Dict[str, Any]] = await db.registrations.aggregate(
+            [
+                {"$match": {"hold_sweep_id": sweep_id, "hold_release_id": release_id}},
+                {
+                    "$group": {
+                        "_id": {"ticket_type_id": "$ticket_type_id", "event_id": "$event_id"},
+                        "quantity": {"$sum": "$group_size"},
+                        "holds": {"$sum": 1},
+                    }
+                },
+            ]
+        ).to_list(None)
+        if not released:
+            return 0
+
+        await db.ticket_types.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": ObjectId(group["_id"]["ticket_type_id"])},
+                    {"$inc": {"reserved": -group["quantity"]}},
+                )
+                for group in released
+            ],
+            ordered=False,
+        )
+        claimed = sum(group["holds"] for group in released)
+        self.expired_holds += claimed
+        self.released_tickets += sum(group["quantity"] for group in released)
+
+        await recommendation_service.bump_population_version(*{group["_id"]["event_id"] for group in released})
+        for group in released:
+            await registration_service.process_waitlist(
+                group["_id"]["event_id"],
+                group["_id"]["ticket_type_id"],
+                group["quantity"],
+            )
+        return claimed
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "sweeps": self.sweeps,
+            "expired_holds": self.expired_holds,
+            "released_tickets": self.released_tickets,
+            "last_sweep_ms": round(self.last_sweep_ms, 2),
+            "holds_per_second": round(self.expired_holds / self.busy_seconds, 1) if self.busy_seconds else 0.0,
+            "last_error": self.last_error,
+        }
+
+
+hold_sweeper = HoldSweeper(settings.hold_sweep_interval_seconds, settings.hold_sweep_batch_size)
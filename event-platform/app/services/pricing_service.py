@@ -2,10 +2,100 @@ from datetime import datetime
 from typing import Optional
 
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from app.database import get_database
 from app.models.discount_code import DiscountCode, DiscountType
 from app.models.ticket import TicketType
+from app.services.ticket_type_cache import COUNTER_PROJECTION, ticket_type_cache
+
+
+def _reservable(ticket_type_id: ObjectId, quantity: int, now: datetime) -> dict:
+    """Filter matching the ticket type only while `quantity` more tickets can
+    be sold: the conditions of `check_availability`, evaluated by MongoDB."""
+
+    return {
+        "_id": ticket_type_id,
+        "is_active": {"$ne": False},
+        "$and": [
+            {"$or": [{"valid_from": None}, {"valid_from": {"$lte": now}}]},
+            {"$or": [{"valid_until": None}, {"valid_until": {"$gte": now}}]},
+            # No capacity (null or 0) means unlimited, as in check_availability.
+            {
+                "$or": [
+                    {"capacity": {"$in": [None, 0]}},
+                    {
+                        "$expr": {
+                            "$gte": [
+                                {
+                                    "$subtract": [
+                                        "$capacity",
+                                        {"$add": [{"$ifNull": ["$sold_count", 0]}, {"$ifNull": ["$reserved", 0]}]},
+                                    ]
+                                },
+                                quantity,
+                            ]
+                        }
+                    },
+                ]
+            },
+        ],
+    }
+
+
+def seats_left(ticket_data: dict, now: datetime) -> Optional[int]:
+    """Tickets of a ticket type document that `reserve` could still hold at
+    `now`: None when its capacity is unlimited, 0 while it is not on sale."""
+
+    if ticket_data.get("is_active") is False:
+        return 0
+    if ticket_data.get("valid_from") and now < ticket_data["valid_from"]:
+        return 0
+    if ticket_data.get("valid_until") and now > ticket_data["valid_until"]:
+        return 0
+    if not ticket_data.get("capacity"):
+        return None
+    taken = (ticket_data.get("sold_count") or 0) + (ticket_data.get("reserved") or 0)
+    return max(ticket_data["capacity"] - taken, 0)
+
+
+def _availability(ticket: TicketType, quantity: int, now: datetime) -> dict:
+    if not ticket.is_active:
+        return {
+            "available": False,
+            "reason": "Ticket type is not active",
+            "waitlist_available": False,
+        }
+
+    if ticket.valid_from and now < ticket.valid_from:
+        return {
+            "available": False,
+            "reason": "Sales have not started yet",
+            "waitlist_available": False,
+        }
+
+    if ticket.valid_until and now > ticket.valid_until:
+        return {
+            "available": False,
+            "reason": "Sales have ended",
+            "waitlist_available": False,
+        }
+
+    if ticket.capacity:
+        available = ticket.capacity - ticket.sold_count - ticket.reserved
+
+        if available < quantity:
+            return {
+                "available": False,
+                "reason": "Not enough tickets available",
+                "available_quantity": max(0, available),
+                "waitlist_available": ticket.waitlist_enabled,
+            }
+
+    return {
+        "available": True,
+        "available_quantity": ticket.capacity - ticket.sold_count if ticket.capacity else None,
+    }
 
 
 class PricingService:
@@ -15,12 +105,24 @@ class PricingService:
         quantity: int = 1,
         discount_code: Optional[str] = None,
     ) -> dict:
-        db = await get_database()
-        ticket_data = await db.ticket_types.find_one({"_id": ObjectId(ticket_type_id)})
-        if not ticket_data:
+        ticket = await ticket_type_cache.get(ticket_type_id)
+        if ticket is None:
             raise ValueError("Ticket type not found")
+        # Only a capped early-bird price depends on a live counter.
+        if ticket.is_early_bird and ticket.early_bird_price and ticket.early_bird_capacity:
+            ticket = await self._with_counters(ticket_type_id)
+        return await self.price_ticket(ticket, quantity, discount_code)
 
-        ticket = TicketType(**ticket_data)
+    async def price_ticket(
+        self,
+        ticket: TicketType,
+        quantity: int = 1,
+        discount_code: Optional[str] = None,
+    ) -> dict:
+        """`calculate_price` for a ticket type already loaded (e.g. the one
+        returned by `reserve`)."""
+
+        ticket_type_id = str(ticket.id)
         base_price = float(ticket.base_price)
         per_ticket_price = base_price
 
@@ -146,51 +248,68 @@ class PricingService:
         }
 
     async def check_availability(self, ticket_type_id: str, quantity: int = 1) -> dict:
-        db = await get_database()
-        ticket_data = await db.ticket_types.find_one({"_id": ObjectId(ticket_type_id)})
+        ticket = await ticket_type_cache.get(ticket_type_id)
 
-        if not ticket_data:
+        if ticket is None:
             raise ValueError("Ticket type not found")
 
-        ticket = TicketType(**ticket_data)
+        # Unlimited ticket types need no counters.
+        if ticket.capacity:
+            ticket = await self._with_counters(ticket_type_id)
 
-        if not ticket.is_active:
-            return {
-                "available": False,
-                "reason": "Ticket type is not active",
-                "waitlist_available": False,
-            }
+        return _availability(ticket, quantity, datetime.utcnow())
 
-        now = datetime.utcnow()
-        if ticket.valid_from and now < ticket.valid_from:
-            return {
-                "available": False,
-                "reason": "Sales have not started yet",
-                "waitlist_available": False,
-            }
+    async def _with_counters(self, ticket_type_id: str) -> TicketType:
+        db = await get_database()
+        counters = await db.ticket_types.find_one({"_id": ObjectId(ticket_type_id)}, COUNTER_PROJECTION)
+        ticket = await ticket_type_cache.with_counters(ticket_type_id, counters) if counters else None
+        if ticket is None:
+            raise ValueError("Ticket type not found")
+        return ticket
 
-        if ticket.valid_until and now > ticket.valid_until:
-            return {
-                "available": False,
-                "reason": "Sales have ended",
-                "waitlist_available": False,
-            }
+    async def reserve(self, ticket_type_id: str, quantity: int = 1) -> dict:
+        """Atomically hold `quantity` tickets of a ticket type.
 
-        if ticket.capacity:
-            available = ticket.capacity - ticket.sold_count - ticket.reserved
-
-            if available < quantity:
-                return {
-                    "available": False,
-                    "reason": "Not enough tickets available",
-                    "available_quantity": max(0, available),
-                    "waitlist_available": ticket.waitlist_enabled,
-                }
+        One conditional `find_one_and_update` checks availability and
+        increments `reserved`, so concurrent buyers cannot oversell. Returns
+        `{"reserved": True, "ticket": <TicketType>}`, whose ticket (cached
+        static fields plus the updated counters) can be priced with
+        `price_ticket`, or `{"reserved": False, ...}` with the
+        `check_availability` reason.
+        """
 
+        db = await get_database()
+        for _ in range(2):
+            counters = await db.ticket_types.find_one_and_update(
+                _reservable(ObjectId(ticket_type_id), quantity, datetime.utcnow()),
+                {"$inc": {"reserved": quantity}},
+                projection=COUNTER_PROJECTION,
+                return_document=ReturnDocument.AFTER,
+            )
+            if counters is not None:
+                ticket = await ticket_type_cache.with_counters(ticket_type_id, counters)
+                if ticket is None:
+                    await self.release(ticket_type_id, quantity)
+                    raise ValueError("Ticket type not found")
+                return {"reserved": True, "ticket": ticket}
+
+            # Only a failed reservation pays for a second read, to say why.
+            availability = await self.check_availability(ticket_type_id, quantity)
+            if not availability["available"]:
+                return {"reserved": False, **availability}
+            # Tickets were released in between; try once more.
         return {
-            "available": True,
-            "available_quantity": ticket.capacity - ticket.sold_count if ticket.capacity else None,
+            "reserved": False,
+            "available": False,
+            "reason": "Not enough tickets available",
+            "waitlist_available": False,
         }
 
+    async def release(self, ticket_type_id: str, quantity: int = 1) -> None:
+        """Give back tickets held by `reserve` that were never registered."""
+
+        db = await get_database()
+        await db.ticket_types.update_one({"_id": ObjectId(ticket_type_id)}, {"$inc": {"reserved": -quantity}})
+
 
 pricing_service = PricingService()
@@ -1,33 +1,90 @@
-import base64
+import asyncio
 import io
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
 
 import qrcode
+import qrcode.image.svg
+
+from app.config import settings
+
+QR_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def render_qr_code(qr_code: str, image_format: str = "png") -> bytes:
+    """PNG or SVG image of `qr_code`. Pure, so it can run on a worker
+    process, and deterministic, so images can be cached forever."""
+
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(qr_code)
+    qr.make(fit=True)
+
+    buffer = io.BytesIO()
+    if image_format == "svg":
+        qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    else:
+        qr.make_image(fill_color="black", back_color="white").save(buffer, format="PNG")
+    return buffer.getvalue()
 
 
 class QRCodeService:
-    def generate_qr_code(self, registration_id: str) -> tuple[str, str]:
-        qr_code_string = f"REG-{registration_id}-{uuid.uuid4().hex[:8].upper()}"
+    """Issues QR code strings and renders their images on demand.
+
+    Registrations store only the `qr_code` string; images are rendered when
+    requested, on a process pool (or a thread when `workers` is 0), and the
+    most recently used `cache_size` images are kept in memory.
+    """
+
+    def __init__(self, workers: int = 2, cache_size: int = 1024) -> None:
+        self.workers = workers
+        self.cache_size = cache_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._images: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def generate_qr_code(self, registration_id: str) -> str:
+        return f"REG-{registration_id}-{uuid.uuid4().hex[:8].upper()}"
+
+    async def render(self, qr_code: str, image_format: str = "png") -> bytes:
+        key = (qr_code, image_format)
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
 
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(qr_code_string)
-        qr.make(fit=True)
+        self.misses += 1
+        if self.workers < 1:
+            image = await asyncio.to_thread(render_qr_code, qr_code, image_format)
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            loop = asyncio.get_running_loop()
+            image = await loop.run_in_executor(self._pool, render_qr_code, qr_code, image_format)
 
-        img = qr.make_image(fill_color="black", back_color="white")
+        self._images[key] = image
+        while len(self._images) > self.cache_size:
+            self._images.popitem(last=False)
+        return image
 
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        img_base64 = base64.b64encode(buffer.getvalue()).decode()
+    def metrics(self) -> dict:
+        return {"cached_images": len(self._images), "hits": self.hits, "misses": self.misses}
 
-        return qr_code_string, f"data:image/png;base64,{img_base64}"
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
 
     def verify_qr_code(self, qr_code: str) -> bool:
         return qr_code.startswith("REG-") and len(qr_code.split("-")) == 3
 
 
-qrcode_service = QRCodeService()
+qrcode_service = QRCodeService(settings.qr_render_workers, settings.qr_render_cache_size)
@@ -0,0 +1,368 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from app.ai.rag_index import snapshot_hash
+from app.config import settings
+from app.database import get_database
+
+SNAPSHOT_COLLECTIONS = ("events", "users", "registrations")
+
+# Same caps as the original full-scan snapshot.
+EVENT_LIMIT = 200
+USER_LIMIT = 500
+REGISTRATION_LIMIT = 500
+
+# Changes are re-read from this far before the watermark, so writes whose
+# updated_at lags slightly (clock skew between workers) are not missed.
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+EVENT_PROJECTION = {
+    "name": 1,
+    "description": 1,
+    "start_date": 1,
+    "end_date": 1,
+    "location": 1,
+    "organizer_id": 1,
+    "organization_id": 1,
+    "capacity": 1,
+    "registered_count": 1,
+    "status": 1,
+    "revenue": 1,
+    "updated_at": 1,
+}
+
+USER_PROJECTION = {
+    "name": 1,
+    "email": 1,
+    "company": 1,
+    "industry": 1,
+    "role": 1,
+    "interests": 1,
+    "updated_at": 1,
+}
+
+# Never pulls qr_code_image, payment details or other large fields.
+REGISTRATION_PROJECTION = {
+    "user_id": 1,
+    "event_id": 1,
+    "first_name": 1,
+    "last_name": 1,
+    "email": 1,
+    "company": 1,
+    "job_title": 1,
+    "form_responses": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+PROJECTIONS = {
+    "events": EVENT_PROJECTION,
+    "users": USER_PROJECTION,
+    "registrations": REGISTRATION_PROJECTION,
+}
+
+
+def _event_entry(e: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(e.get("_id")),
+        "name": e.get("name"),
+        "description": e.get("description"),
+        "startDate": (e.get("start_date").isoformat() if e.get("start_date") else None),
+        "endDate": (e.get("end_date").isoformat() if e.get("end_date") else None),
+        "location": e.get("location"),
+        "organizerId": e.get("organizer_id"),
+        "organizationId": e.get("organization_id"),
+        "capacity": e.get("capacity"),
+        "registeredCount": e.get("registered_count", 0),
+        "status": (str(e.get("status")) if e.get("status") is not None else "draft"),
+        "revenue": e.get("revenue", 0),
+    }
+
+
+def _user_entry(u: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(u.get("_id")),
+        "name": u.get("name", "Unknown"),
+        "email": u.get("email"),
+        "company": u.get("company"),
+        "industry": u.get("industry"),
+        "role": u.get("role", "ATTENDEE"),
+        "interests": u.get("interests", []),
+        "eventIds": [],
+    }
+
+
+def _registration_entry(r: Dict[str, Any]) -> Dict[str, Any]:
+    form_responses = r.get("form_responses")
+    interests: List[str] = []
+    if isinstance(form_responses, dict):
+        raw_interests = form_responses.get("interests")
+        if isinstance(raw_interests, list):
+            interests = [str(x) for x in raw_interests if x]
+        elif isinstance(raw_interests, str):
+            interests = [s.strip() for s in raw_interests.split(",") if s.strip()]
+
+    name = " ".join([r.get("first_name") or "", r.get("last_name") or ""]).strip() or "Attendee"
+    return {
+        "id": str(r.get("user_id") or r.get("_id")),
+        "name": name,
+        "email": r.get("email"),
+        "company": r.get("company"),
+        "industry": None,
+        "role": r.get("job_title"),
+        "interests": interests,
+        "eventIds": [str(r["event_id"])] if r.get("event_id") else [],
+    }
+
+
+def build_faq(events: List[Dict[str, Any]], attendees: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Platform FAQ entries, including live counts from the snapshot."""
+
+    total_events = len(events)
+    total_attendees = len(attendees)
+    total_capacity = sum(e.get("capacity", 0) for e in events)
+    total_registrations = sum(e.get("registeredCount", 0) for e in events)
+    event_names = ", ".join(e.get("name", "Untitled") for e in events[:10]) or "No events yet"
+    event_locations = ", ".join(set(e.get("location", "") for e in events if e.get("location"))) or "No locations set"
+
+    faq = [
+        {
+            "question": "Where can I find event schedules and venue information?",
+            "answer": "Use the Dashboard for event summaries and the Venue Editor for layout details. For live sessions, check the Event Hub.",
+            "category": "logistics",
+            "audience": "attendee",
+        },
+        {
+            "question": "How many events are there? What events do we have?",
+            "answer": f"There are currently {total_events} events on the platform: {event_names}.",
+            "category": "overview",
+            "audience": "all",
+        },
+        {
+            "question": "How many attendees or users are registered?",
+            "answer": f"There are {total_attendees} registered users on the platform, with {total_registrations} total event registrations across {total_events} events.",
+            "category": "overview",
+            "audience": "organizer",
+        },
+        {
+            "question": "What is the total capacity across all events?",
+            "answer": f"The combined capacity across all events is {total_capacity} seats.",
+            "category": "overview",
+            "audience": "organizer",
+        },
+        {
+            "question": "Where are the events located? What are the event locations?",
+            "answer": f"Events are located at: {event_locations}.",
+            "category": "logistics",
+            "audience": "attendee",
+        },
+        {
+            "question": "How does AI networking work?",
+            "answer": "The AI Networking feature uses weighted-similarity matching based on your interests, industry, and company to recommend the best people to connect with at events. Update your profile interests to get better matches.",
+            "category": "feature",
+            "audience": "attendee",
+        },
+        {
+            "question": "How do I update my profile or interests?",
+            "answer": "Go to the 'My Profile' section from the sidebar or click your avatar in the top-right. You can update your name, company, industry, phone, and interests there. Interests directly affect AI networking recommendations.",
+            "category": "feature",
+            "audience": "attendee",
+        },
+        {
+            "question": "What features does EventNexus offer?",
+            "answer": "EventNexus offers: Dashboard analytics, Event creation & management, AI Networking (smart attendee matching), RAG-powered AI Assistant, Venue Editor (interactive floor plans), Badge generation, Session management with live polls, Q&A, and real-time engagement tracking.",
+            "category": "feature",
+            "audience": "all",
+        },
+        {
+            "question": "How do I create a new event?",
+            "answer": "As an organizer, go to the Dashboard and click 'Create New Event'. Fill in the name, date, location, capacity, and description. The event will be saved to MongoDB and visible on the platform immediately.",
+            "category": "feature",
+            "audience": "organizer",
+        },
+        {
+            "question": "What technology stack does this platform use?",
+            "answer": "The backend uses FastAPI (Python) with MongoDB Atlas for the database. Authentication uses JWT tokens with bcrypt password hashing. The frontend is React 19 with TypeScript, Vite, and TailwindCSS. AI features use sentence-transformers for semantic search and token-Jaccard as a fallback.",
+            "category": "technical",
+            "audience": "all",
+        },
+        {
+            "question": "How do I register for an event?",
+            "answer": "Navigate to the Events section, find the event you want to attend, and click Register. You'll receive a QR code ticket for check-in.",
+            "category": "logistics",
+            "audience": "attendee",
+        },
+        {
+            "question": "Who are the attendees? List the registered users.",
+            "answer": f"There are {total_attendees} registered users. " + (
+                "Some attendees include: " + ", ".join(
+                    f"{a.get('name', 'Unknown')} ({a.get('company') or 'no company'})"
+                    for a in attendees[:8]
+                ) + "." if attendees else "No attendees registered yet."
+            ),
+            "category": "networking",
+            "audience": "all",
+        },
+    ]
+
+    return faq
+
+
+def _sort_key_events(doc: Dict[str, Any]):
+    # Mongo's ascending sort puts missing/null start dates first.
+    start = doc.get("start_date")
+    return (start is not None, start or datetime.min, doc["_id"])
+
+
+def assemble_snapshot(
+    events_raw: List[Dict[str, Any]],
+    users_raw: List[Dict[str, Any]],
+    registrations_raw: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Snapshot dict from raw documents already sorted and capped."""
+
+    events = [_event_entry(e) for e in events_raw]
+
+    seen_attendees: Dict[str, Dict[str, Any]] = {}
+    attendees = []
+    for entry in [_user_entry(u) for u in users_raw] + [_registration_entry(r) for r in registrations_raw]:
+        seen = seen_attendees.get(entry["id"])
+        if seen is not None:
+            # Keep the first profile, but index it under every event the
+            # attendee registered for.
+            seen["eventIds"].extend(e for e in entry["eventIds"] if e not in seen["eventIds"])
+            continue
+        seen_attendees[entry["id"]] = entry
+        attendees.append(entry)
+
+    return {"events": events, "sessions": [], "attendees": attendees, "faq": build_faq(events, attendees)}
+
+
+class RagSnapshotService:
+    """Materialized RAG snapshot, refreshed incrementally from version counters.
+
+    Writers bump a per-collection counter in `snapshot_versions`. Readers
+    serve the in-memory snapshot for up to `max_staleness` seconds, then
+    compare counters and re-read only the documents of changed collections
+    whose `updated_at` passed that collection's watermark. A full rescan
+    still runs every `full_refresh` seconds to pick up out-of-band writes.
+    """
+
+    def __init__(
+        self,
+        max_staleness: float = settings.rag_snapshot_max_staleness_seconds,
+        full_refresh: float = settings.rag_snapshot_full_refresh_seconds,
+    ) -> None:
+        self.max_staleness = max_staleness
+        self.full_refresh = full_refresh
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.snapshot_key: Optional[str] = None
+        self.refreshes = {"full": 0, "incremental": 0, "unchanged": 0}
+        self._docs: Dict[str, Dict[Any, Dict[str, Any]]] = {name: {} for name in SNAPSHOT_COLLECTIONS}
+        self._versions: Dict[str, int] = {}
+        self._watermarks: Dict[str, Optional[datetime]] = {}
+        self._checked_at = 0.0
+        self._full_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def bump(self, *collections: str) -> None:
+        """Record a write to `collections` for every worker's snapshot."""
+
+        if not collections:
+            return
+        db = await get_database()
+        await db.snapshot_versions.bulk_write(
+            [UpdateOne({"_id": name}, {"$inc": {"version": 1}}, upsert=True) for name in collections],
+            ordered=False,
+        )
+
+    async def get_snapshot(self) -> Dict[str, Any]:
+        if self.snapshot is not None and time.monotonic() - self._checked_at < self.max_staleness:
+            return self.snapshot
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.snapshot is None or time.monotonic() - self._checked_at >= self.max_staleness:
+                await self._refresh()
+        return self.snapshot
+
+    async def _refresh(self) -> None:
+        db = await get_database()
+        versions = {doc["_id"]: doc.get("version", 0) async for doc in db.snapshot_versions.find({})}
+        now = time.monotonic()
+
+        if self.snapshot is None or now - self._full_at >= self.full_refresh:
+            for name in SNAPSHOT_COLLECTIONS:
+                await self._load(name, full=True)
+            self._full_at = now
+            self.refreshes["full"] += 1
+        else:
+            changed = [name for name in SNAPSHOT_COLLECTIONS if versions.get(name, 0) != self._versions.get(name, 0)]
+            if not changed:
+                self._versions = versions
+                self._checked_at = now
+                self.refreshes["unchanged"] += 1
+                return
+            for name in changed:
+                # Without a watermark (no updated_at seen yet) only a rescan is safe.
+                await self._load(name, full=self._watermarks.get(name) is None)
+            self.refreshes["incremental"] += 1
+
+        self._versions = versions
+        self._checked_at = now
+        self._publish()
+
+    async def _load(self, name: str, *, full: bool) -> None:
+        db = await get_database()
+        collection = db[name]
+        watermark = self._watermarks.get(name)
+        if full:
+            docs = self._docs[name] = {}
+            if name == "events":
+                cursor = collection.find({}, EVENT_PROJECTION).sort("start_date", 1).limit(EVENT_LIMIT)
+            elif name == "users":
+                cursor = collection.find({}, USER_PROJECTION).sort("_id", 1).limit(USER_LIMIT)
+            else:
+                cursor = collection.find({}, REGISTRATION_PROJECTION).sort("created_at", -1).limit(REGISTRATION_LIMIT)
+            watermark = None
+        else:
+            docs = self._docs[name]
+            cursor = collection.find({"updated_at": {"$gte": watermark - WATERMARK_OVERLAP}}, PROJECTIONS[name])
+
+        async for doc in cursor:
+            docs[doc["_id"]] = doc
+            updated_at = doc.get("updated_at")
+            if updated_at is not None and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+        self._watermarks[name] = watermark
+        self._prune(name)
+
+    def _prune(self, name: str) -> None:
+        """Keep only the documents the capped queries of a full scan would return."""
+
+        docs = self._docs[name]
+        if name == "events":
+            kept = sorted(docs.values(), key=_sort_key_events)[:EVENT_LIMIT]
+        elif name == "users":
+            kept = sorted(docs.values(), key=lambda doc: doc["_id"])[:USER_LIMIT]
+        else:
+            kept = sorted(docs.values(), key=lambda doc: doc.get("created_at") or datetime.min, reverse=True)
+            kept = kept[:REGISTRATION_LIMIT]
+        self._docs[name] = {doc["_id"]: doc for doc in kept}
+
+    def _publish(self) -> None:
+        snapshot = assemble_snapshot(
+            list(self._docs["events"].values()),
+            list(self._docs["users"].values()),
+            list(self._docs["registrations"].values()),
+        )
+        self.snapshot = snapshot
+        self.snapshot_key = snapshot_hash(snapshot)
+
+
+rag_snapshot_service = RagSnapshotService()
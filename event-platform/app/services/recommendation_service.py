@@ -0,0 +1,452 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+
+from app.ai.batch import chunk_rows, compute_chunk, make_pool, recommend_rows
+from app.ai.incremental import entering_users, kth_entry, patch_recommendations
+from app.ai.lsh import MinHashLSH
+from app.ai.matrix import AttendeeMatrix
+from app.ai.scheduler import schedule_rounds
+from app.config import settings
+from app.database import get_database
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_REGISTRATION_STATUSES = ["pending", "confirmed"]
+
+# Profile edits arriving within this window are coalesced into one refresh.
+PROFILE_REFRESH_DELAY_SECONDS = 5.0
+
+# Encoded event populations kept per process for live recommendations.
+POPULATION_CACHE_SIZE = 32
+
+REGISTRATION_PROJECTION = {
+    "user_id": 1,
+    "first_name": 1,
+    "last_name": 1,
+    "email": 1,
+    "company": 1,
+    "job_title": 1,
+    "form_responses": 1,
+}
+
+USER_PROJECTION = {
+    "name": 1,
+    "company": 1,
+    "industry": 1,
+    "role": 1,
+    "location": 1,
+    "interests": 1,
+    "skills": 1,
+    "goals": 1,
+    "avatar": 1,
+}
+
+
+def _form_list(form_responses: Any, key: str) -> List[str]:
+    if not isinstance(form_responses, dict):
+        return []
+    raw = form_responses.get(key)
+    if isinstance(raw, list):
+        return [str(x) for x in raw if x]
+    if isinstance(raw, str):
+        return [s.strip() for s in raw.split(",") if s.strip()]
+    return []
+
+
+def attendee_profile(registration: Dict[str, Any], user: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Networking profile for a registrant, preferring their account data."""
+
+    form_responses = registration.get("form_responses")
+    user = user or {}
+    name = user.get("name") or " ".join(
+        [registration.get("first_name") or "", registration.get("last_name") or ""]
+    ).strip()
+    return {
+        "id": str(user.get("_id") or registration.get("user_id") or registration.get("_id")),
+        "name": name or "Attendee",
+        "company": user.get("company") or registration.get("company"),
+        "industry": user.get("industry"),
+        "role": registration.get("job_title") or user.get("role"),
+        "location": user.get("location"),
+        "interests": user.get("interests") or _form_list(form_responses, "interests"),
+        "skills": user.get("skills") or _form_list(form_responses, "skills"),
+        "goals": user.get("goals") or _form_list(form_responses, "goals"),
+        "avatar": user.get("avatar"),
+    }
+
+
+def lsh_params(size: int) -> Optional[Tuple[int, int]]:
+    """`(bands, rows)` when an event of `size` registrants is scored with LSH."""
+
+    if settings.networking_lsh_enabled and size >= settings.networking_lsh_min_attendees:
+        return settings.networking_lsh_bands, settings.networking_lsh_rows
+    return None
+
+
+def _encode_population(attendees: List[Dict[str, Any]]) -> Tuple[AttendeeMatrix, Optional[MinHashLSH]]:
+    matrix = AttendeeMatrix(attendees)
+    params = lsh_params(matrix.size)
+    lsh = MinHashLSH(matrix, bands=params[0], rows=params[1]) if params else None
+    return matrix, lsh
+
+
+@dataclass
+class EventPopulation:
+    """Encoded registrants of one event, valid for a single population version."""
+
+    version: int
+    attendees: List[Dict[str, Any]]
+    matrix: AttendeeMatrix
+    rows: Dict[str, int]
+    # Set for events large enough to be scored approximately (`lsh_params`).
+    lsh: Optional[MinHashLSH] = None
+
+
+class RecommendationService:
+    def __init__(self) -> None:
+        self._populations: "OrderedDict[str, EventPopulation]" = OrderedDict()
+        self._pending_refreshes: Dict[str, asyncio.Task] = {}
+        self._running_refreshes: set[asyncio.Task] = set()
+        self._refresh_lock: Optional[asyncio.Lock] = None
+
+    async def load_event_attendees(self, event_id: str) -> List[Dict[str, Any]]:
+        db = await get_database()
+        registrations = await db.registrations.find(
+            {"event_id": event_id, "status": {"$in": ACTIVE_REGISTRATION_STATUSES}},
+            REGISTRATION_PROJECTION,
+        ).to_list(None)
+
+        user_ids = [
+            ObjectId(r["user_id"]) for r in registrations if r.get("user_id") and ObjectId.is_valid(r["user_id"])
+        ]
+        users = {}
+        if user_ids:
+            async for user in db.users.find({"_id": {"$in": user_ids}}, USER_PROJECTION):
+                users[str(user["_id"])] = user
+
+        attendees: List[Dict[str, Any]] = []
+        seen: set[str] = set()
+        for registration in registrations:
+            profile = attendee_profile(registration, users.get(str(registration.get("user_id"))))
+            if profile["id"] in seen:
+                continue
+            seen.add(profile["id"])
+            attendees.append(profile)
+        return attendees
+
+    async def population_version(self, event_id: str) -> int:
+        db = await get_database()
+        doc = await db.population_versions.find_one({"_id": event_id}, {"version": 1})
+        return doc["version"] if doc else 0
+
+    async def bump_population_version(self, *event_ids: str) -> None:
+        """Invalidate cached populations of `event_ids` in every worker."""
+
+        if not event_ids:
+            return
+        db = await get_database()
+        await db.population_versions.bulk_write(
+            [UpdateOne({"_id": event_id}, {"$inc": {"version": 1}}, upsert=True) for event_id in event_ids],
+            ordered=False,
+        )
+
+    async def get_event_population(self, event_id: str) -> EventPopulation:
+        """Cached encoded population, rebuilt only when its version moved."""
+
+        version = await self.population_version(event_id)
+        cached = self._populations.get(event_id)
+        if cached is not None and cached.version == version:
+            self._populations.move_to_end(event_id)
+            return cached
+
+        attendees = await self.load_event_attendees(event_id)
+        matrix, lsh = await asyncio.to_thread(_encode_population, attendees)
+        population = EventPopulation(
+            version=version,
+            attendees=attendees,
+            matrix=matrix,
+            rows={attendee["id"]: row for row, attendee in enumerate(attendees)},
+            lsh=lsh,
+        )
+        self._populations[event_id] = population
+        self._populations.move_to_end(event_id)
+        while len(self._populations) > POPULATION_CACHE_SIZE:
+            self._populations.popitem(last=False)
+        return population
+
+    async def live_recommendations(
+        self,
+        event_id: str,
+        user_id: str,
+        limit: int = 3,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Top-k for one registrant against the cached event population.
+
+        Returns None when `user_id` is not registered for the event.
+        """
+
+        population = await self.get_event_population(event_id)
+        row = population.rows.get(user_id)
+        if row is None:
+            return None
+        results = await asyncio.to_thread(
+            recommend_rows, population.matrix, [row], limit=limit, lsh=population.lsh
+        )
+        return results[0]["recommendations"]
+
+    async def plan_rounds(self, event_id: str, rounds: int, table_size: int = 2) -> Dict[str, Any]:
+        """Speed-networking tables for every registrant, no pair seated twice.
+        Tables list each attendee's id and name only."""
+
+        population = await self.get_event_population(event_id)
+        schedule = await asyncio.to_thread(
+            schedule_rounds, population.matrix, rounds, table_size=table_size
+        )
+        attendees = [{"id": attendee["id"], "name": attendee["name"]} for attendee in population.attendees]
+        return {
+            "event_id": event_id,
+            "attendees": len(attendees),
+            "total_score": round(schedule.total_score, 3),
+            "rounds": [
+                {
+                    "round": number,
+                    "score": round(score, 3),
+                    "tables": [
+                        {"attendees": [attendees[row] for row in table], "score": round(table_score, 3)}
+                        for table, table_score in zip(tables, table_scores)
+                    ],
+                }
+                for number, (tables, table_scores, score) in enumerate(
+                    zip(schedule.rounds, schedule.table_scores, schedule.round_scores), start=1
+                )
+            ],
+        }
+
+    async def profile_changed(self, user_id: str) -> None:
+        """React to a profile write: invalidate populations, refresh stored lists."""
+
+        db = await get_database()
+        event_ids = await db.registrations.distinct("event_id", {"user_id": user_id})
+        await self.bump_population_version(*event_ids)
+        self.schedule_profile_refresh(user_id)
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        db = await get_database()
+        return await db.networking_jobs.find_one({"_id": job_id}, {"_id": 0})
+
+    async def create_job(self, event_id: str) -> Dict[str, Any]:
+        """Record a queued batch job; its progress is kept in `networking_jobs`
+        so any worker can report it."""
+
+        db = await get_database()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "event_id": event_id,
+            "status": "queued",
+            "total": 0,
+            "completed": 0,
+            "generation": None,
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+        }
+        await db.networking_jobs.insert_one({"_id": job["job_id"], **job})
+        return job
+
+    async def _save_job(self, job: Dict[str, Any], *fields: str) -> None:
+        db = await get_database()
+        await db.networking_jobs.update_one(
+            {"_id": job["job_id"]}, {"$set": {name: job[name] for name in fields}}
+        )
+
+    async def _next_generation(self, event_id: str) -> int:
+        db = await get_database()
+        counter = await db.recommendation_generations.find_one_and_update(
+            {"_id": event_id},
+            {"$inc": {"generation": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return counter["generation"]
+
+    async def run_batch(
+        self,
+        job: Dict[str, Any],
+        *,
+        limit: int = 3,
+        workers: int = 2,
+        chunk_size: int = 256,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Compute and store top-k recommendations for every event registrant."""
+
+        db = await get_database()
+        event_id = job["event_id"]
+        job["status"] = "running"
+        job["started_at"] = datetime.utcnow()
+
+        try:
+            await self._save_job(job, "status", "started_at")
+            attendees = await self.load_event_attendees(event_id)
+            generation = await self._next_generation(event_id)
+            job["generation"] = generation
+            job["total"] = len(attendees)
+            await self._save_job(job, "generation", "total")
+
+            loop = asyncio.get_running_loop()
+            with make_pool(attendees, workers, lsh_params(len(attendees))) as pool:
+                futures = [
+                    loop.run_in_executor(pool, compute_chunk, rows, limit)
+                    for rows in chunk_rows(len(attendees), chunk_size)
+                ]
+                for future in asyncio.as_completed(futures):
+                    results = await future
+                    now = datetime.utcnow()
+                    await db.recommendations.bulk_write(
+                        [
+                            ReplaceOne(
+                                {"event_id": event_id, "user_id": result["user_id"]},
+                                {
+                                    "event_id": event_id,
+                                    "user_id": result["user_id"],
+                                    "generation": generation,
+                                    "limit": limit,
+                                    "recommendations": result["recommendations"],
+                                    "kth": kth_entry(result["recommendations"], limit),
+                                    "computed_at": now,
+                                },
+                                upsert=True,
+                            )
+                            for result in results
+                        ],
+                        ordered=False,
+                    )
+                    job["completed"] += len(results)
+                    await self._save_job(job, "completed")
+                    if on_progress:
+                        on_progress(job)
+
+            # Registrants who left since the previous run keep stale rows.
+            await db.recommendations.delete_many(
+                {"event_id": event_id, "generation": {"$lt": generation}}
+            )
+            job["status"] = "completed"
+        except Exception as exc:  # pragma: no cover
+            job["status"] = "failed"
+            job["error"] = str(exc)
+        finally:
+            job["finished_at"] = datetime.utcnow()
+
+        await self._save_job(job, "status", "error", "finished_at")
+        return job
+
+    def schedule_profile_refresh(self, user_id: str, delay: float = PROFILE_REFRESH_DELAY_SECONDS) -> None:
+        """Debounce an incremental refresh after a profile write.
+
+        Each new edit restarts the timer, so a burst of edits produces a single
+        refresh once the user has been idle for `delay` seconds.
+        """
+
+        pending = self._pending_refreshes.get(user_id)
+        if pending is not None and not pending.done():
+            pending.cancel()
+        task = asyncio.create_task(self._refresh_after(user_id, delay))
+        self._pending_refreshes[user_id] = task
+        self._running_refreshes.add(task)
+        task.add_done_callback(self._running_refreshes.discard)
+
+    async def _refresh_after(self, user_id: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        # Past the debounce window: later edits schedule a fresh refresh
+        # instead of cancelling this one midway through its writes.
+        self._pending_refreshes.pop(user_id, None)
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            try:
+                await self.refresh_user(user_id)
+            except Exception:  # pragma: no cover
+                logger.exception("Recommendation refresh failed for %s", user_id)
+
+    async def refresh_user(self, user_id: str) -> int:
+        """Re-score one user in every event with stored recommendations.
+
+        Returns the number of recommendation documents that were rewritten.
+        """
+
+        db = await get_database()
+        event_ids = await db.recommendations.distinct("event_id", {"user_id": user_id})
+        updated = 0
+        for event_id in event_ids:
+            updated += await self._refresh_event_user(event_id, user_id)
+        return updated
+
+    async def _refresh_event_user(self, event_id: str, user_id: str) -> int:
+        db = await get_database()
+        population = await self.get_event_population(event_id)
+        row = population.rows.get(user_id)
+        if row is None:
+            return 0
+
+        full = {"_id": 0, "user_id": 1, "limit": 1, "recommendations": 1}
+        # The user's own list and the lists they are in are read in full ...
+        stored = {
+            doc["user_id"]: doc
+            async for doc in db.recommendations.find(
+                {"event_id": event_id, "$or": [{"user_id": user_id}, {"recommendations.match.id": user_id}]},
+                full,
+            )
+        }
+        # ... every other list only by the k-th entry the user has to beat.
+        summaries = await db.recommendations.find(
+            {"event_id": event_id, "user_id": {"$ne": user_id}, "recommendations.match.id": {"$ne": user_id}},
+            {"_id": 0, "user_id": 1, "kth": 1},
+        ).to_list(None)
+        entering = await asyncio.to_thread(entering_users, population.matrix, row, population.rows, summaries)
+        if entering:
+            async for doc in db.recommendations.find({"event_id": event_id, "user_id": {"$in": entering}}, full):
+                stored[doc["user_id"]] = doc
+
+        updates = await asyncio.to_thread(
+            patch_recommendations, population.matrix, row, population.rows, stored, lsh=population.lsh
+        )
+        if not updates:
+            return 0
+
+        now = datetime.utcnow()
+        limits = {uid: doc.get("limit", 3) for uid, doc in stored.items()}
+        await db.recommendations.bulk_write(
+            [
+                UpdateOne(
+                    {"event_id": event_id, "user_id": uid},
+                    {
+                        "$set": {
+                            "recommendations": recommendations,
+                            "kth": kth_entry(recommendations, limits.get(uid, 3)),
+                            "computed_at": now,
+                        }
+                    },
+                )
+                for uid, recommendations in updates.items()
+            ],
+            ordered=False,
+        )
+        return len(updates)
+
+    async def get_recommendations(self, event_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        db = await get_database()
+        return await db.recommendations.find_one(
+            {"event_id": event_id, "user_id": user_id},
+            {"_id": 0},
+        )
+
+
+recommendation_service = RecommendationService()
@@ -1,15 +1,38 @@
+import base64
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
+from pymongo.errors import BulkWriteError
 
 from app.config import settings
 from app.database import get_database
 from app.models.registration import PaymentStatus, Registration, RegistrationStatus
+from app.models.ticket import TicketType
 from app.models.waitlist import WaitlistEntry
 from app.services.email_service import email_service
 from app.services.pricing_service import pricing_service
 from app.services.qrcode_service import qrcode_service
+from app.services.rag_snapshot_service import rag_snapshot_service
+from app.services.recommendation_service import recommendation_service
+from app.services.ticket_type_cache import ticket_type_cache
+
+
+def qr_code_url(qr_code: str) -> str:
+    return f"{settings.api_url}/api/registrations/qr-code/{qr_code}"
+
+
+def _payment_update(payment_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "status": RegistrationStatus.CONFIRMED,
+        "payment_status": PaymentStatus.COMPLETED,
+        "payment_method": payment_data.get("payment_method"),
+        "payment_intent_id": payment_data.get("payment_intent_id"),
+        "paypal_order_id": payment_data.get("paypal_order_id"),
+        "payment_date": datetime.utcnow(),
+        "transaction_id": payment_data.get("transaction_id"),
+        "updated_at": datetime.utcnow(),
+    }
 
 
 class RegistrationService:
@@ -20,13 +43,17 @@ class RegistrationService:
     ) -> Dict[str, Any]:
         db = await get_database()
 
-        availability = await pricing_service.check_availability(
-            registration_data["ticket_type_id"],
-            registration_data.get("group_size", 1),
+        ticket_type_id = registration_data["ticket_type_id"]
+        group_size = registration_data.get("group_size", 1)
+        event = await db.events.find_one(
+            {"_id": ObjectId(registration_data["event_id"])}, {"name": 1, "organization_id": 1}
         )
 
-        if not availability["available"]:
-            if availability.get("waitlist_available"):
+        # Availability, the hold and the pricing inputs in one round trip.
+        reservation = await pricing_service.reserve(ticket_type_id, group_size)
+
+        if not reservation["reserved"]:
+            if reservation.get("waitlist_available"):
                 waitlist_entry = await self._add_to_waitlist(registration_data)
                 return {
                     "success": False,
@@ -36,66 +63,227 @@ class RegistrationService:
                 }
             return {
                 "success": False,
-                "reason": availability["reason"],
+                "reason": reservation["reason"],
                 "waitlist": False,
             }
 
-        pricing = await pricing_service.calculate_price(
-            registration_data["ticket_type_id"],
-            registration_data.get("group_size", 1),
-            registration_data.get("discount_code"),
-        )
-
-        temp_id = str(ObjectId())
-        qr_code, qr_code_image = qrcode_service.generate_qr_code(temp_id)
+        ticket_type = reservation["ticket"]
+        try:
+            pricing = await pricing_service.price_ticket(
+                ticket_type,
+                group_size,
+                registration_data.get("discount_code"),
+            )
 
-        registration = Registration(
-            event_id=registration_data["event_id"],
-            user_id=user_id,
-            ticket_type_id=registration_data["ticket_type_id"],
-            first_name=registration_data["first_name"],
-            last_name=registration_data["last_name"],
-            email=registration_data["email"],
-            phone=registration_data.get("phone"),
-            company=registration_data.get("company"),
-            job_title=registration_data.get("job_title"),
-            form_responses=registration_data.get("form_responses"),
-            group_size=registration_data.get("group_size", 1),
-            original_price=pricing["subtotal"],
-            discount_amount=pricing["total_discount"],
-            final_price=pricing["final_price"],
-            discount_code=registration_data.get("discount_code"),
-            qr_code=qr_code,
-            qr_code_image=qr_code_image,
-            status=RegistrationStatus.PENDING,
-            payment_status=PaymentStatus.PENDING,
-            discount_details=pricing.get("discount_details"),
-        )
+            temp_id = str(ObjectId())
+            qr_code = qrcode_service.generate_qr_code(temp_id)
+
+            registration = Registration(
+                event_id=registration_data["event_id"],
+                organization_id=event.get("organization_id") if event else None,
+                user_id=user_id,
+                ticket_type_id=ticket_type_id,
+                first_name=registration_data["first_name"],
+                last_name=registration_data["last_name"],
+                email=registration_data["email"],
+                phone=registration_data.get("phone"),
+                company=registration_data.get("company"),
+                job_title=registration_data.get("job_title"),
+                form_responses=registration_data.get("form_responses"),
+                group_size=group_size,
+                original_price=pricing["subtotal"],
+                discount_amount=pricing["total_discount"],
+                final_price=pricing["final_price"],
+                discount_code=registration_data.get("discount_code"),
+                qr_code=qr_code,
+                status=RegistrationStatus.PENDING,
+                payment_status=PaymentStatus.PENDING,
+                # Free registrations have no checkout to abandon.
+                hold_expires_at=(
+                    datetime.utcnow() + timedelta(minutes=settings.registration_hold_minutes)
+                    if pricing["final_price"] > 0
+                    else None
+                ),
+                discount_details=pricing.get("discount_details"),
+            )
 
-        result = await db.registrations.insert_one(
-            registration.model_dump(by_alias=True, exclude={"id"})
-        )
+            result = await db.registrations.insert_one(
+                registration.model_dump(by_alias=True, exclude={"id"})
+            )
+        except BaseException:
+            # e.g. a duplicate registration: the held tickets go back on sale.
+            await pricing_service.release(ticket_type_id, group_size)
+            raise
         registration_id = str(result.inserted_id)
 
-        await db.ticket_types.update_one(
-            {"_id": ObjectId(registration_data["ticket_type_id"])},
-            {"$inc": {"reserved": registration_data.get("group_size", 1)}},
-        )
-
-        event = await db.events.find_one({"_id": ObjectId(registration_data["event_id"])})
-        ticket_type = await db.ticket_types.find_one(
-            {"_id": ObjectId(registration_data["ticket_type_id"])}
-        )
+        await recommendation_service.bump_population_version(registration_data["event_id"])
+        await rag_snapshot_service.bump("registrations")
 
         return {
             "success": True,
             "registration_id": registration_id,
             "qr_code": qr_code,
-            "qr_code_image": qr_code_image,
+            "qr_code_url": qr_code_url(qr_code),
             "pricing": pricing,
             "payment_required": pricing["final_price"] > 0,
             "event_name": event.get("name") if event else "",
-            "ticket_type_name": ticket_type.get("name") if ticket_type else "",
+            "ticket_type_name": ticket_type.name,
+        }
+
+    async def create_group_registration(
+        self,
+        group_data: Dict[str, Any],
+        user_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Register several named attendees for one ticket type at once.
+
+        The whole quantity is reserved in one round trip and priced once (so
+        group discounts apply), and all registrations go in with a single
+        `insert_many`. Attendees already registered for the event are
+        reported per attendee and not charged. If the group does not fit, no
+        one is registered and, where the ticket type has a waitlist, the
+        remaining attendees join it.
+        """
+
+        db = await get_database()
+        event_id = group_data["event_id"]
+        ticket_type_id = group_data["ticket_type_id"]
+        event = await db.events.find_one({"_id": ObjectId(event_id)}, {"name": 1, "organization_id": 1})
+        # Emails are compared and stored lowercased, as RegistrationCreate does.
+        attendees: List[Dict[str, Any]] = [
+            {**attendee, "email": attendee["email"].lower()} for attendee in group_data["attendees"]
+        ]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(attendees)
+
+        registered = {
+            doc["email"]
+            async for doc in db.registrations.find(
+                {"event_id": event_id, "email": {"$in": [attendee["email"] for attendee in attendees]}},
+                {"email": 1},
+            )
+        }
+        pending = []
+        for position, attendee in enumerate(attendees):
+            if attendee["email"] in registered:
+                results[position] = {"email": attendee["email"], "success": False, "reason": "already_registered"}
+            else:
+                pending.append(position)
+        if not pending:
+            return {"success": False, "reason": "All attendees are already registered", "results": results}
+
+        quantity = len(pending)
+        reservation = await pricing_service.reserve(ticket_type_id, quantity)
+        if not reservation["reserved"]:
+            available_quantity = reservation.get("available_quantity")
+            if available_quantity is None:
+                reason = "unavailable"
+            else:
+                reason = "insufficient_capacity" if available_quantity > 0 else "sold_out"
+            waitlist_entries: List[Optional[Dict[str, Any]]] = [None] * len(pending)
+            if reservation.get("waitlist_available"):
+                waitlist_entries = await self._add_many_to_waitlist(
+                    event_id, ticket_type_id, [attendees[position] for position in pending]
+                )
+            for position, waitlist_entry in zip(pending, waitlist_entries):
+                results[position] = {"email": attendees[position]["email"], "success": False, "reason": reason}
+                if waitlist_entry is not None:
+                    results[position]["waitlist_entry"] = waitlist_entry
+            return {
+                "success": False,
+                "reason": reservation["reason"],
+                "available_quantity": available_quantity,
+                "waitlist": bool(reservation.get("waitlist_available")),
+                "results": results,
+            }
+
+        ticket_type = reservation["ticket"]
+        group_id = str(ObjectId())
+        try:
+            pricing = await pricing_service.price_ticket(ticket_type, quantity, group_data.get("discount_code"))
+            hold_expires_at = (
+                datetime.utcnow() + timedelta(minutes=settings.registration_hold_minutes)
+                if pricing["final_price"] > 0
+                else None
+            )
+
+            documents = []
+            for index, position in enumerate(pending):
+                attendee = attendees[position]
+                registration_oid = ObjectId()
+                qr_code = qrcode_service.generate_qr_code(str(registration_oid))
+                registration = Registration(
+                    id=registration_oid,
+                    event_id=event_id,
+                    organization_id=event.get("organization_id") if event else None,
+                    user_id=user_id,
+                    ticket_type_id=ticket_type_id,
+                    first_name=attendee["first_name"],
+                    last_name=attendee["last_name"],
+                    email=attendee["email"],
+                    phone=attendee.get("phone"),
+                    company=attendee.get("company"),
+                    job_title=attendee.get("job_title"),
+                    form_responses=attendee.get("form_responses"),
+                    is_group_lead=index == 0,
+                    group_id=group_id,
+                    # One ticket per row: releasing or confirming a row moves one ticket.
+                    group_size=1,
+                    original_price=pricing["subtotal"] / quantity,
+                    discount_amount=pricing["total_discount"] / quantity,
+                    final_price=pricing["per_ticket_price"],
+                    discount_code=group_data.get("discount_code"),
+                    qr_code=qr_code,
+                    status=RegistrationStatus.PENDING,
+                    payment_status=PaymentStatus.PENDING,
+                    hold_expires_at=hold_expires_at,
+                    discount_details=pricing.get("discount_details"),
+                )
+                documents.append(registration.model_dump(by_alias=True))
+
+            failed: Dict[int, str] = {}
+            try:
+                await db.registrations.insert_many(documents, ordered=False)
+            except BulkWriteError as exc:
+                # The other rows are in; e.g. someone registered one of these
+                # emails since the check above.
+                for error in exc.details.get("writeErrors", []):
+                    failed[error["index"]] = "already_registered" if error.get("code") == 11000 else "error"
+        except BaseException:
+            await pricing_service.release(ticket_type_id, quantity)
+            raise
+        if failed:
+            await pricing_service.release(ticket_type_id, len(failed))
+
+        for index, (position, document) in enumerate(zip(pending, documents)):
+            if index in failed:
+                results[position] = {"email": document["email"], "success": False, "reason": failed[index]}
+            else:
+                results[position] = {
+                    "email": document["email"],
+                    "success": True,
+                    "registration_id": str(document["_id"]),
+                    "qr_code": document["qr_code"],
+                    "qr_code_url": qr_code_url(document["qr_code"]),
+                    "final_price": document["final_price"],
+                }
+
+        registered_count = quantity - len(failed)
+        if registered_count:
+            await recommendation_service.bump_population_version(event_id)
+            await rag_snapshot_service.bump("registrations")
+
+        total_price = pricing["per_ticket_price"] * registered_count
+
+        return {
+            "success": registered_count > 0,
+            "group_id": group_id,
+            "registered": registered_count,
+            "pricing": pricing,
+            "total_price": total_price,
+            "payment_required": total_price > 0,
+            "event_name": event.get("name") if event else "",
+            "ticket_type_name": ticket_type.name,
+            "results": results,
         }
 
     async def confirm_payment(
@@ -105,57 +293,92 @@ class RegistrationService:
     ) -> bool:
         db = await get_database()
 
-        update_data = {
-            "status": RegistrationStatus.CONFIRMED,
-            "payment_status": PaymentStatus.COMPLETED,
-            "payment_method": payment_data.get("payment_method"),
-            "payment_intent_id": payment_data.get("payment_intent_id"),
-            "paypal_order_id": payment_data.get("paypal_order_id"),
-            "payment_date": datetime.utcnow(),
-            "transaction_id": payment_data.get("transaction_id"),
-            "updated_at": datetime.utcnow(),
-        }
-
+        update_data = _payment_update(payment_data)
         result = await db.registrations.update_one(
-            {"_id": ObjectId(registration_id)},
-            {"$set": update_data},
+            {"_id": ObjectId(registration_id), "status": {"$ne": RegistrationStatus.EXPIRED}},
+            {"$set": update_data, "$unset": {"hold_expires_at": ""}},
         )
 
-        if result.modified_count == 0:
+        if result.modified_count == 0 and not await self._reclaim_expired_hold(registration_id, update_data):
             return False
 
         registration = await db.registrations.find_one({"_id": ObjectId(registration_id)})
+        ticket_type = await self._move_to_sold(registration, registration["group_size"])
+        await self._send_confirmation(registration, ticket_type)
+        return True
 
-        await db.ticket_types.update_one(
-            {"_id": ObjectId(registration["ticket_type_id"])},
+    async def confirm_group_payment(
+        self,
+        group_id: str,
+        payment_data: Dict[str, Any],
+    ) -> int:
+        """Confirm every held registration of a group checkout at once;
+        returns how many were confirmed by this call.
+
+        The pending rows are confirmed with one `update_many` and their
+        tickets moved from `reserved` to `sold_count` with one `$inc`. Rows
+        whose hold expired before the payment arrived are taken back one by
+        one while tickets remain, like a late single payment. Repeating the
+        call (e.g. a retried webhook) confirms nothing twice.
+        """
+
+        db = await get_database()
+        update_data = _payment_update(payment_data)
+        result = await db.registrations.update_many(
+            {"group_id": group_id, "status": RegistrationStatus.PENDING},
+            {"$set": update_data, "$unset": {"hold_expires_at": ""}},
+        )
+        confirmed = result.modified_count
+        expired = db.registrations.find({"group_id": group_id, "status": RegistrationStatus.EXPIRED}, {"_id": 1})
+        async for registration in expired:
+            if await self._reclaim_expired_hold(str(registration["_id"]), update_data):
+                confirmed += 1
+        if not confirmed:
+            return 0
+
+        # One ticket type (and pricing) per group; every row holds one ticket.
+        lead = await db.registrations.find_one({"group_id": group_id}, {"ticket_type_id": 1, "discount_details": 1})
+        ticket_type = await self._move_to_sold(lead, confirmed)
+        unsent = db.registrations.find(
             {
-                "$inc": {
-                    "reserved": -registration["group_size"],
-                    "sold_count": registration["group_size"],
-                }
-            },
+                "group_id": group_id,
+                "status": RegistrationStatus.CONFIRMED,
+                "confirmation_email_sent": {"$ne": True},
+            }
         )
+        async for registration in unsent:
+            await self._send_confirmation(registration, ticket_type)
+        return confirmed
 
-        ticket_type = await db.ticket_types.find_one(
-            {"_id": ObjectId(registration["ticket_type_id"])}
-        )
-        if ticket_type.get("is_early_bird") and ticket_type.get("early_bird_capacity"):
-            pricing_details = registration.get("discount_details", {})
+    async def _move_to_sold(self, registration: Dict[str, Any], quantity: int) -> Optional[TicketType]:
+        """Move `quantity` paid tickets of `registration`'s ticket type from
+        `reserved` to `sold_count`."""
+
+        db = await get_database()
+        ticket_type = await ticket_type_cache.get(registration["ticket_type_id"])
+        counters = {"reserved": -quantity, "sold_count": quantity}
+        if ticket_type and ticket_type.is_early_bird and ticket_type.early_bird_capacity:
+            pricing_details = registration.get("discount_details") or {}
             if "early_bird" in pricing_details:
-                await db.ticket_types.update_one(
-                    {"_id": ObjectId(registration["ticket_type_id"])},
-                    {"$inc": {"early_bird_sold": registration["group_size"]}},
-                )
+                counters["early_bird_sold"] = quantity
 
-        event = await db.events.find_one({"_id": ObjectId(registration["event_id"])})
-        ticket = ticket_type or {}
+        await db.ticket_types.update_one(
+            {"_id": ObjectId(registration["ticket_type_id"])},
+            {"$inc": counters},
+        )
+        return ticket_type
+
+    async def _send_confirmation(self, registration: Dict[str, Any], ticket_type: Optional[TicketType]) -> None:
+        db = await get_database()
+        registration_id = str(registration["_id"])
+        event = await db.events.find_one({"_id": ObjectId(registration["event_id"])}) or {}
 
         email_data = {
             "first_name": registration["first_name"],
             "last_name": registration["last_name"],
             "email": registration["email"],
             "event_name": event.get("name", ""),
-            "ticket_type": ticket.get("name", ""),
+            "ticket_type": ticket_type.name if ticket_type else "",
             "final_price": f"{registration['final_price']:.2f}",
             "discount_amount": f"{registration['discount_amount']:.2f}",
             "qr_code": registration["qr_code"],
@@ -167,10 +390,11 @@ class RegistrationService:
             "event_url": f"{settings.app_url}/events/{event.get('slug')}",
         }
 
+        qr_code_image = await qrcode_service.render(registration["qr_code"], "png")
         email_sent = await email_service.send_confirmation_email(
             registration["email"],
             email_data,
-            registration["qr_code_image"],
+            base64.b64encode(qr_code_image).decode(),
         )
 
         if email_sent:
@@ -184,6 +408,40 @@ class RegistrationService:
                 },
             )
 
+    async def _reclaim_expired_hold(self, registration_id: str, update_data: Dict[str, Any]) -> bool:
+        """Confirm a registration paid after the sweeper expired its hold, if
+        its tickets can still be reserved."""
+
+        db = await get_database()
+        registration = await db.registrations.find_one(
+            {"_id": ObjectId(registration_id), "status": RegistrationStatus.EXPIRED},
+            {"event_id": 1, "ticket_type_id": 1, "group_size": 1, "hold_sweep_id": 1, "hold_released_at": 1},
+        )
+        if not registration:
+            return False
+
+        if registration.get("hold_sweep_id") and not registration.get("hold_released_at"):
+            # Finish the interrupted release first, or recovering it later
+            # would take back the tickets reserved below.
+            from app.services.hold_sweeper import hold_sweeper  # imports this module
+
+            await hold_sweeper.release(registration["hold_sweep_id"])
+
+        reservation = await pricing_service.reserve(registration["ticket_type_id"], registration["group_size"])
+        if not reservation["reserved"]:
+            return False
+
+        result = await db.registrations.update_one(
+            {"_id": registration["_id"], "status": RegistrationStatus.EXPIRED},
+            {
+                "$set": update_data,
+                "$unset": {"hold_expires_at": "", "hold_sweep_id": "", "hold_released_at": "", "hold_release_id": ""},
+            },
+        )
+        if result.modified_count == 0:
+            await pricing_service.release(registration["ticket_type_id"], registration["group_size"])
+            return False
+        await recommendation_service.bump_population_version(registration["event_id"])
         return True
 
     async def _add_to_waitlist(self, registration_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -213,40 +471,83 @@ class RegistrationService:
 
         return {"waitlist_id": str(result.inserted_id), "position": waitlist_entry.position}
 
-    async def process_waitlist(self, event_id: str, ticket_type_id: str) -> None:
+    async def _add_many_to_waitlist(
+        self,
+        event_id: str,
+        ticket_type_id: str,
+        attendees: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """`_add_to_waitlist` for a group: consecutive positions, one insert."""
+
+        db = await get_database()
+        count = await db.waitlist_entries.count_documents(
+            {"event_id": event_id, "ticket_type_id": ticket_type_id, "converted": False}
+        )
+        expires_at = datetime.utcnow() + timedelta(hours=24)
+        waitlist_entries = [
+            WaitlistEntry(
+                event_id=event_id,
+                ticket_type_id=ticket_type_id,
+                first_name=attendee["first_name"],
+                last_name=attendee["last_name"],
+                email=attendee["email"],
+                phone=attendee.get("phone"),
+                position=count + offset + 1,
+                expires_at=expires_at,
+            )
+            for offset, attendee in enumerate(attendees)
+        ]
+
+        result = await db.waitlist_entries.insert_many(
+            [waitlist_entry.model_dump(by_alias=True, exclude={"id"}) for waitlist_entry in waitlist_entries]
+        )
+        return [
+            {"waitlist_id": str(inserted_id), "position": waitlist_entry.position}
+            for inserted_id, waitlist_entry in zip(result.inserted_ids, waitlist_entries)
+        ]
+
+    async def process_waitlist(self, event_id: str, ticket_type_id: str, released: int = 1) -> None:
+        """Notify the next waitlisted people (up to `released`, e.g. the
+        tickets an expired hold gave back) that tickets are available."""
+
         db = await get_database()
         availability = await pricing_service.check_availability(ticket_type_id, 1)
         if not availability["available"]:
             return
 
-        waitlist_entry = await db.waitlist_entries.find_one(
-            {
-                "event_id": event_id,
-                "ticket_type_id": ticket_type_id,
-                "converted": False,
-                "notified": False,
-            },
-            sort=[("position", 1)],
+        waitlist_entries = (
+            await db.waitlist_entries.find(
+                {
+                    "event_id": event_id,
+                    "ticket_type_id": ticket_type_id,
+                    "converted": False,
+                    "notified": False,
+                }
+            )
+            .sort("position", 1)
+            .limit(released)
+            .to_list(released)
         )
 
-        if not waitlist_entry:
+        if not waitlist_entries:
             return
 
         event = await db.events.find_one({"_id": ObjectId(event_id)})
-        ticket_type = await db.ticket_types.find_one({"_id": ObjectId(ticket_type_id)})
-
-        await email_service.send_waitlist_notification(
-            waitlist_entry["email"],
-            event.get("name", ""),
-            ticket_type.get("name", ""),
-            waitlist_entry["position"],
-            waitlist_entry["expires_at"].strftime("%B %d, %Y %I:%M %p")
-            if waitlist_entry.get("expires_at")
-            else None,
-        )
+        ticket_type = await ticket_type_cache.get(ticket_type_id)
+
+        for waitlist_entry in waitlist_entries:
+            await email_service.send_waitlist_notification(
+                waitlist_entry["email"],
+                event.get("name", ""),
+                ticket_type.name if ticket_type else "",
+                waitlist_entry["position"],
+                waitlist_entry["expires_at"].strftime("%B %d, %Y %I:%M %p")
+                if waitlist_entry.get("expires_at")
+                else None,
+            )
 
-        await db.waitlist_entries.update_one(
-            {"_id": waitlist_entry["_id"]},
+        await db.waitlist_entries.update_many(
+            {"_id": {"$in": [entry["_id"] for entry in waitlist_entries]}},
             {
                 "$set": {
                     "notified": True,
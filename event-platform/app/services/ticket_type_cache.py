@@ -0,0 +1,93 @@
+"""Per-process read-through cache of ticket types' static fields.
+
+Prices, early-bird and group rules, capacity, sales windows and names change
+rarely but are read by every price quote, availability check, registration
+and payment confirmation. They are cached here as validated `TicketType`
+models; the hot counters (`COUNTER_FIELDS`) are never cached and always come
+from MongoDB. `PATCH /api/tickets/{id}` invalidates its entry in this worker
+and the TTL bounds how long other workers may serve the old fields.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+
+from app.config import settings
+from app.database import get_database
+from app.models.ticket import TicketType
+
+COUNTER_FIELDS = ("sold_count", "reserved", "early_bird_sold")
+COUNTER_PROJECTION = {field: 1 for field in COUNTER_FIELDS}
+STATIC_PROJECTION = {field: 0 for field in COUNTER_FIELDS}
+
+
+@dataclass
+class _Entry:
+    ticket: TicketType
+    expires_at: float
+
+
+class TicketTypeCache:
+    def __init__(self, ttl: float, capacity: int = 4096) -> None:
+        self.ttl = ttl
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, ticket_type_id: str) -> Optional[TicketType]:
+        """Static fields of a ticket type with its counters at zero, or None
+        if it does not exist. Reads MongoDB only on a miss."""
+
+        key = str(ticket_type_id)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.ticket
+
+        self.misses += 1
+        db = await get_database()
+        ticket_data = await db.ticket_types.find_one({"_id": ObjectId(key)}, STATIC_PROJECTION)
+        if not ticket_data:
+            self._entries.pop(key, None)
+            return None
+        return self._store(key, ticket_data)
+
+    async def with_counters(self, ticket_type_id: str, counters: Dict[str, Any]) -> Optional[TicketType]:
+        """The cached ticket type completed with `counters` read from MongoDB
+        (e.g. a `COUNTER_PROJECTION` document)."""
+
+        ticket = await self.get(ticket_type_id)
+        if ticket is None:
+            return None
+        return ticket.model_copy(update={field: counters.get(field) or 0 for field in COUNTER_FIELDS})
+
+    def prime(self, ticket_data: Dict[str, Any]) -> None:
+        """Cache a ticket type document another query already loaded."""
+
+        key = str(ticket_data["_id"])
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            self._store(key, ticket_data)
+
+    def invalidate(self, ticket_type_id: str) -> None:
+        self._entries.pop(str(ticket_type_id), None)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _store(self, key: str, ticket_data: Dict[str, Any]) -> TicketType:
+        static = {name: value for name, value in ticket_data.items() if name not in COUNTER_FIELDS}
+        ticket = TicketType(**static)
+        self._entries[key] = _Entry(ticket=ticket, expires_at=time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return ticket
+
+
+ticket_type_cache = TicketTypeCache(settings.ticket_type_cache_ttl_seconds)
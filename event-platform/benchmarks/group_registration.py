@@ -0,0 +1,98 @@
+"""One bulk group registration versus the same attendees registered one
+`create_registration` call at a time: wall time and MongoDB operations.
+
+    python -m benchmarks.group_registration --sizes 20 50
+    python -m benchmarks.group_registration --sizes 20 50 --mock   # needs mongomock-motor
+
+Runs against a scratch database (`--database`, dropped afterwards) on
+MONGODB_URL; operations are counted as in `benchmarks.registration_ops`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import settings
+from app.database import db
+from app.services.registration_service import registration_service
+
+from .registration_ops import CountingClient
+
+
+def attendees(prefix: str, size: int) -> list[dict]:
+    return [
+        {"first_name": "Bench", "last_name": str(i), "email": f"{prefix}{i}@example.com", "company": "Acme"}
+        for i in range(size)
+    ]
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.mock:
+        from mongomock_motor import AsyncMongoMockClient
+
+        client = AsyncMongoMockClient()
+    else:
+        client = AsyncIOMotorClient(settings.mongodb_url)
+    settings.database_name = args.database
+    database = client[args.database]
+
+    event = await database.events.insert_one({"name": "Bench Conf", "slug": "bench-conf"})
+    event_id = str(event.inserted_id)
+    ticket = await database.ticket_types.insert_one(
+        {
+            "event_id": event_id,
+            "name": "Standard",
+            "base_price": 100.0,
+            "group_discount_enabled": True,
+            "group_discount_rules": [{"min_quantity": 10, "discount_percent": 15}],
+            "capacity": 4 * sum(args.sizes),
+            "is_active": True,
+        }
+    )
+    ticket_type_id = str(ticket.inserted_id)
+
+    print(f"{'attendees':>9} {'mode':>11} {'ms':>9} {'mongo ops':>10} {'speedup':>8}")
+    counts: Counter = Counter()
+    db.client = CountingClient(client, counts)
+    try:
+        for size in args.sizes:
+            counts.clear()
+            started = time.perf_counter()
+            for attendee in attendees(f"single{size}-", size):
+                await registration_service.create_registration(
+                    {"event_id": event_id, "ticket_type_id": ticket_type_id, "group_size": 1, **attendee}
+                )
+            single_ms = (time.perf_counter() - started) * 1e3
+            single_ops = sum(counts.values())
+
+            counts.clear()
+            started = time.perf_counter()
+            result = await registration_service.create_group_registration(
+                {"event_id": event_id, "ticket_type_id": ticket_type_id, "attendees": attendees(f"group{size}-", size)}
+            )
+            group_ms = (time.perf_counter() - started) * 1e3
+            group_ops = sum(counts.values())
+            assert result["registered"] == size, result
+
+            print(f"{size:>9} {'individual':>11} {single_ms:>9.1f} {single_ops:>10} {'':>8}")
+            print(f"{size:>9} {'group':>11} {group_ms:>9.1f} {group_ops:>10} {single_ms / group_ms:>7.2f}x")
+    finally:
+        db.client = client
+        await client.drop_database(args.database)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50])
+    parser.add_argument("--database", default="event_platform_bench")
+    parser.add_argument("--mock", action="store_true", help="use an in-memory mongomock-motor client")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Scaling of the event-wide recommendation batch with worker count.
+
+    python -m benchmarks.networking_batch --size 8000 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import as_completed
+
+from app.ai.batch import chunk_rows, compute_chunk, make_pool
+
+from .synthetic import make_population
+
+
+def run(size: int, workers: int, chunk_size: int, limit: int) -> float:
+    attendees = make_population(size)
+    started = time.perf_counter()
+    with make_pool(attendees, workers) as pool:
+        futures = [pool.submit(compute_chunk, rows, limit) for rows in chunk_rows(size, chunk_size)]
+        done = sum(len(future.result()) for future in as_completed(futures))
+    elapsed = time.perf_counter() - started
+    assert done == size
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=8000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'seconds':>9} {'subjects/s':>11} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        elapsed = run(args.size, workers, args.chunk_size, args.limit)
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.2f} {args.size / elapsed:>11.0f} {baseline / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
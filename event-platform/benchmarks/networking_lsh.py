@@ -0,0 +1,68 @@
+"""Recall versus latency of MinHash/LSH candidate generation against exact top-k.
+
+    python -m benchmarks.networking_lsh --sizes 10000 50000 200000 --configs 32x2 16x3 8x4
+
+Recall@k counts an approximate match as correct when its score reaches the
+exact k-th score, so ties between equally good attendees are not penalized.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from app.ai.lsh import MinHashLSH
+from app.ai.matrix import AttendeeMatrix
+
+from .synthetic import make_population
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def run(size: int, configs: list[tuple[int, int]], queries: int, limit: int) -> None:
+    matrix, build = _timed(lambda: AttendeeMatrix(make_population(size)))
+    subjects = range(0, size, max(1, size // queries))
+    exact = {}
+    exact_times = []
+    for row in subjects:
+        exact[row], elapsed = _timed(lambda: matrix.top_k(row, limit=limit))
+        exact_times.append(elapsed)
+    print(f"\n{size} attendees (encode {build:.2f}s), exact top-{limit}: {statistics.mean(exact_times) * 1e3:.2f} ms/query")
+    print(f"{'bands x rows':>12} {'index s':>8} {'ms/query':>9} {'candidates':>11} {'recall@k':>9}")
+
+    for bands, rows in configs:
+        lsh, index_time = _timed(lambda: MinHashLSH(matrix, bands=bands, rows=rows))
+        times, recalls, candidates = [], [], []
+        for row in subjects:
+            approx, elapsed = _timed(lambda: lsh.top_k(row, limit=limit))
+            times.append(elapsed)
+            candidates.append(len(lsh.candidates(row)))
+            kth = exact[row][-1][1] if exact[row] else 0.0
+            hits = sum(1 for _, score in approx if score >= kth)
+            recalls.append(hits / max(1, len(exact[row])))
+        print(
+            f"{f'{bands} x {rows}':>12} {index_time:>8.2f} {statistics.mean(times) * 1e3:>9.2f} "
+            f"{statistics.mean(candidates):>11.0f} {statistics.mean(recalls):>9.3f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 200000])
+    parser.add_argument("--configs", nargs="+", default=["32x2", "16x3", "8x4", "4x4"])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    configs = [tuple(int(part) for part in config.split("x")) for config in args.configs]
+    for size in args.sizes:
+        run(size, configs, args.queries, args.limit)
+
+
+if __name__ == "__main__":
+    main()
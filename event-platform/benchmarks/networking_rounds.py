@@ -0,0 +1,77 @@
+"""Solve time and quality of the speed-networking round scheduler.
+
+    python -m benchmarks.networking_rounds --sizes 1000 5000 --rounds 10 --table-sizes 2 4
+
+Quality is the total pairwise score summed over all rounds and tables,
+compared with random seating (which may also repeat pairs) and with the
+greedy construction alone, without local search.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from app.ai.matrix import AttendeeMatrix
+from app.ai.scheduler import _table_sizes, schedule_rounds, similarity_matrix
+
+from .synthetic import make_population
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def random_total(scores: np.ndarray, rounds: int, table_size: int, seed: int = 0) -> float:
+    rng = np.random.default_rng(seed)
+    sizes = _table_sizes(len(scores), table_size)
+    total = 0.0
+    for _ in range(rounds):
+        order = rng.permutation(len(scores))
+        start = 0
+        for size in sizes:
+            table = order[start : start + size]
+            total += float(scores[np.ix_(table, table)].sum(dtype=np.float64)) / 2.0
+            start += size
+    return total
+
+
+def run(size: int, rounds: int, table_sizes: list[int], passes: int) -> None:
+    matrix = AttendeeMatrix(make_population(size))
+    scores, build = _timed(lambda: similarity_matrix(matrix))
+    print(f"\n{size} attendees x {rounds} rounds (similarity matrix {build:.2f}s)")
+    print(f"{'table':>5} {'mode':>14} {'solve s':>8} {'total':>10} {'vs random':>9}")
+
+    for table_size in table_sizes:
+        baseline = random_total(scores, rounds, table_size)
+        print(f"{table_size:>5} {'random':>14} {'':>8} {baseline:>10.1f} {1.0:>9.3f}")
+        for label, search in (("greedy", 0), (f"greedy+ls({passes})", passes)):
+            schedule, elapsed = _timed(
+                lambda: schedule_rounds(
+                    matrix, rounds, table_size=table_size, local_search_passes=search, scores=scores
+                )
+            )
+            print(
+                f"{table_size:>5} {label:>14} {elapsed:>8.2f} {schedule.total_score:>10.1f} "
+                f"{schedule.total_score / baseline:>9.3f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--table-sizes", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--passes", type=int, default=4)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.rounds, args.table_sizes, args.passes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Memory and comparison cost of dict profiles versus compact AttendeeProfiles.
+
+    python -m benchmarks.profile_memory --size 100000
+
+Dict profiles are round-tripped through JSON first so that, like profiles
+parsed from a request or a Mongo cursor, they do not share string objects.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from app.ai.profiles import ProfileStore
+from app.ai.similarity import similarity
+
+from .synthetic import make_population
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def _pairs_per_second(profiles, pairs: int) -> float:
+    size = len(profiles)
+    started = time.perf_counter()
+    for i in range(pairs):
+        similarity(profiles[i % size], profiles[(i * 7919 + 1) % size])
+    return pairs / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--pairs", type=int, default=200000)
+    args = parser.parse_args()
+
+    payload = json.dumps(make_population(args.size))
+    dicts, dict_bytes = _measure(lambda: json.loads(payload))
+    # Built from a fresh parse so strings it retains are counted against it.
+    compact, compact_bytes = _measure(lambda: ProfileStore().add_many(json.loads(payload)))
+
+    per_100k = 100000 / args.size
+    print(f"{'form':>8} {'MB / 100k':>10} {'bytes/profile':>14} {'pairs/s':>10}")
+    for name, profiles, used in (("dict", dicts, dict_bytes), ("compact", compact, compact_bytes)):
+        print(
+            f"{name:>8} {used * per_100k / 2**20:>10.1f} {used / args.size:>14.0f} "
+            f"{_pairs_per_second(profiles, args.pairs):>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Event-loop latency of unrelated requests while RAG chats are running:
+answering inline in the handler versus through the `InferenceExecutor`.
+
+    python -m benchmarks.rag_concurrency --documents 20000 --clients 1 8 32
+
+Each client sends chats back to back for `--seconds`; meanwhile a probe
+coroutine stands in for a cheap unrelated endpoint every 5 ms and records its
+latency. The stand-in encoder costs a fixed overhead per `encode()` call plus
+a little per text (numpy matmuls, which release the GIL like torch does), so
+micro-batching shows up in chat throughput.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from app.ai.inference import InferenceExecutor
+from app.ai.rag import RagDocument, RagEngine
+from app.ai.rag_index import RagIndex, inverse_row_norms
+
+from .synthetic import RandomEncoder
+
+
+class CostlyEncoder(RandomEncoder):
+    """`RandomEncoder` plus model-like compute: `call_passes` matmuls per
+    call and `text_passes` more per text."""
+
+    def __init__(self, call_passes: int = 12, text_passes: int = 2) -> None:
+        self.call_passes = call_passes
+        self.text_passes = text_passes
+        rng = np.random.default_rng(1)
+        self._weights = rng.standard_normal((384, 384), dtype=np.float32)
+        self._hidden = rng.standard_normal((128, 384), dtype=np.float32)
+
+    def encode(self, texts, batch_size: int = 64, convert_to_numpy: bool = True):
+        count = 1 if isinstance(texts, str) else len(texts)
+        hidden = self._hidden
+        for _ in range(self.call_passes + self.text_passes * count):
+            hidden = np.tanh(hidden @ self._weights)
+        return super().encode(texts, batch_size=batch_size, convert_to_numpy=convert_to_numpy)
+
+
+def _percentile_ms(samples: list[float], q: float) -> float:
+    return float(np.percentile(samples, q)) * 1e3 if samples else 0.0
+
+
+async def _run(index: RagIndex, engine: RagEngine, clients: int, seconds: float, executor) -> dict:
+    probes: list[float] = []
+    chats: list[float] = []
+    stop = time.perf_counter() + seconds
+
+    async def chat(query: str) -> None:
+        started = time.perf_counter()
+        if executor is None:
+            index.answer(engine, query, k=3)
+        else:
+            embedding = await executor.encode(query)
+            await executor.run(index.answer, engine, query, k=3, query_embedding=embedding)
+        chats.append(time.perf_counter() - started)
+
+    async def client(number: int) -> None:
+        sent = 0
+        while time.perf_counter() < stop:
+            await chat(f"client {number} question {sent}")
+            sent += 1
+            # Yield like a network round-trip would.
+            await asyncio.sleep(0)
+
+    async def probe() -> None:
+        while time.perf_counter() < stop:
+            scheduled = time.perf_counter()
+            await asyncio.sleep(0.005)
+            probes.append(time.perf_counter() - scheduled - 0.005)
+
+    await asyncio.gather(probe(), *(client(i) for i in range(clients)))
+    return {
+        "probe_p50": _percentile_ms(probes, 50),
+        "probe_p99": _percentile_ms(probes, 99),
+        "chat_p99": _percentile_ms(chats, 99),
+        "chats_per_s": len(chats) / seconds,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch-window-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    engine = RagEngine()
+    engine._model, engine._use_st = CostlyEncoder(), True
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((args.documents, RandomEncoder.dimension), dtype=np.float32)
+    documents = [
+        RagDocument(text=f"doc {i}", answer=f"doc {i}", source="faq", metadata={}, embedding=embeddings[i])
+        for i in range(args.documents)
+    ]
+    index = RagIndex(key="bench", documents=documents, backend="sentence-transformers",
+                     embeddings=embeddings, inverse_norms=inverse_row_norms(embeddings))
+
+    print(f"{'clients':>7} {'mode':>8} {'probe p50 ms':>12} {'probe p99 ms':>12} "
+          f"{'chat p99 ms':>11} {'chats/s':>8} {'mean batch':>10}")
+    for clients in args.clients:
+        for mode in ("inline", "executor"):
+            executor = None
+            if mode == "executor":
+                executor = InferenceExecutor(engine.encode_batch, workers=args.workers,
+                                             max_pending=max(64, 2 * clients),
+                                             batch_window=args.batch_window_ms / 1000.0)
+            result = asyncio.run(_run(index, engine, clients, args.seconds, executor))
+            batch = executor.metrics()["batch_size"].get("mean", 1.0) if executor else 1.0
+            if executor:
+                executor.shutdown()
+            print(f"{clients:>7} {mode:>8} {result['probe_p50']:>12.2f} {result['probe_p99']:>12.2f} "
+                  f"{result['chat_p99']:>11.1f} {result['chats_per_s']:>8.0f} {batch:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""BM25 inverted index versus the token-Jaccard scan for lexical RAG retrieval.
+
+    python -m benchmarks.rag_lexical --sizes 1000 10000 100000
+
+The corpus is built from synthetic attendees by `RagEngine.build_documents`.
+Each query names one attendee's role, industry and two of their interests
+among question words ("who", "is", "into"), and counts as answered when that
+attendee's document ranks first (hit@1) or in the top 5 (hit@5). Several
+attendees can share all of those fields, so neither retriever reaches 1.0.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+from app.ai.bm25 import BM25Index
+from app.ai.rag import RagEngine
+
+from .synthetic import make_population
+
+
+def _queries(attendees: list[dict], count: int, seed: int = 0) -> list[tuple[int, str]]:
+    rnd = random.Random(seed)
+    queries = []
+    for row in rnd.sample(range(len(attendees)), min(count, len(attendees))):
+        attendee = attendees[row]
+        interests = rnd.sample(attendee["interests"], min(2, len(attendee["interests"])))
+        query = f"who is the {attendee['role']} in {attendee['industry']} into {' and '.join(interests)}?"
+        queries.append((row, query))
+    return queries
+
+
+def _evaluate(engine: RagEngine, documents, queries, lexical_index=None) -> tuple[float, float, float]:
+    times, first, top5 = [], 0, 0
+    for row, query in queries:
+        started = time.perf_counter()
+        ranked = engine.retrieve(query, documents, k=5, lexical_index=lexical_index)
+        times.append(time.perf_counter() - started)
+        found = [doc.metadata.get("id") for doc, _ in ranked]
+        first += found[:1] == [documents[row].metadata.get("id")]
+        top5 += documents[row].metadata.get("id") in found
+    return statistics.mean(times) * 1e3, first / len(queries), top5 / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    bm25, jaccard = RagEngine(lexical="bm25"), RagEngine(lexical="token-jaccard")
+    print(f"{'documents':>10} {'backend':>14} {'build s':>8} {'ms/query':>9} {'hit@1':>6} {'hit@5':>6}")
+    for size in args.sizes:
+        attendees = make_population(size)
+        documents = bm25.build_documents({"attendees": attendees}, embed=False)
+        queries = _queries(attendees, args.queries)
+
+        started = time.perf_counter()
+        index = BM25Index([doc.text for doc in documents])
+        build = time.perf_counter() - started
+        for name, engine, lexical_index, build_time in (
+            ("token-jaccard", jaccard, None, 0.0),
+            ("bm25", bm25, index, build),
+        ):
+            latency, hit1, hit5 = _evaluate(engine, documents, queries, lexical_index)
+            print(f"{size:>10} {name:>14} {build_time:>8.2f} {latency:>9.2f} {hit1:>6.2f} {hit5:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
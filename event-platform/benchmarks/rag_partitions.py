@@ -0,0 +1,75 @@
+"""Per-query cost of partitioned RAG retrieval: a query scoped to one event or
+one organization versus a client-supplied corpus searched whole.
+
+    python -m benchmarks.rag_partitions --events 200 --attendees 500 --events-per-org 5
+
+Every event gets its own attendees (the corpus has events x attendees
+documents); organizations own `--events-per-org` events each. Both the BM25
+and the embedding backend (stand-in encoder) are timed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from app.ai.rag import RagEngine
+from app.ai.rag_index import RagIndexCache
+
+from .synthetic import RandomEncoder, make_population
+
+
+def make_snapshot(events: int, attendees: int, events_per_org: int) -> dict:
+    population = make_population(events * attendees)
+    for i, attendee in enumerate(population):
+        attendee["eventIds"] = [f"e{i // attendees}"]
+    return {
+        "faq": [{"question": f"Question {i}", "answer": f"Answer {i}"} for i in range(20)],
+        "events": [
+            {"id": f"e{i}", "name": f"Event {i}", "location": "Berlin", "organizationId": f"o{i // events_per_org}"}
+            for i in range(events)
+        ],
+        "attendees": population,
+    }
+
+
+def _mean_ms(fn, queries: list[str]) -> float:
+    times = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        times.append(time.perf_counter() - started)
+    return statistics.mean(times) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--attendees", type=int, default=500)
+    parser.add_argument("--events-per-org", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    snapshot = make_snapshot(args.events, args.attendees, args.events_per_org)
+    queries = [f"attendee interested in topic-{i} and Machine Learning" for i in range(args.queries)]
+    scopes = {
+        "event": {"event_ids": ["e0"]},
+        "organization": {"organization_ids": ["o0"]},
+        "whole corpus": {"whole_corpus": True},
+    }
+    print(f"{len(snapshot['attendees']) + len(snapshot['events']) + len(snapshot['faq'])} documents, "
+          f"{args.attendees} attendees per event, {args.events_per_org} events per organization")
+    print(f"{'backend':>22} {'build s':>8} " + " ".join(f"{scope + ' ms':>16}" for scope in scopes))
+
+    for backend in ("bm25", "sentence-transformers"):
+        engine = RagEngine()
+        if backend == "sentence-transformers":
+            engine._model, engine._use_st = RandomEncoder(), True
+        index = RagIndexCache(engine).get(snapshot)
+        timings = [_mean_ms(lambda q: index.answer(engine, q, k=5, **scope), queries) for scope in scopes.values()]
+        print(f"{backend:>22} {index.build_seconds:>8.2f} " + " ".join(f"{ms:>16.3f}" for ms in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Query latency of RAG retrieval: per-document cosine loop versus one
+matrix-vector product with argpartition top-k.
+
+    python -m benchmarks.rag_retrieval --sizes 1000 10000 100000
+
+Documents get random 384-dimensional embeddings and the query is encoded by
+a stand-in encoder, so the timings cover retrieval only, not the model.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from app.ai.rag import RagDocument, RagEngine
+from app.ai.rag_index import RagIndex, inverse_row_norms
+
+from .synthetic import RandomEncoder
+
+
+def loop_best(engine: RagEngine, query: str, documents: list[RagDocument]) -> tuple[RagDocument, float]:
+    """The previous answer() scan: one cosine per document, keep the best."""
+
+    q_emb = engine._encode(query)
+    best_doc, best_score = None, -1.0
+    for doc in documents:
+        score = float(np.dot(q_emb, doc.embedding) / (np.linalg.norm(q_emb) * np.linalg.norm(doc.embedding)))
+        if score > best_score:
+            best_doc, best_score = doc, score
+    return best_doc, best_score
+
+
+def _mean_ms(fn, queries: list[str]) -> float:
+    times = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        times.append(time.perf_counter() - started)
+    return statistics.mean(times) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = RagEngine()
+    engine._model, engine._use_st = RandomEncoder(), True
+    queries = [f"question {i}" for i in range(args.queries)]
+    encode_ms = _mean_ms(engine._encode, queries)
+    print(f"query encoding (stand-in encoder): {encode_ms:.3f} ms")
+    print(f"{'documents':>10} {'loop ms':>9} {'matvec ms':>10} {'speedup':>8} {'same best':>10}")
+
+    rng = np.random.default_rng(0)
+    for size in args.sizes:
+        embeddings = rng.standard_normal((size, RandomEncoder.dimension), dtype=np.float32)
+        documents = [
+            RagDocument(text=f"doc {i}", answer=f"doc {i}", source="faq", metadata={}, embedding=embeddings[i])
+            for i in range(size)
+        ]
+        index = RagIndex(key="bench", documents=documents, backend="sentence-transformers", embeddings=embeddings,
+                         inverse_norms=inverse_row_norms(embeddings))
+
+        loop = _mean_ms(lambda q: loop_best(engine, q, documents), queries)
+        vectorized = _mean_ms(lambda q: index.answer(engine, q, k=args.k), queries)
+        same = all(
+            loop_best(engine, q, documents)[0].text == index.answer(engine, q, k=args.k)["answer"] for q in queries
+        )
+        print(f"{size:>10} {loop - encode_ms:>9.2f} {vectorized - encode_ms:>10.3f} "
+              f"{(loop - encode_ms) / max(vectorized - encode_ms, 1e-9):>7.0f}x {str(same):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""MongoDB operations per registration: price quote, registration and
+payment confirmation of `--registrations` attendees, counted per collection.
+
+    python -m benchmarks.registration_ops --registrations 200
+    python -m benchmarks.registration_ops --mock   # needs mongomock-motor
+
+Runs against a scratch database (`--database`, dropped afterwards) on
+MONGODB_URL. Operations are counted at the driver API (one `find_one`,
+`update_one`, `find(...).to_list()` ... each), i.e. round trips; emails are
+not sent.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import settings
+from app.database import db
+from app.services.email_service import email_service
+from app.services.pricing_service import pricing_service
+from app.services.registration_service import registration_service
+
+OPERATIONS = {
+    "aggregate",
+    "bulk_write",
+    "count_documents",
+    "delete_many",
+    "delete_one",
+    "find",
+    "find_one",
+    "find_one_and_update",
+    "insert_many",
+    "insert_one",
+    "update_many",
+    "update_one",
+}
+
+
+class CountingCollection:
+    def __init__(self, collection, counts: Counter) -> None:
+        self._collection = collection
+        self._counts = counts
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._collection, name)
+        if name not in OPERATIONS:
+            return attribute
+
+        def counted(*args, **kwargs):
+            self._counts[self._collection.name] += 1
+            return attribute(*args, **kwargs)
+
+        return counted
+
+
+class CountingDatabase:
+    def __init__(self, database, counts: Counter) -> None:
+        self._database = database
+        self._counts = counts
+
+    def __getattr__(self, name: str):
+        return CountingCollection(getattr(self._database, name), self._counts)
+
+    def __getitem__(self, name: str):
+        return CountingCollection(self._database[name], self._counts)
+
+
+class CountingClient:
+    def __init__(self, client, counts: Counter) -> None:
+        self._client = client
+        self._counts = counts
+
+    def __getitem__(self, name: str):
+        return CountingDatabase(self._client[name], self._counts)
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.mock:
+        from mongomock_motor import AsyncMongoMockClient
+
+        client = AsyncMongoMockClient()
+    else:
+        client = AsyncIOMotorClient(settings.mongodb_url)
+    settings.database_name = args.database
+    database = client[args.database]
+
+    async def no_email(*_args, **_kwargs) -> bool:
+        return False
+
+    email_service.send_confirmation_email = no_email
+
+    event = await database.events.insert_one({"name": "Bench Conf", "slug": "bench-conf", "location": "Online"})
+    event_id = str(event.inserted_id)
+    ticket = await database.ticket_types.insert_one(
+        {
+            "event_id": event_id,
+            "name": "Standard",
+            "base_price": 100.0,
+            "is_early_bird": True,
+            "early_bird_price": 80.0,
+            "early_bird_capacity": args.registrations // 2,
+            "early_bird_sold": 0,
+            "group_discount_enabled": True,
+            "group_discount_rules": [{"min_quantity": 3, "discount_percent": 10}],
+            "capacity": args.registrations * 4,
+            "sold_count": 0,
+            "reserved": 0,
+            "is_active": True,
+        }
+    )
+    ticket_type_id = str(ticket.inserted_id)
+
+    counts: Counter = Counter()
+    db.client = CountingClient(client, counts)
+    started = time.perf_counter()
+    try:
+        for i in range(args.registrations):
+            await pricing_service.calculate_price(ticket_type_id, 1)
+            result = await registration_service.create_registration(
+                {
+                    "event_id": event_id,
+                    "ticket_type_id": ticket_type_id,
+                    "first_name": "Bench",
+                    "last_name": str(i),
+                    "email": f"bench{i}@example.com",
+                    "group_size": 1,
+                }
+            )
+            await registration_service.confirm_payment(result["registration_id"], {"payment_method": "card"})
+        elapsed = time.perf_counter() - started
+    finally:
+        db.client = client
+        await client.drop_database(args.database)
+
+    total = sum(counts.values())
+    print(f"{args.registrations} registrations (quote + register + confirm) in {elapsed:.2f} s")
+    print(f"{'collection':>20} {'ops/registration':>17}")
+    for name, count in sorted(counts.items()):
+        print(f"{name:>20} {count / args.registrations:>17.2f}")
+    print(f"{'total':>20} {total / args.registrations:>17.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--registrations", type=int, default=200)
+    parser.add_argument("--database", default="event_platform_bench")
+    parser.add_argument("--mock", action="store_true", help="use an in-memory mongomock-motor client")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
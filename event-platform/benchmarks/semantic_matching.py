@@ -0,0 +1,81 @@
+"""Added latency of semantic tag matching per networking recommendation.
+
+    python -m benchmarks.semantic_matching --size 1000 --queries 50
+
+Uses `all-MiniLM-L6-v2` when sentence-transformers is installed. Otherwise
+tags are encoded as seeded random 384-dimensional vectors: quality is then
+meaningless, but the cache lookups and tag-set matrix products (the cost
+added per recommendation) are the same.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from app.ai.embeddings import DEFAULT_MODEL, TagEmbeddingCache
+from app.ai.networking import recommend_connections
+from app.ai.similarity import TAG_FIELDS, _to_normalized_set
+
+from .synthetic import RandomEncoder, make_population
+
+
+def load_sentence_model(name: str = DEFAULT_MODEL):
+    """The sentence-transformers model `name`, or None when unavailable."""
+
+    try:
+        from sentence_transformers import SentenceTransformer  # type: ignore
+
+        return SentenceTransformer(name)
+    except Exception:
+        return None
+
+
+def _per_query(fn, subjects) -> float:
+    times = []
+    for subject in subjects:
+        started = time.perf_counter()
+        fn(subject)
+        times.append(time.perf_counter() - started)
+    return statistics.mean(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=3)
+    args = parser.parse_args()
+
+    model = load_sentence_model()
+    encoder = "all-MiniLM-L6-v2" if model is not None else "random vectors (sentence-transformers missing)"
+    cache = TagEmbeddingCache(model or RandomEncoder())
+
+    attendees = make_population(args.size)
+    subjects = attendees[: args.queries]
+    tags = {tag for attendee in attendees for key in TAG_FIELDS for tag in _to_normalized_set(attendee[key])}
+
+    started = time.perf_counter()
+    cache.warm(sorted(tags))
+    warm = time.perf_counter() - started
+
+    token = _per_query(lambda s: recommend_connections(s, attendees, limit=args.limit), subjects)
+    semantic = {
+        mode: _per_query(
+            lambda s: recommend_connections(s, attendees, limit=args.limit, semantic=cache, semantic_mode=mode),
+            subjects,
+        )
+        for mode in ("max", "mean")
+    }
+
+    print(f"encoder: {encoder}")
+    print(f"{len(tags)} distinct tags encoded in {warm:.2f}s ({len(tags) / max(warm, 1e-9):.0f} tags/s)")
+    print(f"{args.size} candidates per recommendation:")
+    print(f"  token-only   {token * 1e3:8.2f} ms")
+    for mode, elapsed in semantic.items():
+        print(f"  semantic/{mode:<4}{elapsed * 1e3:8.2f} ms  (+{(elapsed - token) * 1e3:.2f} ms, {(elapsed - token) / args.size * 1e6:.1f} us/pair)")
+
+
+if __name__ == "__main__":
+    main()
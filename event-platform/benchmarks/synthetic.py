@@ -0,0 +1,61 @@
+"""Synthetic attendee populations shaped like the networking profiles."""
+
+from __future__ import annotations
+
+import hashlib
+import random
+
+import numpy as np
+
+from app.ai.similarity import CITY_TO_REGION, ROLE_GROUPS
+
+TOPICS = [
+    "AI", "Machine Learning", "Cloud", "DevOps", "Web3", "Fintech", "Design", "UX",
+    "Data", "Python", "Rust", "Security", "IoT", "Healthtech", "Climate", "Robotics",
+    "Marketing", "Sales", "Growth", "Product", "Mobile", "Gaming", "E-commerce", "Edtech",
+]
+ROLES = sorted({role for members in ROLE_GROUPS.values() for role in members}) + ["Designer", "Marketer"]
+LOCATIONS = sorted(CITY_TO_REGION) + ["Paris", "Berlin", "Singapore"]
+INDUSTRIES = ["Technology", "Finance", "Healthcare", "Retail", "Education", "Energy"]
+
+
+def make_population(size: int, *, vocab: int = 400, seed: int = 0) -> list[dict]:
+    """Attendees with Zipf-ish tag popularity over `vocab` distinct tags."""
+
+    rnd = random.Random(seed)
+    tags = TOPICS + [f"topic-{i}" for i in range(max(0, vocab - len(TOPICS)))]
+    weights = [1.0 / (rank + 1) for rank in range(len(tags))]
+
+    def pick(low: int, high: int) -> list[str]:
+        return list(set(rnd.choices(tags, weights=weights, k=rnd.randint(low, high))))
+
+    return [
+        {
+            "id": f"u{i}",
+            "name": f"Attendee {i}",
+            "company": f"Company {rnd.randrange(size // 10 + 1)}",
+            "industry": rnd.choice(INDUSTRIES),
+            "role": rnd.choice(ROLES),
+            "location": rnd.choice(LOCATIONS),
+            "interests": pick(2, 6),
+            "skills": pick(1, 5),
+            "goals": pick(0, 3),
+        }
+        for i in range(size)
+    ]
+
+
+class RandomEncoder:
+    """Stand-in with the `encode` signature of a SentenceTransformer: each
+    text maps to a seeded random vector, so timings need no model download."""
+
+    dimension = 384
+
+    def encode(self, texts, batch_size: int = 64, convert_to_numpy: bool = True):
+        single = isinstance(texts, str)
+        rows = []
+        for text in [texts] if single else texts:
+            seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+            rows.append(np.random.default_rng(seed).standard_normal(self.dimension))
+        encoded = np.asarray(rows, dtype=np.float32)
+        return encoded[0] if single else encoded
@@ -0,0 +1,63 @@
+"""Store `events.name_lower` on events created before it existed.
+
+    python -m migrations.backfill_event_names --dry-run
+    python -m migrations.backfill_event_names --batch-size 1000
+
+Chat questions naming an event ("seats left for PyCon") look it up by the
+indexed `name_lower`, which new events get from the `Event` model. Events
+without it are not found by name until this migration has run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from pymongo import UpdateOne
+
+from app.database import close_mongo_connection, connect_to_mongo, get_database
+
+
+async def backfill_event_names(database, *, batch_size: int = 1000, dry_run: bool = False) -> int:
+    """Set `name_lower` on every event missing it; returns how many were missing it."""
+
+    missing = {"name_lower": {"$exists": False}}
+    if dry_run:
+        return await database.events.count_documents(missing)
+
+    filled = 0
+    while True:
+        batch = await database.events.find(missing, {"name": 1}).limit(batch_size).to_list(batch_size)
+        if not batch:
+            return filled
+        updates = [
+            UpdateOne({"_id": doc["_id"]}, {"$set": {"name_lower": (doc.get("name") or "").lower()}}) for doc in batch
+        ]
+        result = await database.events.bulk_write(updates, ordered=False)
+        filled += result.modified_count
+
+
+async def run(args: argparse.Namespace) -> None:
+    await connect_to_mongo()
+    try:
+        database = await get_database()
+        started = time.perf_counter()
+        count = await backfill_event_names(database, batch_size=args.batch_size, dry_run=args.dry_run)
+        if args.dry_run:
+            print(f"{count} events have no name_lower (dry run, nothing changed)")
+            return
+        print(f"set name_lower on {count} events in {time.perf_counter() - started:.1f} s")
+    finally:
+        await close_mongo_connection()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Store `registrations.organization_id` on registrations created before it existed.
+
+    python -m migrations.backfill_registration_organizations --dry-run
+    python -m migrations.backfill_registration_organizations --batch-size 1000
+
+Chat questions about an organization ("how many registrations do we have")
+count its registrations by the indexed `organization_id`, which new
+registrations copy from their event. Registrations without it are not
+counted until this migration has run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from pymongo import UpdateMany
+
+from app.database import close_mongo_connection, connect_to_mongo, get_database
+
+
+async def backfill_registration_organizations(database, *, batch_size: int = 1000, dry_run: bool = False) -> int:
+    """Copy each event's `organization_id` onto its registrations missing it;
+    returns how many registrations were missing it."""
+
+    missing = {"organization_id": {"$exists": False}}
+    if dry_run:
+        return await database.registrations.count_documents(missing)
+
+    filled = 0
+    last_id = None
+    # One `update_many` per event, walking the events in `_id` order.
+    while True:
+        query = {"organization_id": {"$nin": [None, ""]}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        cursor = database.events.find(query, {"organization_id": 1}).sort("_id", 1).limit(batch_size)
+        batch = await cursor.to_list(batch_size)
+        if not batch:
+            return filled
+        updates = [
+            UpdateMany({"event_id": str(doc["_id"]), **missing}, {"$set": {"organization_id": doc["organization_id"]}})
+            for doc in batch
+        ]
+        result = await database.registrations.bulk_write(updates, ordered=False)
+        filled += result.modified_count
+        last_id = batch[-1]["_id"]
+
+
+async def run(args: argparse.Namespace) -> None:
+    await connect_to_mongo()
+    try:
+        database = await get_database()
+        started = time.perf_counter()
+        count = await backfill_registration_organizations(database, batch_size=args.batch_size, dry_run=args.dry_run)
+        if args.dry_run:
+            print(f"{count} registrations have no organization_id (dry run, nothing changed)")
+            return
+        print(f"set organization_id on {count} registrations in {time.perf_counter() - started:.1f} s")
+    finally:
+        await close_mongo_connection()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Remove the base64 PNGs stored in `registrations.qr_code_image`.
+
+    python -m migrations.strip_qr_images --dry-run
+    python -m migrations.strip_qr_images --batch-size 1000
+
+QR images are now rendered on request from `qr_code`
+(`GET /api/registrations/qr-code/{qr_code}`), so the stored copies are dead
+weight in every registration read. The migration `$unset`s them in batches
+and prints the collection's data size before and after; WiredTiger reuses
+the freed space, and `compact` returns it to the filesystem.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from pymongo.errors import OperationFailure
+
+from app.database import close_mongo_connection, connect_to_mongo, get_database
+
+
+async def collection_stats(database, name: str) -> dict[str, Any] | None:
+    try:
+        stats = await database.command("collStats", name)
+    except (OperationFailure, NotImplementedError):
+        return None
+    return {key: stats.get(key, 0) for key in ("count", "size", "avgObjSize", "storageSize")}
+
+
+async def strip_qr_images(database, *, batch_size: int = 1000, dry_run: bool = False) -> int:
+    """Unset `qr_code_image` on every registration; returns how many had one."""
+
+    with_image = {"qr_code_image": {"$exists": True}}
+    if dry_run:
+        return await database.registrations.count_documents(with_image)
+
+    stripped = 0
+    while True:
+        batch = await database.registrations.find(with_image, {"_id": 1}).limit(batch_size).to_list(batch_size)
+        if not batch:
+            return stripped
+        result = await database.registrations.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in batch]}},
+            {"$unset": {"qr_code_image": ""}},
+        )
+        stripped += result.modified_count
+
+
+def _describe(stats: dict[str, Any] | None) -> str:
+    if stats is None:
+        return "collStats unavailable"
+    return (
+        f"{stats['count']} documents, data {stats['size'] / 2**20:.1f} MB "
+        f"(avg {stats['avgObjSize']} B), storage {stats['storageSize'] / 2**20:.1f} MB"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    await connect_to_mongo()
+    try:
+        database = await get_database()
+        before = await collection_stats(database, "registrations")
+        print(f"before: {_describe(before)}")
+
+        started = time.perf_counter()
+        count = await strip_qr_images(database, batch_size=args.batch_size, dry_run=args.dry_run)
+        if args.dry_run:
+            print(f"{count} registrations store a QR image (dry run, nothing changed)")
+            return
+        print(f"stripped {count} QR images in {time.perf_counter() - started:.1f} s")
+
+        after = await collection_stats(database, "registrations")
+        print(f"after:  {_describe(after)}")
+        if before and after and before["size"]:
+            print(f"data size reduced by {1 - after['size'] / before['size']:.0%}")
+    finally:
+        await close_mongo_connection()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
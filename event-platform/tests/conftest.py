@@ -0,0 +1,21 @@
+"""Shared fixtures: an in-memory MongoDB (mongomock-motor) behind `get_database`."""
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from app.config import settings  # noqa: E402
+from app.database import db  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def database():
+    previous = db.client
+    db.client = mongomock_motor.AsyncMongoMockClient()
+    yield db.client[settings.database_name]
+    db.client = previous
@@ -0,0 +1,109 @@
+import pytest
+
+from app.ai.intents import Intent
+from app.services.access_service import ChatScope
+from app.services.analytics_service import analytics_service
+from app.services.pricing_service import pricing_service
+from migrations.backfill_registration_organizations import backfill_registration_organizations
+
+
+async def _events(database) -> dict:
+    ids = {}
+    for name, organization_id, location in (
+        ("RustConf", "o1", "Montreal"),
+        ("RustFest", "o1", "Berlin"),
+        ("PyCon", "o2", "Pittsburgh"),
+    ):
+        result = await database.events.insert_one(
+            {"name": name, "name_lower": name.lower(), "organization_id": organization_id, "location": location}
+        )
+        ids[name] = str(result.inserted_id)
+    return ids
+
+
+@pytest.mark.anyio
+async def test_locations_are_limited_to_the_scope(database):
+    ids = await _events(database)
+
+    answer = await analytics_service.answer(Intent("locations"), ChatScope(organization_ids=("o1",)))
+    assert sorted(answer["metadata"]["locations"]) == ["Berlin", "Montreal"]
+    answer = await analytics_service.answer(Intent("locations"), ChatScope(event_ids=(ids["PyCon"],)))
+    assert answer["metadata"]["locations"] == ["Pittsburgh"]
+
+
+@pytest.mark.anyio
+async def test_registrations_are_counted_by_their_organization(database):
+    ids = await _events(database)
+    await database.registrations.insert_many(
+        [
+            {"event_id": ids["RustConf"], "organization_id": "o1", "status": "confirmed"},
+            {"event_id": ids["RustFest"], "organization_id": "o1", "status": "pending"},
+            {"event_id": ids["RustFest"], "organization_id": "o1", "status": "cancelled"},
+            {"event_id": ids["PyCon"], "organization_id": "o2", "status": "confirmed"},
+        ]
+    )
+
+    answer = await analytics_service.answer(Intent("registration_count"), ChatScope(organization_ids=("o1",)))
+    assert answer["metadata"]["registrations"] == 2
+    scope = ChatScope(organization_ids=("o1",), event_ids=(ids["PyCon"],))
+    assert (await analytics_service.answer(Intent("registration_count"), scope))["metadata"]["registrations"] == 3
+    assert (await analytics_service.answer(Intent("registration_count"), ChatScope()))["metadata"]["registrations"] == 0
+
+
+@pytest.mark.anyio
+async def test_backfill_copies_the_events_organization(database):
+    ids = await _events(database)
+    await database.registrations.insert_many(
+        [{"event_id": ids["RustConf"], "status": "confirmed"}, {"event_id": ids["PyCon"], "status": "confirmed"}]
+    )
+
+    assert await backfill_registration_organizations(database, dry_run=True) == 2
+    assert await backfill_registration_organizations(database, batch_size=1) == 2
+    assert sorted(await database.registrations.distinct("organization_id")) == ["o1", "o2"]
+    assert await backfill_registration_organizations(database, dry_run=True) == 0
+
+
+@pytest.mark.anyio
+async def test_seats_left_come_from_the_ticket_type_counters(database):
+    ids = await _events(database)
+    general = await database.ticket_types.insert_one(
+        {
+            "event_id": ids["RustConf"],
+            "name": "General",
+            "base_price": 50.0,
+            "capacity": 10,
+            "sold_count": 3,
+            "reserved": 2,
+        }
+    )
+    await database.ticket_types.insert_many(
+        [
+            {"event_id": ids["RustConf"], "name": "VIP", "base_price": 90.0, "capacity": 5, "sold_count": 5},
+            # Off sale: its unsold seats cannot be bought.
+            {"event_id": ids["RustConf"], "name": "Crew", "base_price": 0.0, "capacity": 4, "is_active": False},
+            {"event_id": ids["RustFest"], "name": "General", "base_price": 40.0, "capacity": 8, "reserved": 1},
+            {"event_id": ids["PyCon"], "name": "General", "base_price": 30.0, "capacity": 0, "sold_count": 7},
+        ]
+    )
+    # A pending registration holds its seats through `reserved`, not by being counted.
+    await database.registrations.insert_one({"event_id": ids["RustConf"], "organization_id": "o1", "status": "pending"})
+
+    answer = await analytics_service.answer(Intent("capacity", event="RustConf"), ChatScope(organization_ids=("o1",)))
+    assert {key: answer["metadata"][key] for key in ("capacity", "taken", "remaining")} == {
+        "capacity": 19,
+        "taken": 10,
+        "remaining": 5,
+    }
+    assert (await pricing_service.check_availability(str(general.inserted_id), 5))["available"]
+    assert not (await pricing_service.check_availability(str(general.inserted_id), 6))["available"]
+
+    answer = await analytics_service.answer(Intent("capacity"), ChatScope(organization_ids=("o1",)))
+    assert answer["metadata"]["events"] == 2
+    assert {key: answer["metadata"][key] for key in ("capacity", "taken", "remaining")} == {
+        "capacity": 27,
+        "taken": 11,
+        "remaining": 12,
+    }
+    answer = await analytics_service.answer(Intent("capacity", event="PyCon"), ChatScope(organization_ids=("o2",)))
+    assert answer["metadata"]["remaining"] is None
+    assert answer["answer"] == "PyCon has no seat limit: 7 taken so far."
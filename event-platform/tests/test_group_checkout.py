@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.email_service import email_service
+from app.services.hold_sweeper import HoldSweeper
+from app.services.qrcode_service import qrcode_service
+from app.services.registration_service import registration_service
+
+
+@pytest.fixture
+def no_delivery(monkeypatch):
+    async def send_confirmation_email(*args, **kwargs):
+        return True
+
+    async def render(qr_code, image_format):
+        return b"png"
+
+    monkeypatch.setattr(email_service, "send_confirmation_email", send_confirmation_email)
+    monkeypatch.setattr(qrcode_service, "render", render)
+
+
+async def _group(database, size: int = 3) -> dict:
+    event = await database.events.insert_one({"name": "RustConf", "start_date": datetime.utcnow()})
+    ticket_type = await database.ticket_types.insert_one(
+        {"event_id": str(event.inserted_id), "name": "General", "base_price": 50.0, "capacity": 10}
+    )
+    result = await registration_service.create_group_registration(
+        {
+            "event_id": str(event.inserted_id),
+            "ticket_type_id": str(ticket_type.inserted_id),
+            "attendees": [
+                {"first_name": f"A{i}", "last_name": "B", "email": f"a{i}@example.com"} for i in range(size)
+            ],
+        }
+    )
+    assert result["success"] and result["registered"] == size
+    return {"group_id": result["group_id"], "ticket_type_id": ticket_type.inserted_id}
+
+
+async def _counters(database, ticket_type_id) -> tuple:
+    ticket = await database.ticket_types.find_one({"_id": ticket_type_id})
+    return ticket.get("reserved", 0), ticket.get("sold_count", 0)
+
+
+@pytest.mark.anyio
+async def test_group_payment_confirms_every_row_once(database, no_delivery):
+    group = await _group(database)
+    assert await _counters(database, group["ticket_type_id"]) == (3, 0)
+
+    payment = {"payment_method": "stripe", "transaction_id": "pi_1"}
+    assert await registration_service.confirm_group_payment(group["group_id"], payment) == 3
+    rows = await database.registrations.find({"group_id": group["group_id"]}).to_list(None)
+    assert {row["status"] for row in rows} == {"confirmed"}
+    assert not any("hold_expires_at" in row for row in rows)
+    assert all(row.get("confirmation_email_sent") for row in rows)
+    assert await _counters(database, group["ticket_type_id"]) == (0, 3)
+
+    # A retried webhook confirms nothing twice, and the sweeper leaves paid rows alone.
+    assert await registration_service.confirm_group_payment(group["group_id"], payment) == 0
+    assert await HoldSweeper(interval=60, batch_size=10).sweep(datetime.utcnow() + timedelta(days=1)) == 0
+    assert await _counters(database, group["ticket_type_id"]) == (0, 3)
+
+
+@pytest.mark.anyio
+async def test_group_paid_after_its_holds_expired_is_taken_back(database, no_delivery):
+    group = await _group(database)
+    assert await HoldSweeper(interval=60, batch_size=10).sweep(datetime.utcnow() + timedelta(days=1)) == 3
+    assert await _counters(database, group["ticket_type_id"]) == (0, 0)
+
+    assert await registration_service.confirm_group_payment(group["group_id"], {"transaction_id": "pi_2"}) == 3
+    statuses = await database.registrations.distinct("status", {"group_id": group["group_id"]})
+    assert statuses == ["confirmed"]
+    assert await _counters(database, group["ticket_type_id"]) == (0, 3)
@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.models.registration import RegistrationStatus
+from app.services.hold_sweeper import RECOVERY_GRACE, HoldSweeper
+
+
+async def _holds(database, count: int, expired_at: datetime) -> ObjectId:
+    """A ticket type with `count` expired single-ticket holds on it."""
+
+    ticket_type = await database.ticket_types.insert_one(
+        {"event_id": "e1", "name": "General", "base_price": 50.0, "capacity": 100, "reserved": count}
+    )
+    await database.registrations.insert_many(
+        [
+            {
+                "event_id": "e1",
+                "ticket_type_id": str(ticket_type.inserted_id),
+                "group_size": 1,
+                "status": RegistrationStatus.PENDING,
+                "hold_expires_at": expired_at,
+            }
+            for _ in range(count)
+        ]
+    )
+    return ticket_type.inserted_id
+
+
+async def _claim(database, ticket_type_id: ObjectId, claimed_at: datetime) -> ObjectId:
+    """Step 2 of a sweep that dies before releasing what it claimed."""
+
+    sweep_id = ObjectId()
+    await database.registrations.update_many(
+        {"ticket_type_id": str(ticket_type_id), "status": RegistrationStatus.PENDING},
+        {"$set": {"status": RegistrationStatus.EXPIRED, "hold_sweep_id": sweep_id, "updated_at": claimed_at}},
+    )
+    return sweep_id
+
+
+async def _reserved(database, ticket_type_id: ObjectId) -> int:
+    return (await database.ticket_types.find_one({"_id": ticket_type_id}))["reserved"]
+
+
+@pytest.mark.anyio
+async def test_claimed_holds_are_released_once_however_often_recovered(database):
+    now = datetime.utcnow()
+    sweeper = HoldSweeper(interval=60, batch_size=10)
+    ticket_type_id = await _holds(database, 3, now - timedelta(hours=1))
+    sweep_id = await _claim(database, ticket_type_id, now - RECOVERY_GRACE * 2)
+
+    # The next sweep recovers the claim; repeating the release changes nothing.
+    assert await sweeper.sweep(now) == 0
+    assert await _reserved(database, ticket_type_id) == 0
+    assert await sweeper.release(sweep_id, now) == 0
+    assert await sweeper.sweep(now + timedelta(hours=1)) == 0
+    assert await _reserved(database, ticket_type_id) == 0
+    assert sweeper.expired_holds == 3
+
+
+@pytest.mark.anyio
+async def test_concurrent_releases_of_one_sweep_return_its_tickets_once(database):
+    now = datetime.utcnow()
+    sweeper = HoldSweeper(interval=60, batch_size=10)
+    ticket_type_id = await _holds(database, 4, now - timedelta(hours=1))
+    sweep_id = await _claim(database, ticket_type_id, now)
+
+    released = await asyncio.gather(*(sweeper.release(sweep_id, now) for _ in range(3)))
+    assert sum(released) == 4
+    assert await _reserved(database, ticket_type_id) == 0
+    release_ids = await database.registrations.distinct("hold_release_id", {"hold_sweep_id": sweep_id})
+    assert len(release_ids) == sum(1 for count in released if count)
+
+
+@pytest.mark.anyio
+async def test_an_old_sweep_recovered_after_many_others_is_released_once(database):
+    now = datetime.utcnow()
+    sweeper = HoldSweeper(interval=60, batch_size=1)
+    ticket_type_id = await _holds(database, 2, now - timedelta(hours=1))
+    stale_sweep = await _claim(database, ticket_type_id, now - timedelta(days=1))
+    assert await sweeper.release(stale_sweep, now) == 2
+    await database.ticket_types.update_one({"_id": ticket_type_id}, {"$inc": {"reserved": 60}})
+    await database.registrations.insert_many(
+        [
+            {
+                "event_id": "e1",
+                "ticket_type_id": str(ticket_type_id),
+                "group_size": 1,
+                "status": RegistrationStatus.PENDING,
+                "hold_expires_at": now - timedelta(minutes=5),
+            }
+            for _ in range(60)
+        ]
+    )
+
+    # Sixty later sweeps of one hold each, then the old sweep is recovered again.
+    assert await sweeper.sweep(now) == 60
+    assert await _reserved(database, ticket_type_id) == 0
+    assert await sweeper.release(stale_sweep, now + timedelta(days=1)) == 0
+    assert await _reserved(database, ticket_type_id) == 0
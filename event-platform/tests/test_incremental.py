@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from app.ai.batch import recommend_rows
+from app.ai.incremental import entering_users, kth_entry, patch_recommendations
+from app.ai.matrix import AttendeeMatrix
+
+TAGS = ["python", "rust", "ml", "design", "sales", "devops", "hiring", "funding"]
+INDUSTRIES = ["fintech", "health", "media", None]
+ROLES = ["engineer", "designer", "founder", "investor", "recruiter"]
+CITIES = ["Montreal", "Toronto", "Berlin", "Paris", None]
+
+
+def _attendee(rng: random.Random, index: int) -> dict:
+    return {
+        "id": f"u{index}",
+        "name": f"Attendee {index}",
+        "company": f"Company {index % 7}",
+        "industry": rng.choice(INDUSTRIES),
+        "role": rng.choice(ROLES),
+        "location": rng.choice(CITIES),
+        "interests": rng.sample(TAGS, rng.randint(0, 3)),
+        "skills": rng.sample(TAGS, rng.randint(0, 3)),
+        "goals": rng.sample(TAGS, rng.randint(0, 2)),
+    }
+
+
+def _stored(matrix: AttendeeMatrix, limit: int) -> dict:
+    return {
+        result["user_id"]: {
+            "user_id": result["user_id"],
+            "limit": limit,
+            "recommendations": result["recommendations"],
+            "kth": kth_entry(result["recommendations"], limit),
+        }
+        for result in recommend_rows(matrix, range(matrix.size), limit=limit)
+    }
+
+
+def _refresh(matrix: AttendeeMatrix, row: int, stored: dict) -> dict:
+    """What `RecommendationService._refresh_event_user` does against MongoDB."""
+
+    rows = {attendee["id"]: index for index, attendee in enumerate(matrix.attendees)}
+    user_id = matrix.attendees[row]["id"]
+
+    def contains(document: dict) -> bool:
+        return any(entry["match"]["id"] == user_id for entry in document["recommendations"])
+
+    affected = {uid: doc for uid, doc in stored.items() if uid == user_id or contains(doc)}
+    summaries = [doc for uid, doc in stored.items() if uid not in affected]
+    for uid in entering_users(matrix, row, rows, summaries):
+        affected[uid] = stored[uid]
+
+    refreshed = dict(stored)
+    for uid, recommendations in patch_recommendations(matrix, row, rows, affected).items():
+        refreshed[uid] = {
+            **stored[uid],
+            "recommendations": recommendations,
+            "kth": kth_entry(recommendations, stored[uid]["limit"]),
+        }
+    return refreshed
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_patched_lists_match_a_full_recompute(seed):
+    rng = random.Random(seed)
+    attendees = [_attendee(rng, index) for index in range(40)]
+    stored = _stored(AttendeeMatrix(attendees), limit=3)
+
+    for _ in range(5):
+        row = rng.randrange(len(attendees))
+        edited = _attendee(rng, row)
+        if rng.random() < 0.3:
+            edited.update(interests=[], skills=[], goals=[], industry=None)
+        attendees[row] = edited
+        matrix = AttendeeMatrix(attendees)
+
+        stored = _refresh(matrix, row, stored)
+        expected = _stored(matrix, limit=3)
+        assert {uid: doc["recommendations"] for uid, doc in stored.items()} == {
+            uid: doc["recommendations"] for uid, doc in expected.items()
+        }
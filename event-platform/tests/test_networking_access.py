@@ -0,0 +1,66 @@
+import pytest
+from fastapi import BackgroundTasks, HTTPException
+
+from app.routers import ai
+
+
+async def _event(database) -> str:
+    event = await database.events.insert_one({"name": "RustConf", "organization_id": "o1", "organizer_id": "owner"})
+    await database.user_organizations.insert_many(
+        [
+            {"user_id": "organizer", "organization_id": "o1", "role": "ORGANIZER"},
+            {"user_id": "staff", "organization_id": "o1", "role": "STAFF"},
+        ]
+    )
+    return str(event.inserted_id)
+
+
+@pytest.mark.anyio
+async def test_only_organizers_start_and_follow_batch_jobs(database):
+    event_id = await _event(database)
+
+    for caller in ("staff", "attendee"):
+        with pytest.raises(HTTPException) as excinfo:
+            await ai.start_networking_batch(event_id, BackgroundTasks(), user_id=caller)
+        assert excinfo.value.status_code == 403
+
+    for caller in ("owner", "organizer"):
+        job = await ai.start_networking_batch(event_id, BackgroundTasks(), user_id=caller)
+        assert (await ai.networking_job_status(job["job_id"], user_id=caller))["event_id"] == event_id
+    with pytest.raises(HTTPException) as excinfo:
+        await ai.networking_job_status(job["job_id"], user_id="attendee")
+    assert excinfo.value.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_stored_recommendations_are_readable_only_by_their_owner(database):
+    event_id = await _event(database)
+    await database.recommendations.insert_one(
+        {"event_id": event_id, "user_id": "u1", "generation": 1, "limit": 3, "recommendations": []}
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        await ai.stored_networking_recommendations(event_id, "u1", caller_id="u2")
+    assert excinfo.value.status_code == 403
+    stored = await ai.stored_networking_recommendations(event_id, "u1", caller_id="u1")
+    assert stored["user_id"] == "u1"
+
+
+@pytest.mark.anyio
+async def test_only_organizers_plan_rounds_and_tables_seat_ids_and_names(database):
+    event_id = await _event(database)
+    await database.registrations.insert_many(
+        [
+            {"event_id": event_id, "status": "confirmed", "first_name": f"A{i}", "last_name": "B", "company": "Oxide"}
+            for i in range(4)
+        ]
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        await ai.plan_networking_rounds(event_id, user_id="staff")
+    assert excinfo.value.status_code == 403
+
+    plan = await ai.plan_networking_rounds(event_id, user_id="organizer")
+    seats = [seat for round_ in plan["rounds"] for table in round_["tables"] for seat in table["attendees"]]
+    assert len(seats) == 4 * len(plan["rounds"])
+    assert all(set(seat) == {"id", "name"} for seat in seats)
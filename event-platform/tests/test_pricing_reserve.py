@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.services.pricing_service import _reservable, pricing_service
+from app.services.registration_service import registration_service
+
+
+async def _ticket_type(database, **fields) -> str:
+    result = await database.ticket_types.insert_one(
+        {"event_id": "e1", "name": "General", "base_price": 100.0, "is_active": True, **fields}
+    )
+    return str(result.inserted_id)
+
+
+async def _counters(database, ticket_type_id: str) -> dict:
+    ticket = await database.ticket_types.find_one({"_id": ObjectId(ticket_type_id)})
+    return {field: ticket.get(field, 0) for field in ("reserved", "sold_count", "early_bird_sold")}
+
+
+@pytest.mark.anyio
+async def test_reservable_guard_counts_sold_and_reserved(database):
+    now = datetime.utcnow()
+    limited = await database.ticket_types.insert_one({"capacity": 5, "sold_count": 2, "reserved": 1})
+    fresh = await database.ticket_types.insert_one({"capacity": 2})
+    unlimited = await database.ticket_types.insert_one({"capacity": 0, "sold_count": 50})
+
+    assert await database.ticket_types.find_one(_reservable(limited.inserted_id, 2, now))
+    assert not await database.ticket_types.find_one(_reservable(limited.inserted_id, 3, now))
+    # Counters a ticket type was created without count as zero.
+    assert await database.ticket_types.find_one(_reservable(fresh.inserted_id, 2, now))
+    assert await database.ticket_types.find_one(_reservable(unlimited.inserted_id, 1000, now))
+
+
+@pytest.mark.anyio
+async def test_concurrent_reserves_for_the_last_seat_succeed_once(database):
+    ticket_type_id = await _ticket_type(database, capacity=5, sold_count=2, reserved=2)
+
+    results = await asyncio.gather(*(pricing_service.reserve(ticket_type_id, 1) for _ in range(8)))
+
+    assert sum(result["reserved"] for result in results) == 1
+    refused = [result for result in results if not result["reserved"]]
+    assert {result["reason"] for result in refused} == {"Not enough tickets available"}
+    assert {result["available_quantity"] for result in refused} == {0}
+    assert await _counters(database, ticket_type_id) == {"reserved": 3, "sold_count": 2, "early_bird_sold": 0}
+
+
+@pytest.mark.anyio
+async def test_release_restores_the_counters(database):
+    ticket_type_id = await _ticket_type(database, capacity=4, sold_count=1)
+
+    assert (await pricing_service.reserve(ticket_type_id, 3))["reserved"]
+    assert not (await pricing_service.reserve(ticket_type_id, 1))["reserved"]
+
+    await pricing_service.release(ticket_type_id, 3)
+    assert await _counters(database, ticket_type_id) == {"reserved": 0, "sold_count": 1, "early_bird_sold": 0}
+    assert (await pricing_service.check_availability(ticket_type_id, 3))["available"]
+    assert (await pricing_service.reserve(ticket_type_id, 3))["reserved"]
+
+
+@pytest.mark.anyio
+async def test_early_bird_price_follows_the_early_bird_counter(database):
+    ticket_type_id = await _ticket_type(
+        database,
+        capacity=10,
+        is_early_bird=True,
+        early_bird_price=80.0,
+        early_bird_capacity=2,
+        early_bird_sold=1,
+    )
+
+    reservation = await pricing_service.reserve(ticket_type_id, 1)
+    assert reservation["ticket"].early_bird_sold == 1
+    pricing = await pricing_service.price_ticket(reservation["ticket"], 1)
+    assert pricing["per_ticket_price"] == 80.0
+    # Holding a ticket does not spend the early-bird allowance; paying for it does.
+    assert await _counters(database, ticket_type_id) == {"reserved": 1, "sold_count": 0, "early_bird_sold": 1}
+
+    registration = {"ticket_type_id": ticket_type_id, "discount_details": pricing["discount_details"]}
+    await registration_service._move_to_sold(registration, 1)
+    assert await _counters(database, ticket_type_id) == {"reserved": 0, "sold_count": 1, "early_bird_sold": 2}
+
+    reservation = await pricing_service.reserve(ticket_type_id, 1)
+    assert reservation["ticket"].early_bird_sold == 2
+    assert (await pricing_service.price_ticket(reservation["ticket"], 1))["per_ticket_price"] == 100.0
+    await pricing_service.release(ticket_type_id, 1)
+    assert await _counters(database, ticket_type_id) == {"reserved": 0, "sold_count": 1, "early_bird_sold": 2}
@@ -0,0 +1,107 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.ai.rag import RagEngine
+from app.ai.rag_index import RagIndexCache
+from app.routers import ai
+from app.schemas.ai import RagChatRequest
+from app.services.access_service import ChatScope, access_service
+from app.services.rag_snapshot_service import RagSnapshotService
+
+SNAPSHOT = {
+    "faq": [{"question": "How do refunds work?", "answer": "Refunds within 14 days."}],
+    "events": [
+        {"id": "e1", "name": "RustConf", "location": "Montreal", "organizationId": "o1"},
+        {"id": "e2", "name": "PyCon", "location": "Pittsburgh", "organizationId": "o2"},
+    ],
+    "attendees": [
+        {"id": "a1", "name": "Ada Ferris", "company": "Oxide", "eventIds": ["e1"]},
+        {"id": "a2", "name": "Guido Marsh", "company": "Snake Co", "eventIds": ["e2"]},
+        {"id": "a3", "name": "Lone Walker", "company": "Nowhere", "eventIds": []},
+    ],
+}
+
+
+def _names(result: dict) -> set:
+    return {passage["metadata"].get("name") for passage in result["passages"]}
+
+
+def test_scoped_query_finds_the_tenants_events():
+    engine = RagEngine()
+    index = RagIndexCache(engine).get(SNAPSHOT)
+
+    result = index.answer(engine, "RustConf Montreal", k=5, organization_ids=["o1"])
+    assert result["source"] == "event"
+    assert result["metadata"]["name"] == "RustConf"
+    assert "Ada Ferris" in _names(index.answer(engine, "Ada Ferris Oxide", k=5, organization_ids=["o1"]))
+
+
+def test_scoped_query_never_returns_other_tenants_documents():
+    engine = RagEngine()
+    index = RagIndexCache(engine).get(SNAPSHOT)
+
+    for query in ("PyCon Pittsburgh", "Guido Marsh Snake Co", "Lone Walker Nowhere"):
+        names = _names(index.answer(engine, query, k=10, organization_ids=["o1"]))
+        assert not names & {"PyCon", "Guido Marsh", "Lone Walker"}
+    assert index.answer(engine, "PyCon", k=5, event_ids=["e2"])["metadata"]["name"] == "PyCon"
+    # No scope: only the FAQ.
+    assert {p["source"] for p in index.answer(engine, "RustConf Ada Ferris", k=10)["passages"]} <= {"faq"}
+
+
+def test_whole_corpus_searches_every_partition():
+    engine = RagEngine()
+    index = RagIndexCache(engine).get(SNAPSHOT)
+
+    assert index.answer(engine, "Lone Walker", k=1, whole_corpus=True)["metadata"]["name"] == "Lone Walker"
+    assert index.answer(engine, "PyCon", k=1, whole_corpus=True)["metadata"]["name"] == "PyCon"
+
+
+@pytest.mark.anyio
+async def test_chat_scope_follows_memberships_and_registrations(database):
+    own = await database.events.insert_one({"name": "RustConf", "organization_id": "o1", "organizer_id": "u9"})
+    other = await database.events.insert_one({"name": "PyCon", "organization_id": "o2", "organizer_id": "u9"})
+    await database.user_organizations.insert_one({"user_id": "u1", "organization_id": "o1", "role": "STAFF"})
+    await database.registrations.insert_one({"user_id": "u2", "event_id": str(other.inserted_id), "status": "confirmed"})
+
+    assert await access_service.chat_scope("u1") == ChatScope(organization_ids=("o1",))
+    assert await access_service.chat_scope("u2") == ChatScope(event_ids=(str(other.inserted_id),))
+    assert await access_service.chat_scope("u1", organization_id="o2") is None
+    assert await access_service.chat_scope("u1", event_id=str(other.inserted_id)) is None
+    assert await access_service.chat_scope("u1", event_id=str(own.inserted_id)) == ChatScope(
+        event_ids=(str(own.inserted_id),)
+    )
+    # An event outside the named organization matches nothing.
+    assert await access_service.chat_scope("u1", "o1", str(other.inserted_id)) == ChatScope()
+
+
+@pytest.mark.anyio
+async def test_chat_without_scope_answers_from_the_callers_events(database, monkeypatch):
+    monkeypatch.setattr(ai, "rag_snapshot_service", RagSnapshotService())
+    monkeypatch.setattr(ai, "_rag_indexes", RagIndexCache(ai._engine))
+    monkeypatch.setattr(ai, "_answers", type(ai._answers)(capacity=16, ttl=60))
+    now = datetime.utcnow()
+    for name, organization_id in (("RustConf", "o1"), ("PyCon", "o2")):
+        await database.events.insert_one(
+            {
+                "name": name,
+                "location": "Montreal" if name == "RustConf" else "Pittsburgh",
+                "organization_id": organization_id,
+                "organizer_id": "u9",
+                "capacity": 100,
+                "start_date": now,
+                "updated_at": now,
+            }
+        )
+    await database.user_organizations.insert_one({"user_id": "u1", "organization_id": "o1", "role": "ORGANIZER"})
+
+    answer = await ai.rag_chat(RagChatRequest(query="RustConf Montreal"), user_id="u1")
+    assert answer.source == "event"
+    assert answer.metadata["name"] == "RustConf"
+    answer = await ai.rag_chat(RagChatRequest(query="PyCon Pittsburgh", top_k=10), user_id="u1")
+    assert "PyCon" not in {passage.metadata.get("name") for passage in answer.passages}
+
+    with pytest.raises(HTTPException) as excinfo:
+        await ai.rag_chat(RagChatRequest(query="PyCon", organization_id="o2"), user_id="u1")
+    assert excinfo.value.status_code == 403